@@ -5,6 +5,8 @@ from sqlalchemy import select, text
 
 from backend.db import get_session
 from backend import models
+from backend.services.lineups import get_lineup_tracker
+from backend.services.roster_cache import get_roster_cache
 
 router = APIRouter()
 
@@ -21,6 +23,7 @@ async def reset(session: AsyncSession = Depends(get_session)):
     # Delete in the right order for foreign keys (child tables first)
     tables_to_delete = [
         "events",
+        "lineups",
         "matches", 
         "players",
         "teams",
@@ -32,6 +35,9 @@ async def reset(session: AsyncSession = Depends(get_session)):
     
     # Commit deletions
     await session.commit()
+    # Raw DELETEs bypass the ORM events that keep cached rosters fresh
+    get_roster_cache().invalidate_all()
+    get_lineup_tracker().clear()
 
     # Now repopulate with demo data (same logic as /seed)
     # --- Club ---
@@ -1,53 +1,326 @@
-from fastapi import APIRouter, Depends, HTTPException
+import base64
+import json
+from typing import AsyncIterator, Optional, Tuple, Union
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, func, insert, tuple_
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from ..db import get_session
-from ..models import Event, Match, Player
-from ..schemas import EventIn, EventOut
+from ..crud import events as crud_events
+from ..crud.events import EventRejected, check_client_event_id
+from ..db import AsyncSessionLocal, get_session
+from ..models import Event, EventTombstone, Match, Player
+from ..schemas import EventChangesOut, EventIn, EventOut
+from ..services import event_buffer
+from ..services.lineups import get_lineup_tracker
+from ..settings import get_settings
 
 router = APIRouter()
 
+# Upper bound for POST /events/bulk (one statement, one transaction)
+MAX_BULK_EVENTS = 5000
+# Times POST /events/bulk runs its INSERT when it loses a deadlock
+BULK_INSERT_ATTEMPTS = 3
+_UNIQUE_VIOLATION = "23505"
+_FOREIGN_KEY_VIOLATION = "23503"
+_RETRYABLE = {"40P01", "40001"}  # deadlock detected, serialization failure
+
 
 @router.post("/", response_model=EventOut)
 async def create_event(event: EventIn, session: AsyncSession = Depends(get_session)):
-    # validate match
-    match = await session.get(Match, event.match_id)
-    if not match:
-        raise HTTPException(status_code=404, detail="Match not found")
+    # Match/player validation happens inside the INSERT; only a rejected
+    # event costs a second query (to tell 404 from 400). Buffered mode
+    # checks up front and leaves the insert to the next flush.
+    if get_settings().EVENT_WRITE_MODE == "buffered":
+        create = event_buffer.create_event
+    else:
+        create = crud_events.create_event
+    try:
+        row = await create(session, {
+            "match_id": event.match_id,
+            "player_id": event.player_id,
+            "minute": event.minute,
+            "event_type": event.event_type,
+            "team_context": event.team_context,
+            "raw_text": event.raw_text,
+            "meta_json": event.meta_json,
+            "client_event_id": event.client_event_id,
+        })
+    except EventRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    return EventOut(**row)
 
-    # validate player if given
-    if event.player_id is not None:
-        player = await session.get(Player, event.player_id)
-        if not player:
-            raise HTTPException(status_code=404, detail="Player not found")
-        if player.team_id != match.team_id:
-            raise HTTPException(
-                status_code=400,
-                detail="Player must belong to the match team"
-            )
-
-    db_event = Event(
-        match_id=event.match_id,
-        player_id=event.player_id,
-        minute=event.minute,
-        event_type=event.event_type,
-        raw_text=event.raw_text,
-        meta_json=event.meta_json,
-    )
-    session.add(db_event)
+
+@router.post("/events/bulk", status_code=201)
+async def create_events_bulk(events: list[EventIn], session: AsyncSession = Depends(get_session)):
+    """
+    Create many events at once, all or nothing (e.g. importing a match
+    sheet). Same checks as POST /, but every match and player reference is
+    validated with one query each and the rows go in with a single
+    multi-row INSERT ... RETURNING. Returns the ids in request order;
+    events whose client_event_id was already stored for the match are
+    not inserted again and get their existing id.
+    """
+    if len(events) > MAX_BULK_EVENTS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_EVENTS} events per request")
+    if not events:
+        return {"created": 0, "ids": []}
+
+    # 1. Resolve every referenced match and player in one query each
+    match_ids = {e.match_id for e in events}
+    player_ids = {e.player_id for e in events if e.player_id is not None}
+    match_teams = dict((await session.execute(
+        select(Match.id, Match.team_id).where(Match.id.in_(match_ids))
+    )).all())
+    player_teams = dict((await session.execute(
+        select(Player.id, Player.team_id).where(Player.id.in_(player_ids))
+    )).all()) if player_ids else {}
+
+    # 2. Check each event against them, reporting every bad one
+    keys = [(e.match_id, e.client_event_id) for e in events if e.client_event_id is not None]
+    if len(set(keys)) != len(keys):
+        raise HTTPException(status_code=400, detail="Duplicate client_event_id in request")
+    not_found, errors = False, []
+    for i, event in enumerate(events):
+        try:
+            check_client_event_id(event.client_event_id)
+        except EventRejected as e:
+            errors.append({"index": i, "detail": e.detail})
+        if event.match_id not in match_teams:
+            not_found = True
+            errors.append({"index": i, "detail": "Match not found"})
+        elif event.player_id is not None:
+            if event.player_id not in player_teams:
+                not_found = True
+                errors.append({"index": i, "detail": "Player not found"})
+            elif player_teams[event.player_id] != match_teams[event.match_id]:
+                errors.append({"index": i, "detail": "Player must belong to the match team"})
+    if errors:
+        raise HTTPException(status_code=404 if not_found else 400, detail={"errors": errors})
+
+    # 3. Events already stored under their client_event_id keep their ids
+    stored = {}
+    if keys:
+        stored = {
+            (match_id, key): event_id
+            for match_id, key, event_id in (await session.execute(
+                select(Event.match_id, Event.client_event_id, Event.id)
+                .where(tuple_(Event.match_id, Event.client_event_id).in_(keys))
+            )).all()
+        }
+    new = [e for e in events if (e.match_id, e.client_event_id) not in stored]
+
+    # 4. One INSERT for the rest, ordered by match so concurrent bulk
+    #    requests take the event_seq trigger's match row locks in the same
+    #    order; ids come back in parameter order
+    order = sorted(range(len(new)), key=lambda i: new[i].match_id)
+    new_ids = []
+    for attempt in range(1, BULK_INSERT_ATTEMPTS + 1):
+        if not new:
+            break
+        try:
+            new_ids = (await session.scalars(
+                insert(Event).returning(Event.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "match_id": e.match_id,
+                        "player_id": e.player_id,
+                        "minute": e.minute,
+                        "event_type": e.event_type,
+                        "team_context": e.team_context,
+                        "raw_text": e.raw_text,
+                        "meta_json": e.meta_json,
+                        "client_event_id": e.client_event_id,
+                    }
+                    for e in (new[i] for i in order)
+                ],
+            )).all()
+            break
+        except DBAPIError as e:
+            await session.rollback()
+            sqlstate = getattr(e.orig, "sqlstate", None)
+            if sqlstate in _RETRYABLE and attempt < BULK_INSERT_ATTEMPTS:
+                continue
+            _raise_bulk_insert_error(e, sqlstate)
     await session.commit()
-    await session.refresh(db_event)
-    return EventOut(**db_event.__dict__)
 
+    by_position = dict(zip(order, new_ids))
+    inserted = iter(by_position[i] for i in range(len(new)))
+    ids = [stored.get((e.match_id, e.client_event_id)) or next(inserted) for e in events]
+    return {"created": len(new_ids), "ids": ids}
+
+
+def _raise_bulk_insert_error(error: DBAPIError, sqlstate: Optional[str]) -> None:
+    """Map a failed bulk INSERT to a response; unknown errors stay 500s."""
+    if sqlstate == _UNIQUE_VIOLATION:
+        # A concurrent request stored one of the client_event_ids first
+        raise HTTPException(status_code=409, detail="client_event_id conflict; retry the request")
+    if sqlstate == _FOREIGN_KEY_VIOLATION:
+        # A match or player was deleted after the checks above
+        raise HTTPException(status_code=404, detail="Match or player not found")
+    if sqlstate in _RETRYABLE:
+        raise HTTPException(status_code=503, detail="Database busy; retry the request")
+    raise error
+
+
+# Columns of EventOut, selected directly (no ORM instances per row)
+_EVENT_COLUMNS = (
+    Event.id,
+    Event.match_id,
+    Event.minute,
+    Event.event_type,
+    Event.team_context,
+    Event.player_id,
+    Event.raw_text,
+    Event.meta_json,
+    Event.client_event_id,
+)
+STREAM_BATCH_SIZE = 500
+# Page size when paging is asked for (a cursor, or ?since=) without a limit
+DEFAULT_PAGE_SIZE = 500
+
+
+def encode_cursor(minute: int, event_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{minute}:{event_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        minute, event_id = raw.split(":")
+        return int(minute), int(event_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _timeline_query(match_id: int, after: Optional[Tuple[int, int]] = None):
+    # Served by ix_events_match_minute_id; the row comparison is one index range
+    query = select(*_EVENT_COLUMNS).where(Event.match_id == match_id)
+    if after is not None:
+        query = query.where(tuple_(Event.minute, Event.id) > after)
+    return query.order_by(Event.minute, Event.id)
 
-@router.get("/match/{match_id}", response_model=list[EventOut])
-async def list_events_for_match(match_id: int, session: AsyncSession = Depends(get_session)):
-    match = await session.get(Match, match_id)
-    if not match:
-        raise HTTPException(status_code=404, detail="Match not found")
 
-    result = await session.execute(
-        select(Event).where(Event.match_id == match_id).order_by(Event.minute)
+async def _stream_ndjson(match_id: int) -> AsyncIterator[bytes]:
+    # Own session: the request's is closed before the body is streamed
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(
+            _timeline_query(match_id).execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        async for rows in result.mappings().partitions():
+            yield "".join(json.dumps(dict(row), default=str) + "\n" for row in rows).encode()
+
+
+async def _match_version(session: AsyncSession, match_id: int) -> Optional[int]:
+    """Highest event seq of the match, tombstones included (0 if none); None if no such match."""
+    latest_event = select(func.max(Event.seq)).where(Event.match_id == match_id).scalar_subquery()
+    latest_tombstone = (
+        select(func.max(EventTombstone.seq)).where(EventTombstone.match_id == match_id).scalar_subquery()
+    )
+    return await session.scalar(
+        select(func.coalesce(func.greatest(latest_event, latest_tombstone), 0)).where(Match.id == match_id)
+    )
+
+
+async def _changes_since(session: AsyncSession, match_id: int, since: int, limit: int) -> EventChangesOut:
+    events = (await session.execute(
+        select(*_EVENT_COLUMNS, Event.seq)
+        .where(Event.match_id == match_id, Event.seq > since)
+        .order_by(Event.seq)
+        .limit(limit + 1)
+    )).mappings().all()
+    tombstones = (await session.execute(
+        select(EventTombstone.event_id, EventTombstone.seq)
+        .where(EventTombstone.match_id == match_id, EventTombstone.seq > since)
+        .order_by(EventTombstone.seq)
+        .limit(limit + 1)
+    )).all()
+
+    changes = sorted(
+        [(e["seq"], "event", e) for e in events] + [(t.seq, "deleted", t.event_id) for t in tombstones],
+        key=lambda change: change[0],
+    )
+    more = len(changes) > limit
+    changes = changes[:limit]
+    return EventChangesOut(
+        events=[EventOut(**{k: v for k, v in row.items() if k != "seq"}) for _, kind, row in changes if kind == "event"],
+        deleted=[event_id for _, kind, event_id in changes if kind == "deleted"],
+        version=changes[-1][0] if changes else since,
+        more=more,
     )
-    return [EventOut(**e.__dict__) for e in result.scalars().all()]
+
+
+@router.get("/match/{match_id}", response_model=Union[list[EventOut], EventChangesOut])
+async def list_events_for_match(
+    match_id: int,
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=5000),
+    cursor: Optional[str] = None,
+    since: Optional[int] = Query(None, ge=0),
+    stream: bool = False,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    The whole match timeline, ordered by (minute, id). Paging is opt-in:
+    with a `limit` (or a `cursor`) one page is returned, and when there is
+    more the X-Next-Cursor header holds the `cursor` for the next page.
+    With `stream=true` the whole timeline is sent as NDJSON (one event per
+    line) from a server-side cursor instead.
+
+    Every change to a match's events (insert, update, delete) raises its
+    version, returned as X-Events-Version and as the ETag, so polling
+    clients get a 304 for If-None-Match while nothing changed. With
+    `since=<version>` only the changes after it are returned
+    (EventChangesOut), deletions included.
+    """
+    if stream:
+        if not await session.get(Match, match_id):
+            raise HTTPException(status_code=404, detail="Match not found")
+        return StreamingResponse(_stream_ndjson(match_id), media_type="application/x-ndjson")
+
+    # Read the version before the events: a change racing with this request
+    # then shows up again next time instead of being skipped
+    version = await _match_version(session, match_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Match not found")
+    etag = f'"{version}"'
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers={"ETag": etag, "X-Events-Version": str(version)})
+    response.headers["ETag"] = etag
+    response.headers["X-Events-Version"] = str(version)
+
+    if since is not None:
+        if since >= version:
+            return EventChangesOut(events=[], deleted=[], version=since, more=False)
+        return await _changes_since(session, match_id, since, limit or DEFAULT_PAGE_SIZE)
+
+    if limit is None and cursor is None:
+        rows = (await session.execute(_timeline_query(match_id))).mappings().all()
+        return [EventOut(**row) for row in rows]
+
+    limit = limit or DEFAULT_PAGE_SIZE
+    after = decode_cursor(cursor) if cursor else None
+    rows = (await session.execute(_timeline_query(match_id, after).limit(limit + 1))).mappings().all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1]["minute"], rows[-1]["id"])
+    return [EventOut(**row) for row in rows]
+
+
+@router.delete("/events/{event_id}", status_code=204)
+async def delete_event(event_id: int, session: AsyncSession = Depends(get_session)):
+    """Delete an event; the events_tombstone trigger records it for ?since= readers."""
+    deleted = (await session.execute(
+        delete(Event).where(Event.id == event_id).returning(Event.match_id, Event.event_type)
+    )).first()
+    if deleted is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+    await session.commit()
+    if deleted.event_type == "sub":
+        # The on-pitch set was built from this sub; rebuild it from what is left
+        get_lineup_tracker().invalidate(deleted.match_id)
+    return Response(status_code=204)
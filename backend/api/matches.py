@@ -1,62 +1,243 @@
 # backend/api/matches.py
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import delete, insert, select
 from backend.db import get_session
-from backend import models
-from backend.services.command_parser import parse_with_db
+from backend import models, schemas
+from backend.api.transcribe import transcribe_upload
+from backend.crud.events import EventRejected
+from backend.services.event_ingest import (
+    create_events_from_text,
+    create_events_from_texts,
+    match_minute,
+    raw_event_response,
+    raw_events_response,
+)
+from backend.services.lineups import get_lineup_tracker
+from backend.services.pipeline import NO_SPEECH
+from backend.services.roster_cache import get_roster_cache
+from backend.ws_manager import ws_manager
 
 router = APIRouter()
 
+@router.post("/matches/{match_id}/lineup", response_model=list[schemas.LineupOut], status_code=201)
+async def submit_lineup(
+    match_id: int,
+    lineup: list[schemas.LineupIn],
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Set the matchday squad (starters + bench) in one go, replacing any
+    previous lineup. Voice commands for this match then resolve names
+    against it, with starters on the pitch until a sub says otherwise.
+    """
+    match = await session.get(models.Match, match_id)
+    if not match:
+        raise HTTPException(status_code=404, detail="Match not found")
+
+    player_ids = [item.player_id for item in lineup]
+    if len(set(player_ids)) != len(player_ids):
+        raise HTTPException(status_code=400, detail="Duplicate player in lineup")
+    team_ids = set((await session.scalars(
+        select(models.Player.id).where(
+            models.Player.id.in_(player_ids), models.Player.team_id == match.team_id
+        )
+    )).all())
+    unknown = [i for i in player_ids if i not in team_ids]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Players not in this team: {unknown}")
+
+    await session.execute(delete(models.Lineup).where(models.Lineup.match_id == match_id))
+    rows = []
+    if lineup:
+        # One multi-row INSERT ... RETURNING
+        rows = (await session.scalars(
+            insert(models.Lineup).returning(models.Lineup),
+            [
+                {
+                    "match_id": match_id,
+                    "player_id": item.player_id,
+                    "position": item.position,
+                    "is_starter": item.is_starter,
+                }
+                for item in lineup
+            ],
+        )).all()
+    await session.commit()
+    get_lineup_tracker().invalidate(match_id)
+    return rows
+
+
+@router.get("/matches/{match_id}/lineup")
+async def get_lineup(match_id: int, session: AsyncSession = Depends(get_session)):
+    """The matchday squad and who is on the pitch now."""
+    lineup = await get_lineup_tracker().get(session, match_id)
+    if lineup is None:
+        raise HTTPException(status_code=404, detail="No lineup for this match")
+    return {
+        "match_id": match_id,
+        "squad": lineup.squad,
+        "on_pitch": sorted(lineup.on_pitch),
+    }
+
+
 @router.post("/matches/{match_id}/events/raw")
 async def create_event_from_raw_text(
     match_id: int,
-    raw_text: str,
+    raw_text: Optional[str] = None,
+    client_event_id: Optional[str] = None,
+    body: Optional[schemas.RawTextIn] = None,
     session: AsyncSession = Depends(get_session),
 ):
     """
     Accept raw transcript text (e.g. 'Goal Winston minute 12'),
     parse it into structured event JSON, and save as Event in DB.
+    Compound commands ('Goal Winston assist Logan') create one Event each,
+    returned under "events". Retrying with the same `client_event_id`
+    returns the events stored the first time instead of adding new ones.
+
+    `raw_text` and `client_event_id` come from the query string or from a
+    JSON body ({"raw_text", "client_event_id"}, what the app sends).
     """
+    if body is not None:
+        raw_text, client_event_id = body.raw_text, body.client_event_id
+    if raw_text is None:
+        raise HTTPException(status_code=422, detail="raw_text is required")
 
     # 1. Get the match to know team_id + opponent
     match = await session.get(models.Match, match_id)
     if not match:
         raise HTTPException(status_code=404, detail="Match not found")
 
-    # 2. Parse the raw text into structured event
-    parsed = await parse_with_db(
-        raw_text,
-        session,
-        team_id=match.team_id,
-        opponents=[match.opponent_name] if match.opponent_name else [],
-    )
-
-    if not parsed["event_type"] or parsed["event_type"] == "unknown":
+    # 2. Parse the raw text and save its Event rows in one statement
+    try:
+        events, parsed = await create_events_from_text(
+            session, match, raw_text, client_event_id=client_event_id
+        )
+    except EventRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    if not events:
         raise HTTPException(status_code=400, detail=f"Could not parse event: {raw_text}")
 
-    # 3. Map player name to player_id if available
-    player_id = parsed.get("player_id")
-
-    # 4. Create and save Event row
-    event = models.Event(
-        match_id=match_id,
-        minute=parsed["minute"],
-        event_type=parsed["event_type"],
-        player_id=player_id,
-        raw_text=raw_text,
-        meta_json=parsed,  # keep full parser output for review/edit
-    )
-    session.add(event)
-    await session.commit()
-    await session.refresh(event)
+    return raw_events_response(events, parsed)
+
+
+@router.post("/matches/{match_id}/events/raw/batch")
+async def create_events_from_raw_text_batch(
+    match_id: int,
+    batch: schemas.RawTextBatchIn,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Ingest many raw transcripts at once (e.g. the offline sync queue).
+
+    One match lookup, one roster lookup and one multi-row insert for the
+    whole batch. Each item gets its own result; items that cannot be parsed,
+    name a player who has just left the team, or have no minute (in the
+    text or the batch's `default_minute`) are reported as errors without
+    failing the rest. Items with a client_event_id that was already
+    stored return the stored events.
+    """
+    match = await session.get(models.Match, match_id)
+    if not match:
+        raise HTTPException(status_code=404, detail="Match not found")
+
+    texts = [item.raw_text for item in batch.items]
+    try:
+        created_per_item = await create_events_from_texts(
+            session,
+            match,
+            texts,
+            default_minute=batch.default_minute,
+            client_event_ids=[item.client_event_id for item in batch.items],
+        )
+    except EventRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    results = []
+    for i, (raw_text, (events, parsed, error)) in enumerate(zip(texts, created_per_item)):
+        if events:
+            results.append({
+                "index": i,
+                "status": "created",
+                "events": [raw_event_response(e, p) for e, p in zip(events, parsed)],
+            })
+        else:
+            results.append({
+                "index": i,
+                "status": "error",
+                "detail": error or f"Could not parse event: {raw_text}",
+                "events": [],
+            })
 
+    created = sum(r["status"] == "created" for r in results)
     return {
-        "id": event.id,
-        "match_id": event.match_id,
-        "event_type": event.event_type,
-        "player_id": event.player_id,
-        "minute": event.minute,
-        "raw_text": event.raw_text,
-        "parsed": parsed,
-    }
\ No newline at end of file
+        "match_id": match_id,
+        "created": created,
+        "failed": len(results) - created,
+        "results": results,
+    }
+
+
+@router.post("/matches/{match_id}/events/voice")
+async def create_event_from_voice(
+    match_id: int,
+    file: UploadFile = File(...),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Accept a voice command recording and do transcription, parsing and
+    event creation in one request (instead of /transcribe followed by
+    /matches/{match_id}/events/raw).
+    """
+
+    async def load_match_and_roster():
+        match = await session.get(models.Match, match_id)
+        if match:
+            await get_roster_cache().get(session, match.team_id)  # no-op when cached
+        return match
+
+    # 1. Decode the audio while the match + roster are fetched. If either
+    #    fails, the other is cancelled and awaited before the error leaves
+    #    the handler (and the session is closed under the roster lookup)
+    transcribing = asyncio.create_task(transcribe_upload(file))
+    loading = asyncio.create_task(load_match_and_roster())
+    try:
+        transcription, match = await asyncio.gather(transcribing, loading)
+    finally:
+        for task in (transcribing, loading):
+            task.cancel()
+        await asyncio.gather(transcribing, loading, return_exceptions=True)
+    if not match:
+        raise HTTPException(status_code=404, detail="Match not found")
+
+    text = transcription["transcript"]
+    if text == NO_SPEECH:
+        raise HTTPException(
+            status_code=400,
+            detail={"message": "No speech detected", "transcription": transcription},
+        )
+
+    # 2. Parse the transcript and save its Event rows; commands without
+    #    a spoken minute are stamped with the live match minute
+    try:
+        events, parsed = await create_events_from_text(
+            session, match, text, default_minute=match_minute(match)
+        )
+    except EventRejected as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail={"message": e.detail, "transcription": transcription},
+        )
+    if not events:
+        raise HTTPException(
+            status_code=400,
+            detail={"message": f"Could not parse event: {text}", "transcription": transcription},
+        )
+
+    body = raw_events_response(events, parsed)
+    for event_body in body["events"]:
+        await ws_manager.broadcast_event(match_id, {"type": "event", "event": event_body})
+    return {**body, "transcription": transcription}
@@ -0,0 +1,43 @@
+# backend/api/metrics.py
+from fastapi import APIRouter
+
+from backend.db import async_engine
+from backend.services.event_buffer import get_event_buffer
+from backend.services.pool_metrics import get_pool_metrics
+from backend.services.roster_cache import get_roster_cache
+from backend.settings import get_settings
+
+router = APIRouter()
+
+
+@router.get("/metrics/roster-cache")
+async def roster_cache_stats():
+    """Roster cache hit/miss counters (parse_with_db roster lookups)"""
+    return get_roster_cache().stats()
+
+
+@router.get("/metrics/event-buffer")
+async def event_buffer_stats():
+    """Write-behind buffer counters (EVENT_WRITE_MODE=buffered)"""
+    if get_settings().EVENT_WRITE_MODE != "buffered":
+        return {"mode": get_settings().EVENT_WRITE_MODE}
+    return {"mode": "buffered", **get_event_buffer().stats()}
+
+
+@router.get("/metrics/db-pool")
+async def db_pool_stats():
+    """Connection pool gauges, acquire wait and per-route hold times"""
+    settings = get_settings()
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "timeout_s": settings.DB_POOL_TIMEOUT,
+        **get_pool_metrics().stats(async_engine.sync_engine.pool),
+    }
+
+
+@router.post("/metrics/db-pool/reset")
+async def reset_db_pool_stats():
+    """Start a fresh measurement window (e.g. at kickoff)"""
+    get_pool_metrics().reset()
+    return {"status": "reset"}
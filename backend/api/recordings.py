@@ -0,0 +1,100 @@
+# backend/api/recordings.py
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend import models
+from backend.api.transcribe import SUPPORTED_FORMATS
+from backend.db import get_session
+from backend.services.audio import AudioTooLarge
+from backend.services.recordings import (
+    RecordingNotFound,
+    UploadOffsetMismatch,
+    append_chunk,
+    create_upload,
+    get_progress,
+    load_upload,
+    start_ingest,
+)
+
+router = APIRouter()
+
+
+def _load_for_match(match_id: int, upload_id: str) -> dict:
+    try:
+        meta = load_upload(upload_id)
+    except RecordingNotFound:
+        raise HTTPException(status_code=404, detail="Recording not found")
+    if meta["match_id"] != match_id:
+        raise HTTPException(status_code=404, detail="Recording not found")
+    return meta
+
+
+@router.post("/matches/{match_id}/recordings", status_code=status.HTTP_201_CREATED)
+async def create_recording(
+    match_id: int,
+    content_type: str = "audio/mp4",
+    started_at: Optional[datetime] = None,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Start a chunked upload of a whole-match recording.
+
+    `started_at` is when the recording began, with a UTC offset; defaults
+    to the match kickoff. Send the file with PUT .../recordings/{upload_id}?offset=N, then POST
+    .../complete to transcribe it.
+    """
+    if started_at is not None and started_at.tzinfo is None:
+        raise HTTPException(status_code=422, detail="started_at needs a UTC offset (e.g. 2024-05-04T10:00:00Z)")
+    match = await session.get(models.Match, match_id)
+    if not match:
+        raise HTTPException(status_code=404, detail="Match not found")
+    if content_type not in SUPPORTED_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported audio format: {content_type}")
+
+    meta = create_upload(match_id, content_type, started_at)
+    return {**meta, "received_bytes": 0}
+
+
+@router.put("/matches/{match_id}/recordings/{upload_id}")
+async def upload_recording_chunk(match_id: int, upload_id: str, offset: int, request: Request):
+    """
+    Append the request body at byte `offset`. On 409 resume from the
+    `received_bytes` in the response detail.
+    """
+    meta = _load_for_match(match_id, upload_id)
+    if get_progress(upload_id) is not None:
+        raise HTTPException(status_code=409, detail="Recording already completed")
+    try:
+        received = await append_chunk(upload_id, offset, request.stream())
+    except UploadOffsetMismatch as e:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Offset does not match upload", "received_bytes": e.expected},
+        )
+    except AudioTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    return {"upload_id": meta["upload_id"], "received_bytes": received}
+
+
+@router.post("/matches/{match_id}/recordings/{upload_id}/complete", status_code=status.HTTP_202_ACCEPTED)
+async def complete_recording(match_id: int, upload_id: str):
+    """Finish the upload and start transcribing it in the background"""
+    meta = _load_for_match(match_id, upload_id)
+    if not meta["received_bytes"]:
+        raise HTTPException(status_code=400, detail="Recording is empty")
+    progress = start_ingest(upload_id, match_id)
+    return {"upload_id": upload_id, **progress.report()}
+
+
+@router.get("/matches/{match_id}/recordings/{upload_id}")
+async def get_recording(match_id: int, upload_id: str):
+    """Upload state, or ingestion progress and throughput once completed"""
+    progress = get_progress(upload_id)
+    if progress is not None and progress.match_id == match_id:
+        # Uploaded file is deleted once ingestion succeeds
+        return {"upload_id": upload_id, **progress.report()}
+    meta = _load_for_match(match_id, upload_id)
+    return {**meta, "status": "uploading"}
@@ -1,14 +1,28 @@
 # TODO: Later replace with on-device whisper.cpp integration for better performance and privacy
 
-import os
-import tempfile
+import hashlib
 import logging
-from typing import Dict, Any
-from pathlib import Path
+from typing import Dict, Any, Optional
 
 from fastapi import APIRouter, UploadFile, File, HTTPException, status
 from fastapi.responses import JSONResponse
-import whisper
+
+from backend.services.audio import (
+    SAMPLE_RATE,
+    AudioDecodeError,
+    AudioTooLarge,
+    decode_stream,
+    iter_upload,
+)
+from backend.services.batching import get_transcription_batcher
+from backend.services.jobs import get_job_queue, new_job
+from backend.services.pipeline import transcribe_samples
+from backend.services.transcript_cache import get_transcript_cache, hash_chunks
+from backend.services.transcription import (
+    TranscriptionQueueFull,
+    TranscriptionTimeout,
+    get_transcription_executor,
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -25,26 +39,6 @@ SUPPORTED_FORMATS = {
 # Maximum file size (10MB)
 MAX_FILE_SIZE = 10 * 1024 * 1024
 
-# Global whisper model (loaded once for efficiency)
-_whisper_model = None
-
-def get_whisper_model():
-    """Get or load the Whisper model (singleton pattern)"""
-    global _whisper_model
-    if _whisper_model is None:
-        try:
-            logger.info("Loading Whisper model...")
-            # Use base model for good balance of speed and accuracy
-            _whisper_model = whisper.load_model("base")
-            logger.info("Whisper model loaded successfully")
-        except Exception as e:
-            logger.error(f"Failed to load Whisper model: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to initialize transcription service"
-            )
-    return _whisper_model
-
 def validate_audio_file(file: UploadFile) -> None:
     """Validate uploaded audio file"""
     if not file.content_type:
@@ -66,18 +60,53 @@ def validate_audio_file(file: UploadFile) -> None:
             detail=f"File too large. Maximum size: {MAX_FILE_SIZE / (1024*1024):.1f}MB"
         )
 
-def get_file_extension(content_type: str) -> str:
-    """Get file extension from content type"""
-    extension_map = {
-        'audio/m4a': '.m4a',
-        'audio/mp4': '.m4a',
-        'audio/mpeg': '.mp3',
-        'audio/wav': '.wav',
-        'audio/flac': '.flac',
-        'audio/ogg': '.ogg',
-        'audio/webm': '.webm'
-    }
-    return extension_map.get(content_type, '.wav')
+async def transcribe_upload(file: UploadFile) -> Dict[str, Any]:
+    """
+    Validate, decode and transcribe an uploaded clip.
+
+    Returns the /transcribe response body; raises HTTPException for bad
+    input (400/413), a full queue (503 + Retry-After) or a timeout (504).
+    """
+    # Validate the uploaded file
+    validate_audio_file(file)
+    
+    # Pipe the upload through ffmpeg into memory; the size limit is
+    # enforced chunk by chunk rather than after buffering the whole file.
+    # The bytes are hashed on the way through for the transcript cache.
+    hasher = hashlib.sha256()
+    try:
+        audio = await decode_stream(
+            hash_chunks(iter_upload(file), hasher), MAX_FILE_SIZE, file.content_type
+        )
+    except AudioTooLarge:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File too large. Maximum size: {MAX_FILE_SIZE / (1024*1024):.1f}MB"
+        )
+    except AudioDecodeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Could not decode audio: {e}"
+        )
+    
+    logger.info(f"Decoded {audio.size / SAMPLE_RATE:.2f}s of audio in memory")
+    
+    # Transcribe audio in the worker pool so the event loop stays free
+    try:
+        return await transcribe_samples(audio, audio_digest=hasher.hexdigest())
+    except TranscriptionQueueFull as e:
+        logger.warning(f"Rejecting transcription, queue full (retry after {e.retry_after}s)")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Transcription service is busy, please retry",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except TranscriptionTimeout as e:
+        logger.error(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=str(e),
+        )
 
 @router.post("/transcribe")
 async def transcribe_audio(file: UploadFile = File(...)) -> JSONResponse:
@@ -93,116 +122,114 @@ async def transcribe_audio(file: UploadFile = File(...)) -> JSONResponse:
     Raises:
         HTTPException: For various error conditions
     """
-    temp_file_path = None
-    
     try:
         logger.info(f"Received audio file: {file.filename}, type: {file.content_type}")
+        content = await transcribe_upload(file)
         
-        # Validate the uploaded file
-        validate_audio_file(file)
-        
-        # Create temporary file
-        file_extension = get_file_extension(file.content_type)
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as temp_file:
-            temp_file_path = temp_file.name
-            
-            # Read and write file content
-            content = await file.read()
-            
-            # Check file size after reading
-            if len(content) > MAX_FILE_SIZE:
-                raise HTTPException(
-                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                    detail=f"File too large. Maximum size: {MAX_FILE_SIZE / (1024*1024):.1f}MB"
-                )
-            
-            temp_file.write(content)
-            temp_file.flush()
-        
-        logger.info(f"Audio file saved to temporary location: {temp_file_path}")
-        
-        # Load Whisper model and transcribe audio
-        try:
-            model = get_whisper_model()
-            
-            # Transcribe audio
-            logger.info("Starting transcription...")
-            result = model.transcribe(temp_file_path)
-            
-            transcript = result["text"].strip()
-            
-            if not transcript:
-                logger.warning("Transcription returned empty result")
-                transcript = "[No speech detected]"
-            
-            logger.info(f"Transcription completed: '{transcript[:100]}{'...' if len(transcript) > 100 else ''}'")
-            
-            # Return successful response
-            return JSONResponse(
-                status_code=status.HTTP_200_OK,
-                content={
-                    "transcript": transcript,
-                    "confidence": getattr(result, "confidence", None),
-                    "duration": getattr(result, "duration", None),
-                    "language": getattr(result, "language", None)
-                }
-            )
-            
-        except Exception as transcription_error:
-            # Log full traceback for transcription errors
-            import traceback
-            logger.error(f"Transcription failed with full traceback:")
-            logger.error(traceback.format_exc())
-            logger.error(f"Transcription error details: {str(transcription_error)}")
-            
-            # Return JSON error response
-            return JSONResponse(
-                status_code=500,
-                content={"error": str(transcription_error)}
-            )
+        # Return successful response
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content=content
+        )
         
     except HTTPException:
         # Re-raise HTTP exceptions as-is
         raise
+    except Exception as transcription_error:
+        # Log full traceback for transcription errors
+        import traceback
+        logger.error(f"Transcription failed with full traceback:")
+        logger.error(traceback.format_exc())
+        logger.error(f"Transcription error details: {str(transcription_error)}")
+        
+        # Return JSON error response
+        return JSONResponse(
+            status_code=500,
+            content={"error": str(transcription_error)}
+        )
+
+@router.post("/transcribe/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def create_transcription_job(
+    file: UploadFile = File(...),
+    match_id: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Queue an audio file for transcription and return a job id immediately.
+
+    Poll GET /transcribe/jobs/{job_id} for the result; if `match_id` is
+    given the finished job is also pushed to /ws/match/{match_id}.
+    """
+    validate_audio_file(file)
+
+    data = bytearray()
+    async for chunk in iter_upload(file):
+        data.extend(chunk)
+        if len(data) > MAX_FILE_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File too large. Maximum size: {MAX_FILE_SIZE / (1024*1024):.1f}MB"
+            )
+
+    queue = get_job_queue()
+    job = new_job(file.content_type, match_id=match_id, filename=file.filename)
+    try:
+        await queue.enqueue(job, bytes(data))
     except Exception as e:
-        logger.error(f"Transcription failed: {str(e)}", exc_info=True)
+        logger.error(f"Could not queue transcription job: {e}")
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Transcription failed: {str(e)}"
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Transcription queue unavailable, please retry",
         )
-    finally:
-        # Clean up temporary file
-        if temp_file_path and os.path.exists(temp_file_path):
-            try:
-                os.unlink(temp_file_path)
-                logger.info(f"Cleaned up temporary file: {temp_file_path}")
-            except Exception as e:
-                logger.warning(f"Failed to clean up temporary file {temp_file_path}: {e}")
 
+    logger.info(f"Queued transcription job {job['id']} ({len(data)} bytes, match {match_id})")
+    return {"job_id": job["id"], "status": job["status"], "status_url": f"/transcribe/jobs/{job['id']}"}
+
+@router.get("/transcribe/jobs/{job_id}")
+async def get_transcription_job(job_id: str) -> Dict[str, Any]:
+    """Status of a queued job; `result` holds the /transcribe response once done"""
+    job = await get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
+
+@router.get("/transcribe/health/live")
+async def liveness_check() -> JSONResponse:
+    """Liveness probe: the API process is up. Never touches the model."""
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={"status": "alive", "service": "transcription"}
+    )
+
+@router.get("/transcribe/health/ready")
 @router.get("/transcribe/health")
 async def health_check() -> JSONResponse:
-    """Health check endpoint for transcription service"""
-    try:
-        # Try to load the model to check if service is ready
-        model = get_whisper_model()
+    """Readiness probe: 200 only once every worker has loaded and warmed up its model"""
+    executor = get_transcription_executor()
+    content = {
+        "service": "transcription",
+        "engine": executor.engine,
+        "model": executor.model_name,
+        "workers": executor.workers,
+        "pending_jobs": executor.pending,
+        "capacity": executor.capacity,
+        "batching": get_transcription_batcher().stats(),
+        "warmup": executor.warmup_report,
+    }
+    if executor.ready:
         return JSONResponse(
             status_code=status.HTTP_200_OK,
-            content={
-                "status": "healthy",
-                "service": "transcription",
-                "model_loaded": model is not None
-            }
+            content={"status": "healthy", **content}
         )
-    except Exception as e:
-        logger.error(f"Health check failed: {e}")
+    if executor.warmup_error:
+        logger.error(f"Health check failed: {executor.warmup_error}")
         return JSONResponse(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            content={
-                "status": "unhealthy",
-                "service": "transcription",
-                "error": str(e)
-            }
+            content={"status": "unhealthy", "error": executor.warmup_error, **content}
         )
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"status": "warming_up", **content}
+    )
 
 @router.get("/transcribe/formats")
 async def get_supported_formats() -> JSONResponse:
@@ -214,3 +241,11 @@ async def get_supported_formats() -> JSONResponse:
             "max_file_size_mb": MAX_FILE_SIZE / (1024 * 1024)
         }
     )
+
+@router.get("/transcribe/cache/stats")
+async def get_cache_stats() -> JSONResponse:
+    """Transcript cache hit/miss counters and decode time saved"""
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content=get_transcript_cache().stats()
+    )
@@ -1,10 +1,41 @@
+import asyncio
+import json
+import logging
+from typing import Optional
+
+import numpy as np
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
+from ..db import AsyncSessionLocal
+from ..models import Match
+from ..services.batching import get_transcription_batcher
+from ..services.event_ingest import create_events_from_text, match_minute, raw_events_response
+from ..services.streaming import (
+    SAMPLE_RATE,
+    STREAM_DECODE_OPTIONS,
+    UtteranceSegmenter,
+    pcm16_to_float32,
+)
+from ..services.transcription import TranscriptionQueueFull
 from ..ws_manager import ws_manager
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
+# Client sample rates accepted by {"type": "config"} (resampled to 16 kHz)
+MIN_SAMPLE_RATE = 8000
+MAX_SAMPLE_RATE = 192000
+
+
+def parse_sample_rate(value) -> Optional[int]:
+    """The configured sample rate as an int, or None if it is not a usable one."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value != int(value):
+        return None
+    rate = int(value)
+    return rate if MIN_SAMPLE_RATE <= rate <= MAX_SAMPLE_RATE else None
+
 
 @router.websocket("/ws/match/{match_id}")
 async def websocket_endpoint(websocket: WebSocket, match_id: int):
@@ -17,3 +48,146 @@ async def websocket_endpoint(websocket: WebSocket, match_id: int):
         ws_manager.disconnect(match_id, websocket)
 
 
+@router.websocket("/ws/transcribe/{match_id}")
+async def transcribe_stream(websocket: WebSocket, match_id: int):
+    """
+    Streamed voice commands for a match.
+
+    Client -> server:
+      - binary frames: 16-bit little-endian mono PCM (16 kHz unless configured);
+        a frame may end mid-sample, the odd byte is kept for the next one
+      - {"type": "config", "sample_rate": 44100}  (optional, before audio;
+        an unusable rate gets an error and close code 1003)
+      - {"type": "stop"}  finish the current utterance now
+
+    Server -> client:
+      - {"type": "partial", "utterance": n, "text": "..."}
+      - {"type": "final", "utterance": n, "text": "...", "event": {...} | null, "events": [...]}
+      - {"type": "error", "detail": "..."}
+    """
+    async with AsyncSessionLocal() as session:
+        match = await session.get(Match, match_id)
+    await websocket.accept()
+    if not match:
+        await websocket.send_json({"type": "error", "detail": "Match not found"})
+        await websocket.close(code=4404)
+        return
+
+    # Partials and finals from every open stream are batched together
+    batcher = get_transcription_batcher()
+    segmenter = UtteranceSegmenter()
+    sample_rate = SAMPLE_RATE
+    odd_byte = b""  # first half of a sample split across frames
+    send_lock = asyncio.Lock()
+    finals: asyncio.Queue = asyncio.Queue()
+    partial_task = None
+
+    async def send(message: dict) -> None:
+        async with send_lock:
+            try:
+                await websocket.send_json(message)
+            except Exception:
+                # Client went away; finals are still stored and broadcast
+                pass
+
+    async def run_partial(index: int, audio: np.ndarray) -> None:
+        try:
+            result = await batcher.transcribe(audio, **STREAM_DECODE_OPTIONS)
+        except TranscriptionQueueFull:
+            return  # partials are best-effort
+        except Exception as e:
+            logger.warning(f"Partial decode failed: {e}")
+            return
+        # Drop partials that lost the race with their utterance's final
+        if index == segmenter.utterance_index:
+            await send({"type": "partial", "utterance": index, "text": result["text"].strip()})
+
+    async def run_finals() -> None:
+        while True:
+            item = await finals.get()
+            if item is None:
+                return
+            index, audio = item
+            try:
+                result = await batcher.transcribe(audio, **STREAM_DECODE_OPTIONS)
+            except Exception as e:
+                logger.error(f"Final decode failed: {e}")
+                await send({"type": "error", "utterance": index, "detail": str(e)})
+                continue
+
+            text = result["text"].strip()
+            bodies = []
+            if text:
+                try:
+                    async with AsyncSessionLocal() as session:
+                        events, parsed = await create_events_from_text(
+                            session, match, text, default_minute=match_minute(match)
+                        )
+                    if events:
+                        bodies = raw_events_response(events, parsed)["events"]
+                        for event_body in bodies:
+                            await ws_manager.broadcast_event(
+                                match_id, {"type": "event", "event": event_body}
+                            )
+                except Exception as e:
+                    logger.error(f"Failed to store streamed event '{text}': {e}")
+            await send({
+                "type": "final",
+                "utterance": index,
+                "text": text,
+                "event": bodies[0] if bodies else None,
+                "events": bodies,
+            })
+
+    def queue_final(audio: np.ndarray) -> None:
+        # utterance_index was already advanced by the segmenter
+        finals.put_nowait((segmenter.utterance_index - 1, audio))
+
+    finals_task = asyncio.create_task(run_finals())
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+
+            if message.get("bytes") is not None:
+                data = odd_byte + message["bytes"]
+                cut = len(data) - len(data) % 2
+                data, odd_byte = data[:cut], data[cut:]
+                for utterance in segmenter.feed(pcm16_to_float32(data, sample_rate)):
+                    queue_final(utterance)
+                window = segmenter.take_partial()
+                if window is not None and (partial_task is None or partial_task.done()):
+                    partial_task = asyncio.create_task(
+                        run_partial(segmenter.utterance_index, window)
+                    )
+                continue
+
+            try:
+                control = json.loads(message.get("text") or "{}")
+            except json.JSONDecodeError:
+                await send({"type": "error", "detail": "Control messages must be JSON"})
+                continue
+            if control.get("type") == "config":
+                rate = parse_sample_rate(control.get("sample_rate", SAMPLE_RATE))
+                if rate is None:
+                    await send({
+                        "type": "error",
+                        "detail": f"sample_rate must be a whole number from {MIN_SAMPLE_RATE} to {MAX_SAMPLE_RATE}",
+                    })
+                    await websocket.close(code=1003)
+                    break
+                sample_rate = rate
+            elif control.get("type") == "stop":
+                utterance = segmenter.flush()
+                if utterance is not None:
+                    queue_final(utterance)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        # Whatever the coach already said still becomes an event
+        utterance = segmenter.flush()
+        if utterance is not None:
+            queue_final(utterance)
+        finals.put_nowait(None)
+        await finals_task
@@ -0,0 +1,69 @@
+# backend/benchmarks/bench_batching.py
+"""
+Throughput vs latency of batched Whisper decoding for batch sizes 1-16.
+
+Runs the same worker functions the transcription pool uses, in-process:
+
+    python -m backend.benchmarks.bench_batching --clip path/to/command.wav
+    python -m backend.benchmarks.bench_batching --model tiny --clips 64
+    python -m backend.benchmarks.bench_batching --engine faster-whisper
+
+Without --clip a synthetic 3 s speech-band noise clip is used; timings are
+still representative because Whisper pads every clip to 30 s.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from backend.services import transcription
+from backend.services.audio import SAMPLE_RATE
+
+BATCH_SIZES = [1, 2, 4, 8, 12, 16]
+
+
+def _load_clip(path: str) -> np.ndarray:
+    import whisper
+
+    return whisper.load_audio(path)
+
+
+def _synthetic_clip(seconds: float = 3.0) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return (0.1 * rng.standard_normal(int(seconds * SAMPLE_RATE))).astype(np.float32)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engine", default="whisper")
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--clip", help="audio file to replicate (default: synthetic)")
+    parser.add_argument("--clips", type=int, default=48, help="clips decoded per batch size")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=BATCH_SIZES)
+    args = parser.parse_args()
+
+    clip = _load_clip(args.clip) if args.clip else _synthetic_clip()
+    options = {"language": "en", "temperature": 0.0, "fp16": False}
+
+    transcription._init_worker(args.engine, args.model, {})
+    transcription._run_batch([clip], options)  # warm up kernels and caches
+
+    print(f"engine={args.engine} model={args.model} clip={clip.size / SAMPLE_RATE:.2f}s clips/size={args.clips}")
+    print(f"{'batch':>5} {'clips/s':>9} {'batch ms':>9} {'ms/clip':>8} {'speedup':>8}")
+    base = None
+    for size in args.batch_sizes:
+        n_batches = max(1, args.clips // size)
+        batch = [clip] * size
+        start = time.perf_counter()
+        for _ in range(n_batches):
+            transcription._run_batch(batch, options)
+        elapsed = time.perf_counter() - start
+
+        throughput = n_batches * size / elapsed
+        batch_ms = 1000 * elapsed / n_batches  # latency seen by every request in the batch
+        base = base or throughput
+        print(f"{size:>5} {throughput:>9.2f} {batch_ms:>9.1f} {batch_ms / size:>8.1f} {throughput / base:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# backend/benchmarks/bench_engines.py
+"""
+Engine x model x beam-size matrix on the football voice command corpus.
+
+    python -m backend.benchmarks.bench_engines
+    python -m backend.benchmarks.bench_engines --engines whisper faster-whisper \
+        --models tiny base small --beams 1 5
+
+For every combination this reports model load time, mean and p95 latency
+per clip, real-time factor, word error rate against the reference
+transcripts, and how often the command parser extracts the right event
+type and player. Pick the fastest row that clears the accuracy bar.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import time
+from typing import List
+
+from backend.services.audio import SAMPLE_RATE
+from backend.services.command_parser import parse_transcript
+from backend.services.engines import load_engine
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+DEFAULT_CORPUS = os.path.join(REPO_ROOT, "speech", "corpus")
+ROSTER = ["Winston", "Tommy", "Logan", "Leo", "Alex", "Kip", "Tom"]
+DECODE_OPTIONS = {"language": "en", "temperature": 0.0, "condition_on_previous_text": False}
+
+
+def _words(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9']+", text.lower())
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Levenshtein distance over words, divided by the reference length."""
+    ref, hyp = _words(reference), _words(hypothesis)
+    if not ref:
+        return float(bool(hyp))
+    prev = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        cur = [i] + [0] * len(hyp)
+        for j, h in enumerate(hyp, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (r != h))
+        prev = cur
+    return prev[-1] / len(ref)
+
+
+def load_corpus(corpus_dir: str) -> list:
+    import whisper
+
+    with open(os.path.join(corpus_dir, "manifest.jsonl")) as f:
+        items = [json.loads(line) for line in f if line.strip()]
+    missing = [i["audio"] for i in items if not os.path.exists(os.path.join(corpus_dir, i["audio"]))]
+    if missing:
+        raise SystemExit(
+            f"{len(missing)} corpus clip(s) missing from {corpus_dir} "
+            f"(e.g. {missing[0]}); see speech/corpus/README.md"
+        )
+    for item in items:
+        item["samples"] = whisper.load_audio(os.path.join(corpus_dir, item["audio"]))
+    return items
+
+
+def run(engine: str, model: str, beam: int, corpus: list) -> dict:
+    start = time.perf_counter()
+    instance = load_engine(engine, model, beam_size=beam if beam > 1 else None)
+    load_seconds = time.perf_counter() - start
+    instance.transcribe(corpus[0]["samples"], **DECODE_OPTIONS)  # warm-up
+
+    latencies, wers, correct = [], [], 0
+    audio_seconds = 0.0
+    for item in corpus:
+        t0 = time.perf_counter()
+        text = instance.transcribe(item["samples"], **DECODE_OPTIONS)["text"]
+        latencies.append(time.perf_counter() - t0)
+        audio_seconds += item["samples"].size / SAMPLE_RATE
+        wers.append(word_error_rate(item["text"], text))
+        parsed = parse_transcript(text, ROSTER)
+        correct += parsed["event_type"] == item["event_type"] and parsed["player"] == item["player"]
+
+    latencies.sort()
+    return {
+        "engine": engine,
+        "model": model,
+        "beam": beam,
+        "load_s": load_seconds,
+        "mean_ms": 1000 * statistics.mean(latencies),
+        "p95_ms": 1000 * latencies[int(0.95 * (len(latencies) - 1))],
+        "rtf": sum(latencies) / audio_seconds,
+        "wer": statistics.mean(wers),
+        "command_acc": correct / len(corpus),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--engines", nargs="+", default=["whisper", "faster-whisper"])
+    parser.add_argument("--models", nargs="+", default=["tiny", "base"])
+    parser.add_argument("--beams", type=int, nargs="+", default=[1, 5])
+    parser.add_argument("--json", help="also write the rows to this file")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    print(f"{len(corpus)} clips, {sum(i['samples'].size for i in corpus) / SAMPLE_RATE:.1f}s of audio")
+    header = f"{'engine':<15}{'model':<8}{'beam':>5}{'load s':>8}{'mean ms':>9}{'p95 ms':>8}{'RTF':>7}{'WER':>7}{'cmd acc':>9}"
+    print(header)
+
+    rows = []
+    for engine in args.engines:
+        for model in args.models:
+            for beam in args.beams:
+                try:
+                    row = run(engine, model, beam, corpus)
+                except ImportError as e:
+                    print(f"{engine:<15}{model:<8}{beam:>5}  skipped: {e}")
+                    continue
+                rows.append(row)
+                print(
+                    f"{row['engine']:<15}{row['model']:<8}{row['beam']:>5}{row['load_s']:>8.1f}"
+                    f"{row['mean_ms']:>9.0f}{row['p95_ms']:>8.0f}{row['rtf']:>7.3f}"
+                    f"{row['wer']:>7.3f}{row['command_acc']:>9.1%}"
+                )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# backend/benchmarks/bench_event_buffer.py
+"""
+Sustained event ingestion: a commit per request vs the write-behind buffer.
+
+    python -m backend.benchmarks.bench_event_buffer
+    python -m backend.benchmarks.bench_event_buffer --events 50000 --clients 64 --no-fsync
+
+Needs the database from Settings.ASYNC_DB_URL. --clients concurrent
+clients (think: matches posting at the same time) each send their share of
+--events through POST /'s code path, with a session per request like the
+API:
+
+  - direct: crud.events.create_event, one INSERT + COMMIT per event
+  - buffered: services.event_buffer.create_event, journaled and stored
+    with COPY every --flush-ms / --flush-rows
+
+The buffered time runs until the last event is stored (not just
+acknowledged), so both numbers are rows in the table per second. Request
+latency p50/p99 is printed too. The journal goes to a temporary directory.
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from backend.benchmarks.bench_events_bulk import create_fixture, drop_fixture, make_events
+from backend.crud import events as crud_events
+from backend.db import AsyncSessionLocal
+from backend.services import event_buffer
+from backend.services.event_buffer import EventWriteBuffer
+
+
+async def ingest(create: Callable[[object, Dict], Awaitable[Dict]], events: List[Dict], clients: int) -> List[float]:
+    """Send `events` from `clients` concurrent clients; per-request latencies."""
+    latencies: List[float] = []
+
+    async def client(share: List[Dict]) -> None:
+        for event in share:
+            start = time.perf_counter()
+            async with AsyncSessionLocal() as session:
+                await create(session, dict(event))
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(client(events[i::clients]) for i in range(clients)))
+    return latencies
+
+
+def report(name: str, n: int, seconds: float, latencies: List[float]) -> None:
+    cuts = statistics.quantiles(latencies, n=100)
+    print(f"{name:<10}{seconds:>9.3f}{n / seconds:>11.0f}{1000 * cuts[49]:>9.3f}{1000 * cuts[98]:>9.3f}")
+
+
+async def run(n: int, clients: int, flush_ms: float, flush_rows: int, fsync: bool) -> None:
+    fixture = await create_fixture(players=20)
+    events = make_events(fixture, 2 * n)
+    try:
+        await ingest(crud_events.create_event, events[:100], clients)  # warm up the pool
+
+        start = time.perf_counter()
+        direct = await ingest(crud_events.create_event, events[:n], clients)
+        direct_s = time.perf_counter() - start
+
+        with tempfile.TemporaryDirectory() as journal:
+            buffer = EventWriteBuffer(journal, flush_rows=flush_rows, flush_ms=flush_ms, id_block=1000, fsync=fsync)
+            event_buffer._buffer = buffer
+            await buffer.start()
+            try:
+                start = time.perf_counter()
+                buffered = await ingest(event_buffer.create_event, events[n:], clients)
+                await buffer.drain()
+                buffered_s = time.perf_counter() - start
+                stats = buffer.stats()
+            finally:
+                await buffer.stop()
+                event_buffer._buffer = None
+    finally:
+        await drop_fixture(fixture)
+
+    print(f"{n} events per mode, {clients} concurrent clients, fsync {'on' if fsync else 'off'}")
+    print(f"{'mode':<10}{'total s':>9}{'events/s':>11}{'p50 ms':>9}{'p99 ms':>9}")
+    report("direct", n, direct_s, direct)
+    report("buffered", n, buffered_s, buffered)
+    print(f"flushes {stats['flushes']}, avg batch {stats['avg_batch_size']}, speedup {direct_s / buffered_s:.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=10000)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--flush-ms", type=float, default=50.0)
+    parser.add_argument("--flush-rows", type=int, default=1000)
+    parser.add_argument("--no-fsync", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(run(args.events, args.clients, args.flush_ms, args.flush_rows, not args.no_fsync))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# backend/benchmarks/bench_event_insert.py
+"""
+Single-event insert latency: the old ORM path vs INSERT ... SELECT ... RETURNING.
+
+    python -m backend.benchmarks.bench_event_insert
+    python -m backend.benchmarks.bench_event_insert --requests 5000
+
+Needs the database from Settings.ASYNC_DB_URL (a local Postgres, so the
+round trips dominate). Each request gets its own session, like an API
+call, and is timed end to end; p50/p99 are reported for
+
+  - create_event: session.get(Match) + session.get(Player) + INSERT +
+    COMMIT + refresh (before) vs one validating INSERT + COMMIT (now)
+  - raw text: the same parse, with the events added through the ORM
+    (before) vs crud.events.insert_events (now)
+
+A throwaway club/team/players/match is created and removed afterwards.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from backend import models
+from backend.benchmarks.bench_events_bulk import create_fixture, drop_fixture
+from backend.crud.events import create_event
+from backend.db import AsyncSessionLocal
+from backend.services.command_parser import parse_events_with_db
+from backend.services.event_ingest import create_events_from_text
+
+
+async def legacy_create_event(session, row: Dict) -> None:
+    """What POST / did before the single-statement insert."""
+    match = await session.get(models.Match, row["match_id"])
+    player = await session.get(models.Player, row["player_id"])
+    assert match and player and player.team_id == match.team_id
+    event = models.Event(**row)
+    session.add(event)
+    await session.commit()
+    await session.refresh(event)
+
+
+async def legacy_raw_event(session, match_id: int, raw_text: str) -> None:
+    """What POST /matches/{id}/events/raw did before: ORM add_all + commit."""
+    match = await session.get(models.Match, match_id)
+    parsed_events = await parse_events_with_db(raw_text, session, match.team_id, [match.opponent_name])
+    session.add_all([
+        models.Event(
+            match_id=match.id,
+            minute=parsed["minute"] or 0,
+            event_type=parsed["event_type"],
+            player_id=parsed.get("player_id"),
+            raw_text=parsed["raw_text"],
+            meta_json=parsed,
+        )
+        for parsed in parsed_events
+    ])
+    await session.commit()
+
+
+async def new_raw_event(session, match_id: int, raw_text: str) -> None:
+    match = await session.get(models.Match, match_id)
+    await create_events_from_text(session, match, raw_text, default_minute=0)
+
+
+async def measure(fn: Callable[[object, int], Awaitable[None]], n: int) -> List[float]:
+    latencies = []
+    for i in range(n):
+        start = time.perf_counter()
+        async with AsyncSessionLocal() as session:
+            await fn(session, i)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def report(name: str, latencies: List[float]) -> None:
+    cuts = statistics.quantiles(latencies, n=100)
+    print(f"{name:<28}{1000 * cuts[49]:>9.3f}{1000 * cuts[98]:>9.3f}{1000 * statistics.fmean(latencies):>9.3f}")
+
+
+async def run(n: int) -> None:
+    fixture = await create_fixture(players=20)
+    player_id = fixture["player_ids"][0]
+    row = {
+        "match_id": fixture["match_id"],
+        "player_id": player_id,
+        "minute": 12,
+        "event_type": "goal",
+        "team_context": "us",
+        "raw_text": "bench",
+        "meta_json": None,
+    }
+    raw_text = "Goal Player minute 12"
+    cases = [
+        ("create_event before", lambda s, i: legacy_create_event(s, dict(row))),
+        ("create_event now", lambda s, i: create_event(s, dict(row))),
+        ("raw text before", lambda s, i: legacy_raw_event(s, fixture["match_id"], raw_text)),
+        ("raw text now", lambda s, i: new_raw_event(s, fixture["match_id"], raw_text)),
+    ]
+    try:
+        for _, fn in cases:
+            await measure(fn, 20)  # warm up the pool and caches
+        print(f"{n} sequential requests each, ms")
+        print(f"{'path':<28}{'p50':>9}{'p99':>9}{'mean':>9}")
+        for name, fn in cases:
+            report(name, await measure(fn, n))
+    finally:
+        await drop_fixture(fixture)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# backend/benchmarks/bench_events_bulk.py
+"""
+POST /events/bulk vs one POST / per event.
+
+    python -m backend.benchmarks.bench_events_bulk
+    python -m backend.benchmarks.bench_events_bulk --events 1000 --base-url http://localhost:8000
+
+Needs the database from Settings.ASYNC_DB_URL. Creates a throwaway club,
+team, players and match, posts the same N events both ways and deletes
+everything again. Without --base-url requests go through the app
+in-process (ASGI transport), so the numbers are API + database time
+without network; with it, they include the HTTP round trips too.
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+from sqlalchemy import delete
+
+from backend import models
+from backend.db import AsyncSessionLocal
+
+
+async def create_fixture(players: int) -> Dict:
+    async with AsyncSessionLocal() as session:
+        club = models.Club(name="Bench FC")
+        session.add(club)
+        await session.flush()
+        team = models.Team(club_id=club.id, name="Bench Team", age_group="U9")
+        session.add(team)
+        await session.flush()
+        squad = [models.Player(team_id=team.id, name=f"Player {i}") for i in range(players)]
+        match = models.Match(team_id=team.id, opponent_name="Bench Rovers", kickoff_at=datetime.now(timezone.utc))
+        session.add_all([*squad, match])
+        await session.commit()
+        return {"club_id": club.id, "team_id": team.id, "match_id": match.id, "player_ids": [p.id for p in squad]}
+
+
+async def drop_fixture(fixture: Dict) -> None:
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(models.Event).where(models.Event.match_id == fixture["match_id"]))
+        await session.execute(delete(models.Match).where(models.Match.id == fixture["match_id"]))
+        await session.execute(delete(models.Player).where(models.Player.team_id == fixture["team_id"]))
+        await session.execute(delete(models.Team).where(models.Team.id == fixture["team_id"]))
+        await session.execute(delete(models.Club).where(models.Club.id == fixture["club_id"]))
+        await session.commit()
+
+
+def make_events(fixture: Dict, n: int, seed: int = 0) -> List[Dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            "match_id": fixture["match_id"],
+            "minute": rng.randint(0, 90),
+            "event_type": rng.choice(["goal", "shot", "pass", "tackle", "save", "foul"]),
+            "player_id": rng.choice(fixture["player_ids"]),
+            "raw_text": "bench",
+        }
+        for _ in range(n)
+    ]
+
+
+def client(base_url: Optional[str]) -> httpx.AsyncClient:
+    if base_url:
+        return httpx.AsyncClient(base_url=base_url, timeout=60)
+    from backend.main import app
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+
+async def run(n: int, base_url: Optional[str]) -> None:
+    fixture = await create_fixture(players=20)
+    events = make_events(fixture, n)
+    try:
+        async with client(base_url) as http:
+            # Warm up connections and the pool on both paths
+            (await http.post("/", json=events[0])).raise_for_status()
+            (await http.post("/events/bulk", json=events[:10])).raise_for_status()
+
+            start = time.perf_counter()
+            for event in events:
+                (await http.post("/", json=event)).raise_for_status()
+            single = time.perf_counter() - start
+
+            start = time.perf_counter()
+            response = await http.post("/events/bulk", json=events)
+            response.raise_for_status()
+            bulk = time.perf_counter() - start
+            assert response.json()["created"] == n
+    finally:
+        await drop_fixture(fixture)
+
+    print(f"{n} events via {'HTTP ' + base_url if base_url else 'in-process ASGI'}")
+    print(f"{'endpoint':<20}{'total s':>9}{'events/s':>10}{'ms/event':>10}")
+    for name, seconds in [("POST / x N", single), ("POST /events/bulk", bulk)]:
+        print(f"{name:<20}{seconds:>9.3f}{n / seconds:>10.0f}{1000 * seconds / n:>10.3f}")
+    print(f"speedup {single / bulk:.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=1000)
+    parser.add_argument("--base-url", help="benchmark a running server instead of the app in-process")
+    args = parser.parse_args()
+    asyncio.run(run(args.events, args.base_url))
+
+
+if __name__ == "__main__":
+    main()
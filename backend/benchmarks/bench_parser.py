@@ -0,0 +1,183 @@
+# backend/benchmarks/bench_parser.py
+"""
+Command-parser throughput suite, with a stored baseline.
+
+    python -m backend.benchmarks.bench_parser
+    python -m backend.benchmarks.bench_parser --sizes 20 100 500 2000 --transcripts 50000
+    python -m backend.benchmarks.bench_parser --save-baseline
+
+Times detect_intent, extract_minute, resolve_name and parse_transcript (end
+to end, with the RosterIndex the roster cache would hold) over a generated
+corpus (see parser_corpus), once per roster size for the roster-dependent
+ones. Results are transcripts per second, best of --repeat runs, along
+with parser accuracy against the corpus labels.
+
+The baseline (parser_baseline.json next to this file) is compared by
+backend/tests/test_parser_perf.py, which fails when any benchmark drops more
+than PARSER_PERF_TOLERANCE (default 0.35) below it. Raw throughput depends
+on the machine (and on a shared CI box, from one second to the next), so
+runs alternate with a fixed pure-Python calibration loop and benchmarks
+are compared by their throughput relative to it. Re-save the baseline when
+a change makes the parser faster (or knowingly slower).
+"""
+import argparse
+import json
+import os
+import re
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from backend.benchmarks.parser_corpus import build_roster, generate_corpus
+from backend.services.command_parser import detect_intent, extract_minute, parse_transcript, resolve_name
+from backend.services.roster_index import RosterIndex
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "parser_baseline.json")
+DEFAULT_SIZES = [20, 100, 500]
+DEFAULT_TRANSCRIPTS = 5000
+DEFAULT_TOLERANCE = 0.35
+
+_CALIBRATION_RE = re.compile(r"\b(\w+)\s+(\d+)\b")
+
+
+def _calibration_step(i: int) -> None:
+    # Roughly the parser's mix: regex search, string methods, dict lookups
+    text = f"Player{i % 97} scored minute {i % 90}"
+    _CALIBRATION_RE.search(text)
+    {w.lower(): n for n, w in enumerate(text.split())}.get("minute")
+
+
+def time_throughput(fn: Callable[[int], object], n: int, repeat: int) -> float:
+    """Calls per second of fn(0..n-1), best of `repeat` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for i in range(n):
+            fn(i)
+        best = min(best, time.perf_counter() - start)
+    return n / best
+
+
+def time_calibrated(fn: Callable[[int], object], n: int, repeat: int) -> Tuple[float, float]:
+    """
+    (throughput, throughput relative to the calibration loop). Calibration
+    runs alternate with the benchmark runs so both see the same CPU speed.
+    """
+    best, best_cal = 0.0, 0.0
+    for _ in range(repeat):
+        best_cal = max(best_cal, time_throughput(_calibration_step, n, 1))
+        best = max(best, time_throughput(fn, n, 1))
+    return best, best / best_cal
+
+
+def run_suite(
+    sizes: List[int] = DEFAULT_SIZES,
+    transcripts: int = DEFAULT_TRANSCRIPTS,
+    repeat: int = 5,
+    seed: int = 0,
+) -> Dict:
+    """Throughput of each benchmark (raw and calibrated), plus accuracy against the corpus labels."""
+    results: Dict[str, float] = {}
+    relative: Dict[str, float] = {}
+    accuracy: Dict[str, float] = {}
+
+    def bench(name: str, fn: Callable[[int], object], n: int) -> None:
+        results[name], relative[name] = time_calibrated(fn, n, repeat)
+
+    corpus = generate_corpus(transcripts, build_roster(max(sizes), seed), seed)
+    texts = [s["text"] for s in corpus]
+    bench("detect_intent", lambda i: detect_intent(texts[i]), len(texts))
+    bench("extract_minute", lambda i: extract_minute(texts[i]), len(texts))
+    accuracy["intent"] = sum(detect_intent(s["text"]) == s["intent"] for s in corpus) / len(corpus)
+    accuracy["minute"] = sum(extract_minute(s["text"]) == s["minute"] for s in corpus) / len(corpus)
+
+    for size in sizes:
+        # Same corpus shape for every size, with players from that roster
+        roster = build_roster(size, seed)
+        sized = generate_corpus(transcripts, roster, seed)
+        sized_texts = [s["text"] for s in sized]
+        tokens = [s["token"] for s in sized]
+        index = RosterIndex.from_names(roster)
+        parsed: List[Optional[Dict]] = [None] * len(sized)
+
+        def parse(i: int) -> None:
+            parsed[i] = parse_transcript(sized_texts[i], roster, roster_index=index)
+
+        bench(f"resolve_name[{size}]", lambda i: resolve_name(tokens[i], roster), len(tokens))
+        bench(f"parse_transcript[{size}]", parse, len(sized))
+        commands = [(s, p) for s, p in zip(sized, parsed) if s["player"]]
+        accuracy[f"player[{size}]"] = sum(p["player"] == s["player"] for s, p in commands) / len(commands)
+
+    return {
+        "transcripts": transcripts,
+        "seed": seed,
+        "roster_sizes": list(sizes),
+        "results": results,
+        "relative": relative,
+        "accuracy": accuracy,
+    }
+
+
+def load_baseline(path: str = BASELINE_PATH) -> Dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(suite: Dict, path: str = BASELINE_PATH) -> None:
+    with open(path, "w") as f:
+        json.dump(suite, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(suite: Dict, baseline: Dict, tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """
+    Benchmarks whose calibrated throughput fell more than `tolerance`
+    (a fraction) below the baseline, as readable lines. Empty when fine.
+    """
+    regressions = []
+    for name, base in baseline["relative"].items():
+        if name not in suite["relative"]:
+            continue
+        ratio = suite["relative"][name] / base
+        if ratio < 1 - tolerance:
+            regressions.append(
+                f"{name}: {suite['results'][name]:.0f}/s, {1 - ratio:.0%} below baseline "
+                f"relative to the calibration loop (tolerance {tolerance:.0%})"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--transcripts", type=int, default=DEFAULT_TRANSCRIPTS)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save-baseline", action="store_true", help=f"write results to {BASELINE_PATH}")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    suite = run_suite(args.sizes, args.transcripts, args.repeat, args.seed)
+    baseline = load_baseline() if os.path.exists(BASELINE_PATH) else None
+
+    print(f"{args.transcripts} transcripts, rosters {args.sizes}, best of {args.repeat}")
+    print(f"{'benchmark':<26}{'per sec':>11}{'us each':>9}{'calibrated':>12}{'baseline':>10}{'change':>8}")
+    for name, value in suite["results"].items():
+        relative = suite["relative"][name]
+        base = baseline["relative"].get(name) if baseline else None
+        change = f"{relative / base - 1:+.0%}" if base else ""
+        print(
+            f"{name:<26}{value:>11.0f}{1e6 / value:>9.2f}{relative:>12.3f}"
+            f"{(f'{base:.3f}' if base else '-'):>10}{change:>8}"
+        )
+    print("accuracy  " + "  ".join(f"{k} {v:.1%}" for k, v in suite["accuracy"].items()))
+
+    if args.save_baseline:
+        save_baseline(suite)
+        print(f"baseline written to {BASELINE_PATH}")
+    elif baseline:
+        for line in compare(suite, baseline, args.tolerance):
+            print(f"REGRESSION {line}")
+
+
+if __name__ == "__main__":
+    main()
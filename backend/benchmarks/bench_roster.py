@@ -0,0 +1,114 @@
+# backend/benchmarks/bench_roster.py
+"""
+Name resolution: RosterIndex vs the old per-token extractOne loop.
+
+    python -m backend.benchmarks.bench_roster
+    python -m backend.benchmarks.bench_roster --sizes 20 200 2000 --transcripts 2000
+
+For each roster size, builds a synthetic roster of unique names and a set of
+command token lists (exact names, ASR-style misspellings, non-names) and
+times resolving the player the way parse_with_db does: first resolvable
+token, then the player id. Index build time is reported separately since
+the roster cache builds it once per roster change. "agree" is how often
+both pick the same player; the index resolves more misspellings through
+its phonetic keys, so it rarely reaches 100% on large rosters.
+"""
+import argparse
+import random
+import time
+from typing import Dict, List, Optional
+
+from backend.services.command_parser import resolve_name
+from backend.services.roster_index import RosterIndex
+
+SYLLABLES = ["ka", "lo", "win", "ston", "to", "my", "le", "o", "ga", "n", "ri", "ley", "fin", "ar", "the", "mar", "tin", "jo", "el", "sam"]
+NON_NAMES = ["Lovely", "Quick", "Ref", "Keeper", "Back", "Post"]
+
+
+def build_roster(size: int, rng: random.Random) -> List[Dict]:
+    names = set()
+    while len(names) < size:
+        names.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize())
+    return [{"id": i, "name": n, "position": None} for i, n in enumerate(sorted(names))]
+
+
+def misspell(name: str, rng: random.Random) -> str:
+    i = rng.randrange(1, len(name))
+    edit = rng.choice(["drop", "swap", "double"])
+    if edit == "drop":
+        return name[:i] + name[i + 1:]
+    if edit == "double":
+        return name[:i] + name[i] + name[i:]
+    return name[:i] + rng.choice("aeiouy") + name[i + 1:]
+
+
+def build_commands(roster: List[Dict], n: int, rng: random.Random) -> List[List[str]]:
+    commands = []
+    for _ in range(n):
+        name = rng.choice(roster)["name"]
+        player = name if rng.random() < 0.6 else misspell(name, rng)
+        tokens = [player]
+        if rng.random() < 0.3:
+            tokens.insert(0, rng.choice(NON_NAMES))
+        commands.append(tokens)
+    return commands
+
+
+def legacy_resolve(tokens: List[str], roster: List[Dict]) -> Optional[int]:
+    """What parse_transcript + parse_with_db did before RosterIndex."""
+    names = [p["name"] for p in roster]
+    for tok in tokens:
+        resolved = resolve_name(tok, names)
+        if resolved:
+            for p in roster:
+                if p["name"] == resolved:
+                    return p["id"]
+    return None
+
+
+def index_resolve(tokens: List[str], index: RosterIndex) -> Optional[int]:
+    match = index.resolve_first(tokens)
+    return match.player["id"] if match else None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 100, 500, 2000])
+    parser.add_argument("--transcripts", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(
+        f"{'roster':>7}{'build ms':>10}{'legacy us':>11}{'index us':>10}{'speedup':>9}"
+        f"{'agree':>8}{'legacy hit':>12}{'index hit':>11}"
+    )
+    for size in args.sizes:
+        rng = random.Random(size)
+        roster = build_roster(size, rng)
+        commands = build_commands(roster, args.transcripts, rng)
+
+        start = time.perf_counter()
+        index = RosterIndex(roster)
+        build = time.perf_counter() - start
+        index.resolve_all(["Warm", "Up"])  # first cdist call pays a one-off setup cost
+
+        start = time.perf_counter()
+        legacy = [legacy_resolve(tokens, roster) for tokens in commands]
+        legacy_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        indexed = [index_resolve(tokens, index) for tokens in commands]
+        index_s = time.perf_counter() - start
+
+        n = len(commands)
+        agree = sum(a == b for a, b in zip(legacy, indexed)) / n
+        legacy_hit = sum(r is not None for r in legacy) / n
+        index_hit = sum(r is not None for r in indexed) / n
+        print(
+            f"{size:>7}{1000 * build:>10.2f}{1e6 * legacy_s / n:>11.1f}"
+            f"{1e6 * index_s / n:>10.1f}{legacy_s / index_s:>8.1f}x{agree:>8.1%}"
+            f"{legacy_hit:>12.1%}{index_hit:>11.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
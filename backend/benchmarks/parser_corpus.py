@@ -0,0 +1,146 @@
+# backend/benchmarks/parser_corpus.py
+"""
+Generated corpus of touchline transcripts for the command-parser benchmarks.
+
+Each sample is a transcript the way it comes out of ASR, with the labels it
+was generated from:
+
+    {"text": "uh Goal Wynston 12th minute", "intent": "goal",
+     "player": "Winston", "token": "Wynston", "minute": 12}
+
+Noise mirrors what the mics pick up: filler words, misspelled names,
+lower-cased names, spoken minute formats ("minute 12", "12 mins", "12'",
+"34th minute") and chatter with no command in it. Everything is driven by
+a seeded Random, so a (size, seed) pair always produces the same corpus.
+"""
+import random
+from typing import Dict, List, Optional
+
+from backend.services.command_parser import _STOPWORDS as STOPWORDS
+
+FIRST_NAMES = [
+    "Winston", "Tommy", "Logan", "Leo", "Alex", "Kip", "Tom", "Martin", "Quinn", "Finley",
+    "Riley", "Jordan", "Sam", "Joel", "Marcus", "Theo", "Oscar", "Harvey", "Kai", "Reuben",
+    "Noah", "Ellis", "Zane", "Callum", "Isaac", "Jude", "Owen", "Ezra", "Milo", "Rowan",
+]
+# Extra names for large (club-wide) rosters
+SYLLABLES = ["ka", "lo", "win", "ston", "to", "my", "le", "o", "ga", "n", "ri", "ley", "fin", "ar", "the", "mar", "tin", "jo", "el", "sam"]
+
+# (template, intent); {name} is the spoken player name, {minute} a minute
+# phrase or nothing
+TEMPLATES = [
+    ("Goal {name}{minute}", "goal"),
+    ("{name} scores{minute}", "goal"),
+    ("{name} shoots and scores{minute}", "goal"),
+    ("Great save {name}{minute}", "save"),
+    ("Save by {name}{minute}", "save"),
+    ("Tackle {name}{minute}", "tackle"),
+    ("Good tackle from {name}{minute}", "tackle"),
+    ("{name} takes a shot{minute}", "shot"),
+    ("{name} shoots, on target{minute}", "shot"),
+    ("Pass from {name}{minute}", "pass"),
+    ("Sub {name} out{minute}", "sub"),
+    ("Substitute {name} off{minute}", "sub"),
+    ("Foul on {name}{minute}", "foul"),
+    ("Foul, {name} brought down{minute}", "foul"),
+    ("Assist {name}, lovely ball{minute}", "assist"),
+    ("Assist to {name}{minute}", "assist"),
+    ("Corner to us, {name} to take it{minute}", "corner"),
+    # Inflected and paraphrased, as coaches actually say them
+    ("{name} saves it{minute}", "save"),
+    ("{name} tackles the winger{minute}", "tackle"),
+    ("{name} passes to the left back{minute}", "pass"),
+    ("{name} was fouled{minute}", "foul"),
+    ("Shots from {name}{minute}", "shot"),
+    ("{name} missed the target{minute}", "shot"),
+    ("{name} assisted that one{minute}", "assist"),
+    ("Corners for us, {name} takes them{minute}", "corner"),
+]
+CHATTER = [
+    "Well done {name}, keep it going",
+    "Come on lads",
+    "{name} talk to each other",
+    "Unlucky {name}",
+    "Ref that's never a throw",
+    "Keep the shape",
+]
+FILLERS = ["uh", "um", "right", "okay", "so", "yeah"]
+MINUTE_FORMATS = [" minute {m}", " {m} mins", " {m}'", " {nth} minute", " min {m}"]
+
+CHATTER_RATE = 0.08
+FILLER_RATE = 0.2
+MISSPELL_RATE = 0.25
+LOWERCASE_RATE = 0.05
+MINUTE_RATE = 0.6
+
+
+def build_roster(size: int, seed: int = 0) -> List[str]:
+    """
+    `size` distinct single-word player names (what the coach shouts):
+    common first names, then made-up ones for large rosters.
+    """
+    rng = random.Random(seed)
+    names = list(FIRST_NAMES[:size])
+    seen = {n.lower() for n in names}
+    while len(names) < size:
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+        if name.lower() not in seen and name.lower() not in STOPWORDS:
+            seen.add(name.lower())
+            names.append(name)
+    return names
+
+
+def ordinal(n: int) -> str:
+    suffix = "th" if 10 <= n % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return f"{n}{suffix}"
+
+
+def misspell(word: str, rng: random.Random) -> str:
+    """One ASR-style edit: a dropped, doubled or swapped letter, or a vowel change."""
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    edit = rng.choice(["drop", "double", "swap", "vowel"])
+    if edit == "drop":
+        return word[:i] + word[i + 1:]
+    if edit == "double":
+        return word[:i] + word[i] + word[i:]
+    if edit == "swap":
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word[:i] + rng.choice("aeiouy") + word[i + 1:]
+
+
+def _spoken_name(name: str, rng: random.Random) -> str:
+    word = name
+    if rng.random() < MISSPELL_RATE:
+        word = misspell(word, rng)
+    if rng.random() < LOWERCASE_RATE:
+        word = word.lower()
+    return word
+
+
+def generate_sample(roster: List[str], rng: random.Random) -> Dict:
+    name = rng.choice(roster)
+    token = _spoken_name(name, rng)
+    minute: Optional[int] = None
+
+    if rng.random() < CHATTER_RATE:
+        text = rng.choice(CHATTER).format(name=token)
+        intent, player = "unknown", None
+    else:
+        template, intent = rng.choice(TEMPLATES)
+        minute_phrase = ""
+        if rng.random() < MINUTE_RATE:
+            minute = rng.randint(1, 90)
+            minute_phrase = rng.choice(MINUTE_FORMATS).format(m=minute, nth=ordinal(minute))
+        text = template.format(name=token, minute=minute_phrase)
+        player = name
+
+    if rng.random() < FILLER_RATE:
+        text = f"{rng.choice(FILLERS)} {text}"
+    return {"text": text, "intent": intent, "player": player, "token": token, "minute": minute}
+
+
+def generate_corpus(n: int, roster: List[str], seed: int = 0) -> List[Dict]:
+    rng = random.Random(seed)
+    return [generate_sample(roster, rng) for _ in range(n)]
@@ -0,0 +1,167 @@
+# backend/crud/events.py
+import json
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend import models
+
+# Checks and insert in one statement: rows whose match is missing, or whose
+# player is not in the match team, are filtered out by the join instead of
+# being looked up one by one beforehand, and rows whose client_event_id is
+# already stored for the match are skipped by ON CONFLICT. Columns arrive
+# as arrays (one parameter each, whatever the row count); ORDER BY keeps
+# ids in row order.
+_INSERT_EVENTS = text("""
+    INSERT INTO events (match_id, minute, event_type, team_context, player_id, raw_text, meta_json, client_event_id)
+    SELECT v.match_id, v.minute, v.event_type, v.team_context, v.player_id, v.raw_text, v.meta_json, v.client_event_id
+    FROM unnest(
+        CAST(:match_ids AS bigint[]),
+        CAST(:minutes AS bigint[]),
+        CAST(:event_types AS varchar[]),
+        CAST(:team_contexts AS varchar[]),
+        CAST(:player_ids AS bigint[]),
+        CAST(:raw_texts AS text[]),
+        CAST(:meta_jsons AS jsonb[]),
+        CAST(:client_event_ids AS varchar[])
+    ) WITH ORDINALITY AS v(match_id, minute, event_type, team_context, player_id, raw_text, meta_json, client_event_id, n)
+    JOIN matches m ON m.id = v.match_id
+    LEFT JOIN players p ON p.id = v.player_id
+    WHERE v.player_id IS NULL OR p.team_id = m.team_id
+    ORDER BY v.n
+    ON CONFLICT (match_id, client_event_id) DO NOTHING
+    RETURNING id
+""")
+
+# A transcript with several commands stores "<key>", "<key>#2", "<key>#3", ...
+CLIENT_EVENT_ID_MAX = 60
+_CLIENT_KEY_SEP = "#"
+
+
+class EventRejected(Exception):
+    """An event failed the match/player checks; maps straight to an HTTP error."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+async def insert_events(session: AsyncSession, rows: List[Dict]) -> List[int]:
+    """
+    Insert event rows ({"match_id", "minute", "event_type", "team_context",
+    "player_id", "raw_text", "meta_json", "client_event_id"}) in one round
+    trip, skipping any whose match does not exist, whose player is not in
+    the match team or whose client_event_id the match already has.
+    Returns the new ids in row order; fewer ids than rows means some were
+    skipped (roll back if that should fail the whole write).
+    """
+    if not rows:
+        return []
+    result = await session.execute(_INSERT_EVENTS, {
+        "match_ids": [r["match_id"] for r in rows],
+        "minutes": [r["minute"] for r in rows],
+        "event_types": [r["event_type"] for r in rows],
+        "team_contexts": [r.get("team_context") or "us" for r in rows],
+        "player_ids": [r.get("player_id") for r in rows],
+        "raw_texts": [r.get("raw_text") for r in rows],
+        "meta_jsons": [json.dumps(r["meta_json"]) if r.get("meta_json") is not None else None for r in rows],
+        "client_event_ids": [r.get("client_event_id") for r in rows],
+    })
+    # Sequence values follow insertion order
+    return sorted(result.scalars().all())
+
+
+async def _ref_teams(session: AsyncSession, match_id: int, player_id: Optional[int]):
+    match_team = select(models.Match.team_id).where(models.Match.id == match_id).scalar_subquery()
+    player_team = select(models.Player.team_id).where(models.Player.id == player_id).scalar_subquery()
+    return (await session.execute(select(match_team, player_team))).one()
+
+
+def _rejection(match_team_id: Optional[int], player_id: Optional[int], player_team_id: Optional[int]) -> EventRejected:
+    if match_team_id is None:
+        return EventRejected(404, "Match not found")
+    if player_id is not None and player_team_id is None:
+        return EventRejected(404, "Player not found")
+    return EventRejected(400, "Player must belong to the match team")
+
+
+async def explain_rejected_event(session: AsyncSession, match_id: int, player_id: Optional[int] = None) -> EventRejected:
+    """Why insert_events skipped this row: 404 for a missing match or player, else 400."""
+    match_team_id, player_team_id = await _ref_teams(session, match_id, player_id)
+    return _rejection(match_team_id, player_id, player_team_id)
+
+
+async def check_event_refs(session: AsyncSession, match_id: int, player_id: Optional[int] = None) -> None:
+    """The checks insert_events makes, up front (one query): raises EventRejected."""
+    match_team_id, player_team_id = await _ref_teams(session, match_id, player_id)
+    if match_team_id is None or (player_id is not None and player_team_id != match_team_id):
+        raise _rejection(match_team_id, player_id, player_team_id)
+
+
+def check_client_event_id(client_event_id: Optional[str]) -> None:
+    if client_event_id is not None and (
+        not client_event_id
+        or len(client_event_id) > CLIENT_EVENT_ID_MAX
+        or _CLIENT_KEY_SEP in client_event_id
+    ):
+        raise EventRejected(
+            400, f"client_event_id must be 1-{CLIENT_EVENT_ID_MAX} characters without '{_CLIENT_KEY_SEP}'"
+        )
+
+
+def client_event_keys(client_event_id: Optional[str], count: int) -> List[Optional[str]]:
+    """Per-event keys for the `count` events of one transcript."""
+    if client_event_id is None:
+        return [None] * count
+    return [client_event_id] + [f"{client_event_id}{_CLIENT_KEY_SEP}{n}" for n in range(2, count + 1)]
+
+
+def event_row(event: models.Event) -> Dict:
+    return {
+        "id": event.id,
+        "match_id": event.match_id,
+        "minute": event.minute,
+        "event_type": event.event_type,
+        "team_context": event.team_context,
+        "player_id": event.player_id,
+        "raw_text": event.raw_text,
+        "meta_json": event.meta_json,
+        "client_event_id": event.client_event_id,
+    }
+
+
+async def find_client_events(session: AsyncSession, match_id: int, keys: List[str]) -> Dict[str, List[Dict]]:
+    """Rows already stored under each client key (all events of its transcript, in order)."""
+    if not keys:
+        return {}
+    base_key = func.split_part(models.Event.client_event_id, _CLIENT_KEY_SEP, 1)
+    result = await session.scalars(
+        select(models.Event)
+        .where(models.Event.match_id == match_id, base_key.in_(keys))
+        .order_by(models.Event.id)
+    )
+    found: Dict[str, List[Dict]] = {}
+    for event in result:
+        found.setdefault(event.client_event_id.split(_CLIENT_KEY_SEP)[0], []).append(event_row(event))
+    return found
+
+
+async def create_event(session: AsyncSession, row: Dict) -> Dict:
+    """
+    Insert one event and commit; the row with its new id, or EventRejected.
+    A repeated client_event_id returns the row stored the first time.
+    """
+    key = row.get("client_event_id")
+    check_client_event_id(key)
+    ids = await insert_events(session, [row])
+    if not ids:
+        await session.rollback()
+        if key is not None:
+            existing = (await find_client_events(session, row["match_id"], [key])).get(key)
+            if existing:
+                return existing[0]
+        raise await explain_rejected_event(session, row["match_id"], row.get("player_id"))
+    await session.commit()
+    return {**row, "id": ids[0]}
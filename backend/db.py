@@ -3,12 +3,31 @@ from typing import AsyncIterator
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
+from .services.pool_metrics import InstrumentedPool, instrument_pool
 from .settings import get_settings
 
 # Use ASYNC_DB_URL for runtime
 def get_engine() -> AsyncEngine:
     settings = get_settings()
-    return create_async_engine(settings.ASYNC_DB_URL, echo=False, future=True)
+    engine = create_async_engine(
+        settings.ASYNC_DB_URL,
+        echo=False,
+        future=True,
+        poolclass=InstrumentedPool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        connect_args={
+            # SQLAlchemy's prepared statement cache and asyncpg's own
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        },
+    )
+    # Per-route hold times, see GET /metrics/db-pool
+    instrument_pool(engine.sync_engine.pool)
+    return engine
 
 # Global engine + session factory
 async_engine: AsyncEngine = get_engine()
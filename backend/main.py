@@ -2,26 +2,88 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
+import asyncio
 import logging
 import time
 
 # Import routers
-from backend.api import matches, stats, players, teams, events, clubs, dev, ws, transcribe, transcribe_dummy
+from backend.api import matches, stats, players, teams, events, clubs, dev, ws, transcribe, transcribe_dummy, recordings, metrics
+from backend.services.event_buffer import get_event_buffer
+from backend.services.jobs import get_job_queue, run_job_worker
+from backend.services.pool_metrics import track_request
+from backend.services.transcription import get_transcription_executor, shutdown_transcription_executor
+from backend.settings import get_settings
+from backend.ws_manager import ws_manager
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+async def push_finished_jobs(max_backoff: float = 30.0):
+    """Forward finished transcription jobs to the match's WebSocket subscribers"""
+    backoff = 1.0
+    while True:
+        try:
+            async for job in get_job_queue().listen():
+                backoff = 1.0
+                if job.get("match_id") is not None:
+                    await ws_manager.broadcast_event(job["match_id"], {"type": "transcription", "job": job})
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Redis restarted, network blip...; resubscribe instead of going quiet for good
+            logger.error(f"Finished-job listener failed, retrying in {backoff:.0f}s: {e}")
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, max_backoff)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings = get_settings()
+    executor = get_transcription_executor()
+    tasks = []
+    if settings.TRANSCRIBE_PRELOAD:
+        # Load and warm up the Whisper workers in the background: liveness is
+        # green immediately, /transcribe/health/ready flips once this finishes
+        tasks.append(asyncio.create_task(executor.warmup()))
+    else:
+        executor.ready = True  # lazy mode, first request loads the model
+
+    if settings.EVENT_WRITE_MODE == "buffered":
+        # Replays whatever an earlier run journaled but did not store
+        await get_event_buffer().start()
+
+    tasks.append(asyncio.create_task(push_finished_jobs()))
+    if settings.TRANSCRIBE_JOB_QUEUE == "memory":
+        # No standalone workers in this mode; consume jobs in-process
+        queue = get_job_queue()
+        tasks.extend(
+            asyncio.create_task(run_job_worker(queue))
+            for _ in range(max(1, settings.TRANSCRIBE_JOB_CONCURRENCY))
+        )
+    yield
+    for task in tasks:
+        task.cancel()
+    await get_job_queue().close()
+    if settings.EVENT_WRITE_MODE == "buffered":
+        await get_event_buffer().stop()
+    # Stop the Whisper worker processes with the app
+    shutdown_transcription_executor()
+
+
 app = FastAPI(
     title="Football Voice App API",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Add request logging middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     start_time = time.time()
-    
+    track_request(request.scope)  # pool hold times per route
+
     # Log request
     logger.info(
         f"📥 {request.method} {request.url.path} - Client: {request.client.host if request.client else 'unknown'}"
@@ -62,6 +124,8 @@ app.include_router(clubs.router, tags=["Clubs"])
 app.include_router(dev.router, tags=["Dev"])
 app.include_router(ws.router, tags=["WebSockets"])  # only if you want it active
 app.include_router(transcribe.router, tags=["Transcription"])
+app.include_router(recordings.router, tags=["Recordings"])
+app.include_router(metrics.router, tags=["Metrics"])
 app.include_router(transcribe_dummy.router, tags=["Dummy Transcription"])  # ✅ NEW
 
 # Run the application
@@ -0,0 +1,29 @@
+"""event client ids
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("events", sa.Column("client_event_id", sa.String(64), nullable=True))
+    # NULLs never conflict, so events without a client id are unaffected
+    op.create_index(
+        "uq_events_match_client_event", "events", ["match_id", "client_event_id"], unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_events_match_client_event", table_name="events")
+    op.drop_column("events", "client_event_id")
@@ -0,0 +1,24 @@
+"""event timeline index
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keyset pagination of GET /match/{match_id}: WHERE match_id = ? AND (minute, id) > (?, ?)
+    op.create_index("ix_events_match_minute_id", "events", ["match_id", "minute", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_events_match_minute_id", table_name="events")
@@ -0,0 +1,84 @@
+"""event versions and tombstones
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Every insert, update and delete of an event takes a value from event_seq
+# while holding a lock on its match row until commit. Writers to one match
+# are therefore serialized and its seq values become visible in increasing
+# order: a reader that has seen everything up to N never later finds a
+# committed change below N. Triggers rather than application code so the
+# raw INSERT ... SELECT, the bulk insert and the dev reset are all covered.
+_TOUCH = """
+CREATE FUNCTION events_touch() RETURNS trigger AS $$
+BEGIN
+    PERFORM 1 FROM matches WHERE id = NEW.match_id FOR NO KEY UPDATE;
+    NEW.seq := nextval('event_seq');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+
+_TOMBSTONE = """
+CREATE FUNCTION events_tombstone() RETURNS trigger AS $$
+BEGIN
+    PERFORM 1 FROM matches WHERE id = OLD.match_id FOR NO KEY UPDATE;
+    INSERT INTO event_tombstones (event_id, match_id, seq)
+    VALUES (OLD.id, OLD.match_id, nextval('event_seq'));
+    RETURN OLD;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE event_seq")
+    op.add_column("events", sa.Column("seq", sa.BigInteger, nullable=True))
+    op.execute("UPDATE events SET seq = nextval('event_seq')")
+    op.alter_column("events", "seq", nullable=False)
+    op.create_index("ix_events_match_seq", "events", ["match_id", "seq"])
+
+    op.create_table(
+        "event_tombstones",
+        sa.Column("event_id", sa.BigInteger, primary_key=True),
+        sa.Column("match_id", sa.BigInteger, sa.ForeignKey("matches.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("seq", sa.BigInteger, nullable=False),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_event_tombstones_match_seq", "event_tombstones", ["match_id", "seq"])
+
+    op.execute(_TOUCH)
+    op.execute(_TOMBSTONE)
+    op.execute(
+        "CREATE TRIGGER events_touch BEFORE INSERT OR UPDATE ON events "
+        "FOR EACH ROW EXECUTE FUNCTION events_touch()"
+    )
+    op.execute(
+        "CREATE TRIGGER events_tombstone AFTER DELETE ON events "
+        "FOR EACH ROW EXECUTE FUNCTION events_tombstone()"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER events_tombstone ON events")
+    op.execute("DROP TRIGGER events_touch ON events")
+    op.execute("DROP FUNCTION events_tombstone()")
+    op.execute("DROP FUNCTION events_touch()")
+    op.drop_index("ix_event_tombstones_match_seq", table_name="event_tombstones")
+    op.drop_table("event_tombstones")
+    op.drop_index("ix_events_match_seq", table_name="events")
+    op.drop_column("events", "seq")
+    op.execute("DROP SEQUENCE event_seq")
@@ -3,6 +3,7 @@ from datetime import datetime
 from typing import Optional
 
 from sqlalchemy import (
+    FetchedValue,
     ForeignKey,
     String,
     Text,
@@ -69,8 +70,9 @@ class Player(Base):
     __tablename__ = "players"
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    # active_history: the roster cache needs the old team when a player moves
     team_id: Mapped[int] = mapped_column(
-        ForeignKey("teams.id"), nullable=False, index=True
+        ForeignKey("teams.id"), nullable=False, index=True, active_history=True
     )
     name: Mapped[str] = mapped_column(String(200), nullable=False)
     position: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
@@ -119,6 +121,13 @@ class Event(Base):
     )
     raw_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     meta_json: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
+    # Client-generated key (e.g. a UUID) so retried uploads don't duplicate events
+    client_event_id: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    # Per-match change version, set by the events_touch trigger (migration
+    # 0004) on every insert and update; tombstones take them for deletes
+    seq: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default=FetchedValue(), server_onupdate=FetchedValue()
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
@@ -127,6 +136,20 @@ class Event(Base):
     player: Mapped[Optional["Player"]] = relationship("Player", back_populates="events")
 
 
+class EventTombstone(Base):
+    """A deleted event, so incremental readers (?since=) learn about it."""
+    __tablename__ = "event_tombstones"
+
+    event_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    match_id: Mapped[int] = mapped_column(
+        ForeignKey("matches.id", ondelete="CASCADE"), nullable=False
+    )
+    seq: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
 class RawEvent(Base):
     __tablename__ = "raw_events"
 
@@ -173,6 +196,10 @@ class StatsCache(Base):
 
 # --- Indexes -----------------------------------------------------------------
 Index("ix_events_match_id", Event.match_id)
+Index("ix_events_match_minute_id", Event.match_id, Event.minute, Event.id)  # timeline pages
+Index("ix_events_match_seq", Event.match_id, Event.seq)
+Index("ix_event_tombstones_match_seq", EventTombstone.match_id, EventTombstone.seq)
+Index("uq_events_match_client_event", Event.match_id, Event.client_event_id, unique=True)
 Index("ix_raw_events_match_id", RawEvent.match_id)
 Index("ix_players_team_id", Player.team_id)
 Index("ix_matches_team_id", Match.team_id)
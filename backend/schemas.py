@@ -116,16 +116,24 @@ class LineupOut(BaseModel):
 class EventIn(BaseModel):
     match_id: int                     # <-- add this
     minute: int = Field(ge=0)
-    event_type: str
-    team_context: str = Field(default="us")
+    event_type: str = Field(max_length=100)
+    team_context: str = Field(default="us", max_length=20)
     player_id: Optional[int] = None
     raw_text: Optional[str] = None
     meta_json: Optional[dict] = None
+    client_event_id: Optional[str] = Field(default=None, max_length=64)  # retries with the same id don't duplicate
 
 
 
 class RawTextIn(BaseModel):
     raw_text: str
+    client_event_id: Optional[str] = None
+
+
+class RawTextBatchIn(BaseModel):
+    items: List[RawTextIn]
+    # Minute for commands that don't say one; without it they are item errors
+    default_minute: Optional[int] = Field(default=None, ge=0)
 
 
 class EventOut(BaseModel):
@@ -137,11 +145,19 @@ class EventOut(BaseModel):
     player_id: Optional[int] = None
     raw_text: Optional[str] = None
     meta_json: Optional[dict] = None
+    client_event_id: Optional[str] = None
 
     class Config:
         orm_mode = True
 
 
+class EventChangesOut(BaseModel):
+    events: List[EventOut]  # created or updated since the given version, oldest change first
+    deleted: List[int]      # ids of events deleted since then
+    version: int            # pass as ?since= next time
+    more: bool              # version is partial; ask again straight away
+
+
 # ----------- SUMMARIES & STATS -----------
 class MatchSummary(BaseModel):
     id: int
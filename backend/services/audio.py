@@ -0,0 +1,175 @@
+# backend/services/audio.py
+"""
+In-memory audio decoding.
+
+Uploads are piped straight into an ffmpeg subprocess and come back as the
+16 kHz mono float32 array Whisper expects, without touching the disk.
+"""
+import asyncio
+import logging
+import os
+import tempfile
+from typing import AsyncIterator, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+CHUNK_SIZE = 64 * 1024
+
+# MP4/M4A files written with the moov atom at the end cannot be demuxed
+# from a pipe; those are kept in memory so we can fall back to a seekable file.
+_NEEDS_SEEKABLE_FALLBACK = {"audio/m4a", "audio/mp4"}
+
+
+class AudioTooLarge(Exception):
+    """Raised as soon as the streamed upload exceeds the size limit."""
+
+
+class AudioDecodeError(Exception):
+    """Raised when ffmpeg cannot decode the input."""
+
+
+def _ffmpeg_args(source: str) -> list:
+    # -nostdin only when stdin is not the input itself
+    interactive = [] if source == "pipe:0" else ["-nostdin"]
+    return [
+        "ffmpeg", *interactive, "-threads", "0",
+        "-i", source,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE),
+        "-loglevel", "error",
+        "pipe:1",
+    ]
+
+
+def pcm16_to_float32(data, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Convert little-endian 16-bit PCM to float32 in [-1, 1] at 16 kHz."""
+    if sample_rate <= 0:
+        raise ValueError(f"Invalid sample rate: {sample_rate}")
+    samples = np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+    if sample_rate != SAMPLE_RATE and samples.size:
+        # Linear resampling is plenty for speech going into Whisper
+        n_out = int(round(samples.size * SAMPLE_RATE / sample_rate))
+        x_old = np.linspace(0.0, 1.0, samples.size, endpoint=False)
+        x_new = np.linspace(0.0, 1.0, n_out, endpoint=False)
+        samples = np.interp(x_new, x_old, samples).astype(np.float32)
+    return samples
+
+
+async def iter_upload(file, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Yield an UploadFile's content in fixed-size chunks."""
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+async def decode_stream(
+    chunks: AsyncIterator[bytes],
+    max_bytes: int,
+    content_type: Optional[str] = None,
+) -> np.ndarray:
+    """
+    Pipe `chunks` into ffmpeg and return 16 kHz mono float32 samples.
+
+    The size limit is checked chunk by chunk; AudioTooLarge is raised (and
+    ffmpeg killed) the moment it is exceeded.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *_ffmpeg_args("pipe:0"),
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout_task = asyncio.create_task(proc.stdout.read())
+    stderr_task = asyncio.create_task(proc.stderr.read())
+    keep_copy = content_type in _NEEDS_SEEKABLE_FALLBACK
+    copy = bytearray() if keep_copy else None
+
+    total = 0
+    try:
+        async for chunk in chunks:
+            total += len(chunk)
+            if total > max_bytes:
+                raise AudioTooLarge(f"Audio exceeds {max_bytes} bytes")
+            if copy is not None:
+                copy.extend(chunk)
+            try:
+                proc.stdin.write(chunk)
+                await proc.stdin.drain()
+            except (BrokenPipeError, ConnectionResetError):
+                # ffmpeg gave up early; its exit code and stderr tell us why
+                break
+        proc.stdin.close()
+        pcm = await stdout_task
+        err = await stderr_task
+        returncode = await proc.wait()
+    except BaseException:
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        stdout_task.cancel()
+        stderr_task.cancel()
+        raise
+
+    if returncode != 0:
+        message = err.decode(errors="replace").strip()
+        if copy is not None:
+            logger.info("Pipe decode failed for MP4 input, retrying from a seekable file")
+            return await _decode_seekable(bytes(copy))
+        raise AudioDecodeError(message or f"ffmpeg exited with code {returncode}")
+
+    return pcm16_to_float32(pcm)
+
+
+async def _decode_seekable(data: bytes) -> np.ndarray:
+    """Fallback for containers that need random access (moov-at-end MP4)."""
+    fd, path = tempfile.mkstemp(suffix=".m4a")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        proc = await asyncio.create_subprocess_exec(
+            *_ffmpeg_args(path),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        pcm, err = await proc.communicate()
+        if proc.returncode != 0:
+            raise AudioDecodeError(err.decode(errors="replace").strip())
+        return pcm16_to_float32(pcm)
+    finally:
+        os.unlink(path)
+
+
+async def iter_decoded_windows(path: str, window_seconds: float) -> AsyncIterator[np.ndarray]:
+    """
+    Decode a file on disk and yield 16 kHz float32 windows of
+    `window_seconds`, for recordings too long to hold in memory at once.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *_ffmpeg_args(path),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stderr_task = asyncio.create_task(proc.stderr.read())
+    window_bytes = int(window_seconds * SAMPLE_RATE) * 2
+    try:
+        while True:
+            try:
+                pcm = await proc.stdout.readexactly(window_bytes)
+            except asyncio.IncompleteReadError as e:
+                pcm = e.partial
+            if pcm:
+                yield pcm16_to_float32(pcm)
+            if len(pcm) < window_bytes:
+                break
+        err = await stderr_task
+        if await proc.wait() != 0:
+            raise AudioDecodeError(err.decode(errors="replace").strip() or "ffmpeg failed")
+    finally:
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        stderr_task.cancel()
@@ -0,0 +1,117 @@
+# backend/services/batching.py
+"""
+Dynamic micro-batching in front of the transcription pool.
+
+Voice commands are 1-5 s long and tend to arrive in bursts. Instead of one
+pool job per clip, requests are held for up to `max_wait_ms` (or until
+`max_batch_size` are waiting) and decoded together in one batched Whisper
+pass. Each caller still awaits its own result.
+"""
+import asyncio
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.services.audio import SAMPLE_RATE
+from backend.services.transcription import TranscriptionExecutor, get_transcription_executor
+from backend.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Whisper's fixed input window; longer clips cannot share a batch
+MAX_BATCH_CLIP_SAMPLES = 30 * SAMPLE_RATE
+
+
+class _Bucket:
+    """Requests waiting to be decoded with identical options."""
+
+    def __init__(self, options: Dict[str, Any]):
+        self.options = options
+        self.items: List[Tuple[np.ndarray, asyncio.Future]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class MicroBatcher:
+    def __init__(self, executor: TranscriptionExecutor, max_batch_size: int, max_wait_ms: float):
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._buckets: Dict[str, _Bucket] = {}
+        self.batches = 0
+        self.batched_requests = 0
+
+    async def transcribe(self, audio: np.ndarray, **options: Any) -> Dict[str, Any]:
+        """Transcribe one clip, sharing a decode pass with concurrent requests."""
+        if self.max_batch_size <= 1 or audio.size > MAX_BATCH_CLIP_SAMPLES:
+            return await self.executor.submit(audio, **options)
+
+        key = json.dumps(options, sort_keys=True, default=str)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket(options)
+
+        fut = asyncio.get_running_loop().create_future()
+        bucket.items.append((audio, fut))
+
+        if len(bucket.items) >= self.max_batch_size:
+            self._flush(key)
+        elif bucket.timer is None:
+            bucket.timer = asyncio.get_running_loop().call_later(
+                self.max_wait_ms / 1000.0, self._flush, key
+            )
+        return await fut
+
+    def _flush(self, key: str) -> None:
+        bucket = self._buckets.pop(key, None)
+        if bucket is None or not bucket.items:
+            return
+        if bucket.timer is not None:
+            bucket.timer.cancel()
+        asyncio.get_running_loop().create_task(self._run(bucket))
+
+    async def _run(self, bucket: _Bucket) -> None:
+        audios = [audio for audio, _ in bucket.items]
+        futures = [fut for _, fut in bucket.items]
+        self.batches += 1
+        self.batched_requests += len(audios)
+        try:
+            if len(audios) == 1:
+                results = [await self.executor.submit(audios[0], **bucket.options)]
+            else:
+                results = await self.executor.submit_batch(audios, **bucket.options)
+        except Exception as e:
+            for fut in futures:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        for fut, result in zip(futures, results):
+            if not fut.done():
+                fut.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "batches": self.batches,
+            "batched_requests": self.batched_requests,
+            "avg_batch_size": round(self.batched_requests / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+# Singleton instance
+_batcher: Optional[MicroBatcher] = None
+
+
+def get_transcription_batcher() -> MicroBatcher:
+    """Get the process-wide micro-batcher."""
+    global _batcher
+    if _batcher is None:
+        settings = get_settings()
+        _batcher = MicroBatcher(
+            get_transcription_executor(),
+            max_batch_size=settings.TRANSCRIBE_BATCH_MAX_SIZE,
+            max_wait_ms=settings.TRANSCRIBE_BATCH_WAIT_MS,
+        )
+    return _batcher
@@ -1,20 +1,22 @@
 # backend/services/command_parser.py
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import re
 from rapidfuzz import process, fuzz
-from backend.crud.players import get_team_roster
+from backend.services.lineups import get_lineup_tracker
+from backend.services.roster_cache import get_roster_cache
+from backend.services.roster_index import RosterIndex
 
 # Intent keywords (expandable)
 INTENT_KEYWORDS = {
-    "goal": ["goal", "scored", "scores"],
-    "save": ["save", "saved"],
-    "tackle": ["tackle", "tackled"],
-    "pass": ["pass", "passed", "completion"],
-    "shot": ["shot", "shoots", "miss", "on target"],
+    "goal": ["goal", "goals", "scored", "scores"],
+    "save": ["save", "saves", "saved"],
+    "tackle": ["tackle", "tackles", "tackled"],
+    "pass": ["pass", "passes", "passed", "completion"],
+    "shot": ["shot", "shots", "shoots", "miss", "misses", "missed", "on target"],
     "sub": ["sub", "substitute", "in", "out"],
-    "corner": ["corner"],
-    "foul": ["foul"],
-    "assist": ["assist"],
+    "corner": ["corner", "corners"],
+    "foul": ["foul", "fouls", "fouled"],
+    "assist": ["assist", "assists", "assisted"],
 }
 
 # Lowercase stopwords that should not be mistaken as player names
@@ -26,11 +28,71 @@ _STOPWORDS = {
 }
 
 
+def _trie_pattern(words: List[str]) -> str:
+    """
+    Regex alternation for `words`, factored on shared prefixes
+    ("s(?:ave(?:d)?|core(?:d|s)|...)") so the engine never retries a prefix.
+    """
+    trie: Dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: Dict) -> str:
+        branches = [
+            (r"\s+" if ch == " " else re.escape(ch)) + emit(child)
+            for ch, child in sorted(node.items())
+            if ch
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(trie)
+
+
+def compile_intents(keywords: Dict[str, List[str]]) -> Tuple["re.Pattern", Dict[str, str]]:
+    """
+    Compile the keyword table into one whole-word pattern (applied to
+    lowercased text) plus a keyword -> intent lookup. Whole words only, so
+    "in" no longer fires inside "Winston"; multi-word keywords allow any
+    spacing.
+    """
+    lookup = {" ".join(w.lower().split()): intent for intent, words in keywords.items() for w in words}
+    return re.compile(r"\b" + _trie_pattern(list(lookup)) + r"\b"), lookup
+
+
+_INTENT_RE, _KEYWORD_INTENT = compile_intents(INTENT_KEYWORDS)
+
+
+def _keyword_intent(keyword: str) -> str:
+    intent = _KEYWORD_INTENT.get(keyword)
+    return intent if intent is not None else _KEYWORD_INTENT[" ".join(keyword.split())]
+
+
+def _lower(text: str) -> str:
+    lowered = text.lower()
+    # A few non-ASCII characters grow when lowercased; keep spans aligned
+    return lowered if len(lowered) == len(text) else "".join(c.lower()[0] for c in text)
+
+
+def match_intents(text: str) -> List[Tuple[str, Tuple[int, int]]]:
+    """Every intent keyword in `text`, in order, as (intent, (start, end)) pairs."""
+    return [(_keyword_intent(m.group()), m.span()) for m in _INTENT_RE.finditer(_lower(text))]
+
+
 def detect_intent(text: str) -> str:
     """Look for keywords in text and return the event type (e.g. goal, pass)."""
-    text_l = text.lower()
-    for intent, words in INTENT_KEYWORDS.items():
-        if any(w in text_l for w in words):
+    keywords = _INTENT_RE.findall(text.lower())
+    found = set(map(_KEYWORD_INTENT.get, keywords))
+    if None in found:  # multi-word keyword with unusual spacing
+        found = set(map(_keyword_intent, keywords))
+    # Same precedence as before: earlier INTENT_KEYWORDS entries win
+    for intent in INTENT_KEYWORDS:
+        if intent in found:
             return intent
     return "unknown"
 
@@ -43,6 +105,9 @@ def extract_minute(text: str) -> Optional[int]:
     m2 = re.search(r'\b(\d{1,2})(\'|\s*mins?)\b', text)
     if m2:
         return int(m2.group(1))
+    m3 = re.search(r'\b(\d{1,2})(st|nd|rd|th)\b', text, re.I)  # "34th minute"
+    if m3:
+        return int(m3.group(1))
     return None
 
 
@@ -68,22 +133,29 @@ def _capitalized_tokens(text: str) -> List[str]:
     return [t for t in tokens if t.lower() not in _STOPWORDS]
 
 
-def parse_transcript(text: str, roster: List[str], opponents: List[str] = []) -> Dict:
-    """Turn raw text into a structured event JSON."""
+def parse_transcript(
+    text: str,
+    roster: List[str],
+    opponents: List[str] = [],
+    roster_index: Optional[RosterIndex] = None,
+) -> Dict:
+    """
+    Turn raw text into a structured event JSON.
+    Pass a prebuilt `roster_index` (with player ids) instead of rebuilding
+    one from `roster`; its matches also fill in player_id + position.
+    """
+    index = roster_index if roster_index is not None else RosterIndex.from_names(roster)
+    return _parse_segment(text, index, opponents)
+
+
+def _parse_segment(text: str, index: RosterIndex, opponents: List[str]) -> Dict:
     intent = detect_intent(text)
     minute = extract_minute(text)
 
     # Candidate player tokens: single capitalized words not in stopwords
-    tokens = _capitalized_tokens(text)
-
-    player_raw: Optional[str] = None
-    player: Optional[str] = None
-    for tok in tokens:
-        resolved = resolve_name(tok, roster)
-        if resolved:
-            player_raw = tok
-            player = resolved
-            break
+    match = index.resolve_first(_capitalized_tokens(text))
+    player_raw = match.token if match else None
+    player = match.name if match else None
 
     opponent = None
     vs_match = re.search(r'vs\s+([A-Za-z][A-Za-z\s]+)', text, re.I)
@@ -92,7 +164,7 @@ def parse_transcript(text: str, roster: List[str], opponents: List[str] = []) ->
         maybe = resolve_name(opponent_raw, opponents) if opponents else None
         opponent = maybe or opponent_raw
 
-    return {
+    parsed = {
         "event_type": intent,
         "player": player,
         "player_raw": player_raw,
@@ -100,20 +172,184 @@ def parse_transcript(text: str, roster: List[str], opponents: List[str] = []) ->
         "opponent": opponent,
         "raw_text": text,
     }
+    if match and match.player.get("id") is not None:
+        parsed["player_id"] = match.player["id"]
+        parsed["position"] = match.player["position"]
+    return parsed
 
 
-async def parse_with_db(text: str, session, team_id: int, opponents: List[str] = []):
-    """Fetch roster from DB, parse transcript, and enrich with player_id + position."""
-    roster = await get_team_roster(session, team_id)  # [{"id","name","position"}, ...]
-    names = [p["name"] for p in roster]
-    parsed = parse_transcript(text, names, opponents)
+# Clause separators and intent keywords, found in one pass over the text
+_SEGMENT_RE = re.compile(
+    r"(?P<sep>[,;!?]|\.(?!\d)|\b(?:and\s+)?then\b)|(?P<kw>" + _INTENT_RE.pattern + ")"
+)
 
-    # Add player_id + position if matched
-    if parsed["player"]:
-        for p in roster:
-            if p["name"] == parsed["player"]:
-                parsed["player_id"] = p["id"]
-                parsed["position"] = p["position"]
-                break
 
-    return parsed
+def segment_transcript(text: str, roster_index: RosterIndex) -> List[Tuple[int, int]]:
+    """
+    Split a compound command into one (start, end) span per event.
+
+    Cuts are made at clause separators ("," "." "then") and at every intent
+    keyword after the first in a clause, then undone where the piece does
+    not stand on its own: a piece needs an intent, and either its own
+    player ("goal Winston | assist Logan") or a new intent in a new clause
+    ("save Tommy, | goal"). So "Leo shoots and scores" and "Sub Logan out"
+    stay one event each.
+    """
+    pieces: List[Tuple[int, int, bool]] = []  # (start, end, starts a clause)
+    start, new_clause, keyword_in_clause = 0, False, False
+    for m in _SEGMENT_RE.finditer(_lower(text)):
+        if m.lastgroup == "sep":
+            pieces.append((start, m.start(), new_clause))
+            start, new_clause, keyword_in_clause = m.end(), True, False
+        else:
+            if keyword_in_clause:
+                pieces.append((start, m.start(), new_clause))
+                start, new_clause = m.start(), False
+            keyword_in_clause = True
+    pieces.append((start, len(text), new_clause))
+
+    spans: List[List[int]] = []
+    intents: List[str] = []
+    for start, end, new_clause in pieces:
+        piece = text[start:end]
+        intent = detect_intent(piece)
+        stands_alone = bool(spans) and intent != "unknown" and intents[-1] != "unknown" and (
+            roster_index.resolve_first(_capitalized_tokens(piece)) is not None
+            or (new_clause and intent != intents[-1])
+        )
+        if spans and not stands_alone:
+            spans[-1][1] = end
+            intents[-1] = detect_intent(text[spans[-1][0]:end])
+        else:
+            spans.append([start, end])
+            intents.append(intent)
+    return [(start, end) for start, end in spans]
+
+
+def parse_events(
+    text: str,
+    roster: List[str],
+    opponents: List[str] = [],
+    roster_index: Optional[RosterIndex] = None,
+) -> List[Dict]:
+    """
+    Every event in a (possibly compound) command, each with its own intent,
+    player and minute. A minute said once applies to the events that don't
+    give their own ("goal Winston assist Logan 34th minute").
+    Pieces without a recognised intent are dropped.
+    """
+    index = roster_index if roster_index is not None else RosterIndex.from_names(roster)
+    events = []
+    for start, end in segment_transcript(text, index):
+        parsed = _parse_segment(text[start:end].strip(" ,;.!?"), index, opponents)
+        if parsed["event_type"] != "unknown":
+            events.append(parsed)
+
+    shared_minute = next((e["minute"] for e in events if e["minute"] is not None), None)
+    if shared_minute is None:
+        shared_minute = extract_minute(text)
+    for event in events:
+        if event["minute"] is None:
+            event["minute"] = shared_minute
+    return events
+
+
+def parse_transcripts(
+    texts: List[str],
+    roster: List[str],
+    opponents: List[str] = [],
+    roster_index: Optional[RosterIndex] = None,
+) -> List[List[Dict]]:
+    """
+    parse_events for many transcripts (e.g. an offline sync queue), sharing
+    one RosterIndex. An empty list means nothing could be parsed.
+    """
+    index = roster_index if roster_index is not None else RosterIndex.from_names(roster)
+    return [parse_events(text, index.names, opponents, roster_index=index) for text in texts]
+
+
+_SUB_ON = {"in", "on"}
+_SUB_OFF = {"out", "off"}
+
+
+def sub_changes(text: str, squad_index: RosterIndex) -> Dict[str, List[int]]:
+    """
+    Who a substitution brings on and takes off, as player ids resolved
+    against `squad_index` (the match lineup): "Leo in for Tom", "Sub Logan
+    out", "Kip off Alex on". A name without a direction is left out.
+    """
+    on: List[int] = []
+    off: List[int] = []
+    current: Optional[int] = None  # last named player, waiting for a direction
+    after_for = False
+    for word in re.findall(r"[A-Za-z]+", text):
+        lowered = word.lower()
+        if lowered == "for":
+            after_for = True
+        elif lowered in _SUB_ON or lowered in _SUB_OFF:
+            if current is not None:
+                (on if lowered in _SUB_ON else off).append(current)
+                current = None
+        elif word[0].isupper() and lowered not in _STOPWORDS:
+            match = squad_index.resolve_first([word])
+            if match is None or match.player.get("id") is None:
+                continue
+            if after_for:
+                # "... in for Tom": Tom comes off
+                off.append(match.player["id"])
+                after_for = False
+            else:
+                current = match.player["id"]
+    return {"on": on, "off": off}
+
+
+async def team_roster_index(
+    session,
+    team_id: int,
+    roster: Optional[List[Dict]] = None,
+    match_id: Optional[int] = None,
+) -> RosterIndex:
+    """
+    The team's RosterIndex from the roster cache, or built from `roster` if
+    given. With a `match_id` whose lineup is known, names resolve against
+    the players on the pitch first, then the matchday squad, then the team.
+    """
+    if roster is None:
+        index = (await get_roster_cache().get(session, team_id)).index
+    else:
+        index = RosterIndex(roster)
+    if match_id is not None:
+        lineup = await get_lineup_tracker().get(session, match_id)
+        if lineup is not None:
+            return lineup.scoped_index(index)
+    return index
+
+
+async def parse_with_db(
+    text: str,
+    session,
+    team_id: int,
+    opponents: List[str] = [],
+    roster: Optional[List[Dict]] = None,
+    match_id: Optional[int] = None,
+):
+    """
+    Parse transcript against the team roster; matches carry player_id + position.
+    The roster comes from the roster cache unless the caller passes one;
+    `match_id` scopes resolution to the match lineup (see team_roster_index).
+    """
+    index = await team_roster_index(session, team_id, roster, match_id)
+    return parse_transcript(text, index.names, opponents, roster_index=index)
+
+
+async def parse_events_with_db(
+    text: str,
+    session,
+    team_id: int,
+    opponents: List[str] = [],
+    roster: Optional[List[Dict]] = None,
+    match_id: Optional[int] = None,
+) -> List[Dict]:
+    """parse_events against the team roster (see parse_with_db)."""
+    index = await team_roster_index(session, team_id, roster, match_id)
+    return parse_events(text, index.names, opponents, roster_index=index)
@@ -0,0 +1,192 @@
+# backend/services/engines.py
+"""
+Speech-to-text engines the transcription workers can run.
+
+Selected with Settings.TRANSCRIBE_ENGINE:
+  - "whisper":         openai-whisper, fp32 PyTorch
+  - "faster-whisper":  CTranslate2 backend, int8-quantized on CPU by default
+
+Engines are loaded inside the worker processes; the API process only
+passes their configuration around.
+"""
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# whisper.transcribe's decoding defaults: start greedy and retry hotter when
+# the output looks like a hallucination (too repetitive or too unlikely).
+# The batched path applies the same, so a clip decodes the same either way.
+WHISPER_TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+WHISPER_DECODE_DEFAULTS = {
+    "temperature": WHISPER_TEMPERATURES,
+    "compression_ratio_threshold": 2.4,
+    "logprob_threshold": -1.0,
+    "no_speech_threshold": 0.6,
+    "best_of": 5,
+}
+
+
+def needs_fallback(result: Any, options: Dict[str, Any]) -> bool:
+    """Whether whisper.transcribe would re-decode this result at the next temperature."""
+    compression_ratio_threshold = options.get("compression_ratio_threshold")
+    logprob_threshold = options.get("logprob_threshold")
+    no_speech_threshold = options.get("no_speech_threshold")
+    retry = (
+        (compression_ratio_threshold is not None and result.compression_ratio > compression_ratio_threshold)
+        or (logprob_threshold is not None and result.avg_logprob < logprob_threshold)
+    )
+    if retry and is_silence(result, options):
+        return False  # silence: whisper.transcribe drops it rather than retrying
+    return retry
+
+
+def is_silence(result: Any, options: Dict[str, Any]) -> bool:
+    """whisper.transcribe's "no speech" rule, under which a segment's text is dropped."""
+    no_speech_threshold = options.get("no_speech_threshold")
+    logprob_threshold = options.get("logprob_threshold")
+    return (
+        no_speech_threshold is not None
+        and result.no_speech_prob > no_speech_threshold
+        and (logprob_threshold is None or result.avg_logprob <= logprob_threshold)
+    )
+
+
+class TranscriptionEngine(ABC):
+    """Common interface: 16 kHz float32 audio in, text out."""
+
+    name = "base"
+
+    def __init__(self, model_name: str, beam_size: Optional[int] = None, **kwargs: Any):
+        self.model_name = model_name
+        self.beam_size = beam_size
+
+    @abstractmethod
+    def transcribe(self, audio: Any, **options: Any) -> Dict[str, Any]:
+        """Decode one clip: {"text", "language", ...}."""
+
+    def transcribe_batch(self, audios: List[np.ndarray], **options: Any) -> List[Dict[str, Any]]:
+        """Decode several short clips; engines without batching just loop."""
+        return [self.transcribe(audio, **options) for audio in audios]
+
+
+class WhisperEngine(TranscriptionEngine):
+    name = "whisper"
+
+    def __init__(self, model_name: str, beam_size: Optional[int] = None, **kwargs: Any):
+        super().__init__(model_name, beam_size)
+        import whisper
+
+        self.model = whisper.load_model(model_name)
+
+    def decode_options(self, options: Dict[str, Any]) -> Dict[str, Any]:
+        """Options for model.transcribe, shared with the batched path."""
+        decode = {**WHISPER_DECODE_DEFAULTS, "fp16": self.model.device.type != "cpu", **options}
+        if self.beam_size:
+            decode.setdefault("beam_size", self.beam_size)
+        return decode
+
+    def transcribe(self, audio: Any, **options: Any) -> Dict[str, Any]:
+        result = self.model.transcribe(audio, **self.decode_options(options))
+        return {"text": result.get("text", ""), "language": result.get("language")}
+
+    def transcribe_batch(self, audios: List[np.ndarray], **options: Any) -> List[Dict[str, Any]]:
+        """
+        One batched encoder/decoder pass over clips of <= 30 s each: every
+        clip is padded to Whisper's 30 s window and the log-mel
+        spectrograms are stacked into a single (N, n_mels, 3000) tensor.
+        Clips whose result needs the temperature fallback are decoded
+        again together at the next temperature, as transcribe() would.
+        """
+        import torch
+        import whisper
+
+        decode = self.decode_options(options)
+        mel = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), n_mels=self.model.dims.n_mels)
+            for audio in audios
+        ]).to(self.model.device)
+        temperatures = decode["temperature"]
+        if isinstance(temperatures, (int, float)):
+            temperatures = (temperatures,)
+
+        results: List[Any] = [None] * len(audios)
+        pending = list(range(len(audios)))
+        for temperature in temperatures:
+            decode_options = whisper.DecodingOptions(
+                task=decode.get("task", "transcribe"),
+                language=decode.get("language"),
+                temperature=temperature,
+                # Like transcribe(): beam search when greedy, best-of-N when sampling
+                beam_size=decode.get("beam_size") if temperature == 0 else None,
+                best_of=decode.get("best_of") if temperature > 0 else None,
+                without_timestamps=True,
+                fp16=decode["fp16"],
+            )
+            retry = []
+            for i, result in zip(pending, whisper.decode(self.model, mel[pending], decode_options)):
+                results[i] = result
+                if needs_fallback(result, decode):
+                    retry.append(i)
+            pending = retry
+            if not pending:
+                break
+        return [
+            {
+                "text": "" if is_silence(r, decode) else r.text,
+                "language": r.language,
+                "no_speech_prob": r.no_speech_prob,
+            }
+            for r in results
+        ]
+
+
+class FasterWhisperEngine(TranscriptionEngine):
+    name = "faster-whisper"
+
+    # Options our callers pass that CTranslate2's transcribe understands
+    _SUPPORTED_OPTIONS = {"language", "temperature", "condition_on_previous_text", "initial_prompt"}
+
+    def __init__(
+        self,
+        model_name: str,
+        beam_size: Optional[int] = None,
+        compute_type: str = "int8",
+        cpu_threads: int = 0,
+        **kwargs: Any,
+    ):
+        super().__init__(model_name, beam_size)
+        from faster_whisper import WhisperModel
+
+        self.compute_type = compute_type
+        self.model = WhisperModel(
+            model_name, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads
+        )
+
+    def transcribe(self, audio: Any, **options: Any) -> Dict[str, Any]:
+        kwargs = {k: v for k, v in options.items() if k in self._SUPPORTED_OPTIONS}
+        segments, info = self.model.transcribe(
+            audio, beam_size=self.beam_size or 1, without_timestamps=True, **kwargs
+        )
+        # segments is a generator; decoding happens while we iterate it
+        text = "".join(segment.text for segment in segments)
+        return {"text": text, "language": info.language}
+
+
+ENGINES = {
+    WhisperEngine.name: WhisperEngine,
+    FasterWhisperEngine.name: FasterWhisperEngine,
+}
+
+
+def load_engine(engine: str, model_name: str, **kwargs: Any) -> TranscriptionEngine:
+    """Instantiate (and load the weights of) the named engine."""
+    try:
+        engine_cls = ENGINES[engine]
+    except KeyError:
+        raise ValueError(f"Unknown transcription engine '{engine}'. Available: {', '.join(ENGINES)}")
+    start = time.perf_counter()
+    instance = engine_cls(model_name, **kwargs)
+    instance.load_seconds = time.perf_counter() - start
+    return instance
@@ -0,0 +1,443 @@
+# backend/services/event_buffer.py
+"""
+Write-behind buffer for POST / (Settings.EVENT_WRITE_MODE = "buffered").
+
+In the default "direct" mode every event is its own transaction and
+commit, which is what limits ingestion when many matches post at once.
+In buffered mode an accepted event is instead:
+
+  1. checked (match exists, player in the match team: one read, no commit),
+  2. given an id from a block pre-allocated from events_id_seq,
+  3. appended to a local journal file and fsynced, off the event loop
+     (lines that arrive while a write runs share the next write and
+     fsync), then acknowledged,
+
+and a background task stores the journaled rows in micro-batches with one
+COPY each, every EVENT_BUFFER_FLUSH_MS or as soon as EVENT_BUFFER_FLUSH_ROWS
+are waiting. The journal is a series of segment files, one per batch; a
+segment is deleted once its rows are stored, and whatever is left at
+startup (a crash, a failed flush) is replayed first. Rows already stored
+before the crash are skipped by their id.
+
+A segment with rows the database refused (see store_events) is not
+deleted but renamed to *.jsonl.dropped and listed under dropped_segments
+in /metrics/event-buffer. Once the cause is fixed, rename it back to
+.jsonl and restart to replay it; its stored rows are skipped by id.
+
+Reads lag writes by up to one flush. The journal directory belongs to one
+process (it is locked); give each worker process its own.
+"""
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend import models
+from backend.crud.events import check_client_event_id, check_event_refs, find_client_events
+from backend.db import AsyncSessionLocal, async_engine
+from backend.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+_COPY_COLUMNS = [
+    "id", "match_id", "minute", "event_type", "team_context", "player_id", "raw_text", "meta_json", "client_event_id",
+]
+_SEGMENT_PREFIX = "events-"
+_SEGMENT_SUFFIX = ".jsonl"
+_DROPPED_SUFFIX = ".dropped"
+# Pause before retrying a batch that could not be stored (database down)
+RETRY_SECONDS = 1.0
+# SQLSTATE classes of errors caused by a row's own values: data exceptions
+# (a value too long, out of range) and integrity constraint violations
+_ROW_ERROR_CLASSES = ("22", "23")
+
+
+def _is_row_error(sqlstate: Optional[str]) -> bool:
+    return sqlstate is not None and sqlstate.startswith(_ROW_ERROR_CLASSES)
+
+
+async def allocate_event_ids(count: int) -> List[int]:
+    """`count` fresh ids from the events id sequence, in one round trip."""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            text("SELECT nextval('events_id_seq') FROM generate_series(1, :n)"), {"n": count}
+        )
+        return sorted(result.scalars().all())
+
+
+async def store_events(rows: List[Dict]) -> int:
+    """
+    Store a batch with one COPY. If a row is refused (stored before a
+    crash, a duplicate client_event_id, a match deleted meanwhile, a value
+    too long for its column), rows go in one at a time instead: duplicates
+    are skipped and rows that still fail are dropped. Returns how many were
+    dropped. Any other error (database down) is raised, for a retry.
+    """
+    records = [
+        (
+            r["id"], r["match_id"], r["minute"], r["event_type"], r.get("team_context") or "us",
+            r.get("player_id"), r.get("raw_text"),
+            json.dumps(r["meta_json"]) if r.get("meta_json") is not None else None,
+            r.get("client_event_id"),
+        )
+        for r in rows
+    ]
+    try:
+        async with async_engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table("events", records=records, columns=_COPY_COLUMNS)
+        return 0
+    except asyncpg.PostgresError as e:
+        if not _is_row_error(e.sqlstate):
+            raise
+        logger.warning("COPY of %d buffered events failed (%s); storing them one by one", len(rows), e)
+
+    dropped = 0
+    async with AsyncSessionLocal() as session:
+        for row in rows:
+            try:
+                async with session.begin_nested():
+                    await session.execute(pg_insert(models.Event).values(**row).on_conflict_do_nothing())
+            except DBAPIError as e:
+                if not _is_row_error(getattr(e.orig, "sqlstate", None)):
+                    raise
+                dropped += 1
+                logger.error("Dropping buffered event %s: %s", row, e.orig)
+        await session.commit()
+    return dropped
+
+
+class _Segment:
+    """A journal file and the rows written to it."""
+
+    def __init__(self, path: str, rows: Optional[List[Dict]] = None):
+        self.path = path
+        self.rows: List[Dict] = rows or []
+
+
+class EventWriteBuffer:
+    def __init__(
+        self,
+        journal_dir: str,
+        flush_rows: int,
+        flush_ms: float,
+        id_block: int,
+        fsync: bool = True,
+        store: Callable[[List[Dict]], Awaitable[int]] = store_events,
+        allocate_ids: Callable[[int], Awaitable[List[int]]] = allocate_event_ids,
+    ):
+        self.journal_dir = journal_dir
+        self.flush_rows = flush_rows
+        self.flush_ms = flush_ms
+        self.id_block = id_block
+        self.fsync = fsync
+        self._store = store
+        self._allocate_ids = allocate_ids
+
+        self._ids: List[int] = []  # pre-allocated, descending (pop() gives the lowest)
+        self._id_lock = asyncio.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._lock_fd: Optional[int] = None
+
+        self._sealed: List[_Segment] = []  # closed segments waiting to be stored, oldest first
+        self._current: Optional[_Segment] = None
+        self._fd: Optional[int] = None
+        self._next_segment = 0
+        # Journal lines accepted / known to be on disk, across all segments;
+        # accepted lines wait in _unwritten for the next write
+        self._written = 0
+        self._synced = 0
+        self._unwritten: List[bytes] = []
+        self._sync_task: Optional[asyncio.Task] = None
+        # (match_id, client_event_id) -> row, until the row is stored
+        self._pending_keys: Dict[Tuple[int, str], Dict] = {}
+
+        self.accepted = 0
+        self.replayed = 0
+        self.stored = 0
+        self.dropped = 0
+        self.dropped_segments: List[str] = []  # kept for manual replay
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.last_flush_ms = 0.0
+
+    # --- Lifecycle ---------------------------------------------------------
+    async def start(self) -> None:
+        """Lock the journal, queue leftover segments for replay and start flushing."""
+        os.makedirs(self.journal_dir, exist_ok=True)
+        self._lock_fd = os.open(os.path.join(self.journal_dir, "lock"), os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+            raise RuntimeError(f"Event journal {self.journal_dir} is in use by another process")
+
+        for number, path in self._segment_files():
+            self._next_segment = number + 1
+            rows = self._read_segment(path)
+            if not rows:
+                os.remove(path)
+                continue
+            self._sealed.append(_Segment(path, rows))
+            self._track_keys(rows)
+            self.replayed += len(rows)
+        if self.replayed:
+            logger.info("Replaying %d journaled events", self.replayed)
+        self.dropped_segments = sorted(
+            os.path.join(self.journal_dir, name)
+            for name in os.listdir(self.journal_dir)
+            if name.endswith(_SEGMENT_SUFFIX + _DROPPED_SUFFIX)
+        )
+        if self.dropped_segments:
+            logger.warning("Journal segments with dropped events to replay by hand: %s", self.dropped_segments)
+        self._open_segment()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, flush: bool = True) -> None:
+        """Stop flushing; with `flush`, store everything first (else it is replayed on the next start)."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if flush:
+            try:
+                await self.drain()
+            except Exception:
+                logger.exception("Could not store buffered events; they stay in the journal")
+        try:
+            await self._sync(self._written)  # lines accepted but not written yet
+        except Exception:
+            logger.exception("Could not write the event journal")
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+            if not self._current.rows:
+                os.remove(self._current.path)
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    async def drain(self) -> None:
+        """Store everything accepted so far, now."""
+        async with self._flush_lock:
+            await self._seal()
+            while self._sealed:
+                if not await self._flush(self._sealed[0]):
+                    raise RuntimeError("Storing buffered events failed")
+
+    # --- Writes ------------------------------------------------------------
+    async def submit(self, row: Dict) -> Dict:
+        """
+        Journal an event row; returns it with its id once it is durable. A
+        client_event_id already pending for the match returns that row.
+        """
+        event_id = await self._next_id()
+        key = row.get("client_event_id")
+        if key is not None and self.pending(row["match_id"], key) is not None:
+            return self.pending(row["match_id"], key)  # a concurrent retry got in first
+        row = {**row, "id": event_id}
+        self._unwritten.append((json.dumps(row, separators=(",", ":")) + "\n").encode())
+        self._current.rows.append(row)
+        self._written += 1
+        self._track_keys([row])
+        self.accepted += 1
+        if len(self._current.rows) >= self.flush_rows:
+            self._wake.set()
+        await self._sync(self._written)
+        return row
+
+    def pending(self, match_id: int, client_event_id: str) -> Optional[Dict]:
+        """The accepted, not yet stored row with this client_event_id, if any."""
+        return self._pending_keys.get((match_id, client_event_id))
+
+    async def _next_id(self) -> int:
+        while not self._ids:
+            async with self._id_lock:
+                if not self._ids:
+                    self._ids = sorted(await self._allocate_ids(self.id_block), reverse=True)
+        return self._ids.pop()
+
+    async def _sync(self, target: int) -> None:
+        # One write + fsync covers every line accepted before it started
+        while self._synced < target:
+            if self._sync_task is None:
+                self._sync_task = asyncio.create_task(self._write())
+            await asyncio.shield(self._sync_task)
+
+    async def _write(self) -> None:
+        upto, lines, self._unwritten = self._written, self._unwritten, []
+        try:
+            await asyncio.to_thread(self._write_out, self._fd, b"".join(lines))
+            self._synced = max(self._synced, upto)
+        except BaseException:
+            self._unwritten[:0] = lines  # the next write tries them again
+            raise
+        finally:
+            self._sync_task = None
+
+    def _write_out(self, fd: int, data: bytes) -> None:
+        while data:
+            data = data[os.write(fd, data):]
+        if self.fsync:
+            os.fsync(fd)
+
+    def _track_keys(self, rows: List[Dict]) -> None:
+        for row in rows:
+            if row.get("client_event_id") is not None:
+                self._pending_keys[(row["match_id"], row["client_event_id"])] = row
+
+    # --- Journal segments --------------------------------------------------
+    def _segment_files(self) -> List[Tuple[int, str]]:
+        found = []
+        for name in os.listdir(self.journal_dir):
+            if name.startswith(_SEGMENT_PREFIX) and name.endswith(_SEGMENT_SUFFIX):
+                number = int(name[len(_SEGMENT_PREFIX):-len(_SEGMENT_SUFFIX)])
+                found.append((number, os.path.join(self.journal_dir, name)))
+        return sorted(found)
+
+    @staticmethod
+    def _read_segment(path: str) -> List[Dict]:
+        rows = []
+        with open(path) as f:
+            for line in f:
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    # Torn last line: never acknowledged, so never stored
+                    logger.warning("Skipping incomplete journal line in %s", path)
+        return rows
+
+    def _open_segment(self) -> None:
+        path = os.path.join(self.journal_dir, f"{_SEGMENT_PREFIX}{self._next_segment:012d}{_SEGMENT_SUFFIX}")
+        self._next_segment += 1
+        self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._current = _Segment(path)
+
+    async def _seal(self) -> None:
+        """Queue the current segment for storing and start a new one."""
+        # Nothing may be left to write or fsync in a closed file
+        while self._synced < self._written:
+            await self._sync(self._written)
+        if not self._current.rows:
+            return
+        os.close(self._fd)
+        self._sealed.append(self._current)
+        self._open_segment()
+
+    # --- Flushing ----------------------------------------------------------
+    async def _run(self) -> None:
+        while True:
+            if not self._sealed:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.flush_ms / 1000.0)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+            async with self._flush_lock:
+                if not self._sealed:
+                    await self._seal()
+                flushed = await self._flush(self._sealed[0]) if self._sealed else True
+            if not flushed:
+                await asyncio.sleep(RETRY_SECONDS)
+
+    async def _flush(self, segment: _Segment) -> bool:
+        start = time.perf_counter()
+        try:
+            dropped = await self._store(segment.rows)
+        except Exception:
+            self.failed_flushes += 1
+            logger.exception("Storing %d buffered events failed; retrying", len(segment.rows))
+            return False
+        self._sealed.pop(0)
+        if dropped:
+            kept = segment.path + _DROPPED_SUFFIX
+            os.replace(segment.path, kept)
+            self.dropped_segments.append(kept)
+            logger.error("%d buffered events could not be stored; kept %s for replay", dropped, kept)
+        else:
+            os.remove(segment.path)
+        for row in segment.rows:
+            key = (row["match_id"], row.get("client_event_id"))
+            if self._pending_keys.get(key) is row:
+                del self._pending_keys[key]
+        self.flushes += 1
+        self.stored += len(segment.rows) - dropped
+        self.dropped += dropped
+        self.last_flush_ms = round(1000 * (time.perf_counter() - start), 3)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "flush_rows": self.flush_rows,
+            "flush_ms": self.flush_ms,
+            "fsync": self.fsync,
+            "pending": len(self._current.rows if self._current else []) + sum(len(s.rows) for s in self._sealed),
+            "accepted": self.accepted,
+            "replayed": self.replayed,
+            "stored": self.stored,
+            "dropped": self.dropped,
+            "dropped_segments": list(self.dropped_segments),
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "avg_batch_size": round(self.stored / self.flushes, 2) if self.flushes else 0.0,
+            "last_flush_ms": self.last_flush_ms,
+            "ids_left": len(self._ids),
+        }
+
+
+# Singleton instance
+_buffer: Optional[EventWriteBuffer] = None
+
+
+def get_event_buffer() -> EventWriteBuffer:
+    """Get the process-wide event write buffer."""
+    global _buffer
+    if _buffer is None:
+        settings = get_settings()
+        _buffer = EventWriteBuffer(
+            settings.EVENT_BUFFER_DIR,
+            flush_rows=settings.EVENT_BUFFER_FLUSH_ROWS,
+            flush_ms=settings.EVENT_BUFFER_FLUSH_MS,
+            id_block=settings.EVENT_BUFFER_ID_BLOCK,
+            fsync=settings.EVENT_BUFFER_FSYNC,
+        )
+    return _buffer
+
+
+async def create_event(session: AsyncSession, row: Dict) -> Dict:
+    """
+    crud.events.create_event for buffered mode: same checks and the same
+    idempotency, but the row is journaled and returned with its id; it
+    reaches the database with the next flush.
+    """
+    buffer = get_event_buffer()
+    key = row.get("client_event_id")
+    check_client_event_id(key)
+    if key is not None:
+        existing = buffer.pending(row["match_id"], key)
+        if existing is None:
+            stored = (await find_client_events(session, row["match_id"], [key])).get(key)
+            existing = stored[0] if stored else None
+        if existing is not None:
+            return existing
+    await check_event_refs(session, row["match_id"], row.get("player_id"))
+    # Hand the connection back before waiting on the journal: the next id
+    # block may need one, and every request holding its own would deadlock
+    # the pool under load
+    await session.commit()
+    return await buffer.submit(row)
@@ -0,0 +1,275 @@
+# backend/services/event_ingest.py
+"""Turn transcript text into stored Event rows (shared by HTTP and WebSocket paths)."""
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend import models
+from backend.crud.events import (
+    EventRejected,
+    check_client_event_id,
+    client_event_keys,
+    find_client_events,
+    insert_events,
+)
+from backend.services.command_parser import parse_events_with_db, parse_transcripts, sub_changes, team_roster_index
+from backend.services.lineups import get_lineup_tracker
+from backend.services.roster_cache import get_roster_cache
+
+
+def match_minute(match: models.Match, at: Optional[datetime] = None) -> int:
+    """
+    Minutes elapsed since kickoff at `at` (default: now), floored at 0.
+    Naive datetimes, `at` or the stored kickoff, are taken as UTC.
+    """
+    at = at or datetime.now(timezone.utc)
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=timezone.utc)
+    kickoff = match.kickoff_at
+    if kickoff.tzinfo is None:
+        kickoff = kickoff.replace(tzinfo=timezone.utc)
+    return max(0, int((at - kickoff).total_seconds() // 60))
+
+
+async def create_events_from_text(
+    session: AsyncSession,
+    match: models.Match,
+    raw_text: str,
+    default_minute: Optional[int] = None,
+    roster: Optional[List[Dict]] = None,
+    client_event_id: Optional[str] = None,
+) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Parse `raw_text` against the match team's roster and insert one Event
+    per command it contains ("goal Winston assist Logan" -> two), all in
+    one statement.
+
+    Returns (event rows, parsed), empty when no intent was recognised.
+    `default_minute` is used for events with no minute in the transcript;
+    `roster` skips the roster lookup when the caller already has it.
+    Names resolve against the match lineup first, and subs move players
+    on and off the pitch (see services.lineups).
+
+    With a `client_event_id` the upload is idempotent: a retry returns the
+    rows stored the first time (and their parser output) without parsing
+    again.
+    """
+    check_client_event_id(client_event_id)
+    if client_event_id is not None:
+        existing = await _stored_events(session, match, client_event_id)
+        if existing:
+            return existing
+
+    parsed_events = await parse_events_with_db(
+        raw_text,
+        session,
+        team_id=match.team_id,
+        opponents=[match.opponent_name] if match.opponent_name else [],
+        roster=roster,
+        match_id=match.id,
+    )
+    if not parsed_events:
+        return [], []
+
+    events = _event_rows(match, raw_text, parsed_events, default_minute, client_event_id)
+    if not await _commit_events(session, match, events, parsed_events):
+        if client_event_id is not None:
+            # A concurrent retry stored it first
+            existing = await _stored_events(session, match, client_event_id)
+            if existing:
+                return existing
+        _reject_stale_roster(match)
+    return events, parsed_events
+
+
+async def _stored_events(session: AsyncSession, match: models.Match, key: str) -> Optional[Tuple[List[Dict], List[Dict]]]:
+    existing = (await find_client_events(session, match.id, [key])).get(key)
+    if not existing:
+        return None
+    return existing, [e["meta_json"] for e in existing]
+
+
+STALE_PLAYER = "Player must belong to the match team"
+NO_MINUTE = "No minute in transcript"
+
+
+def _forget_stale_roster(match: models.Match) -> None:
+    # A player left the team after the cached roster was read
+    get_roster_cache().invalidate(match.team_id)
+    get_lineup_tracker().invalidate(match.id)
+
+
+def _reject_stale_roster(match: models.Match) -> None:
+    _forget_stale_roster(match)
+    raise EventRejected(400, STALE_PLAYER)
+
+
+async def _team_player_ids(session: AsyncSession, team_id: int, player_ids: List[int]) -> set:
+    """Which of `player_ids` are in the team right now."""
+    result = await session.execute(
+        select(models.Player.id).where(models.Player.id.in_(player_ids), models.Player.team_id == team_id)
+    )
+    return set(result.scalars().all())
+
+
+async def _commit_events(
+    session: AsyncSession,
+    match: models.Match,
+    events: List[Dict],
+    parsed_events: List[Dict],
+) -> bool:
+    """
+    Insert the event rows (setting their ids) and commit; subs update the
+    on-pitch set once they are stored. False, with nothing stored, if any
+    row was skipped: its client_event_id is already taken, or its player
+    is no longer in the match team.
+    """
+    lineup = await get_lineup_tracker().get(session, match.id)
+    changes = []
+    if lineup is not None:
+        for parsed in parsed_events:
+            if parsed["event_type"] == "sub":
+                # The row's meta_json is this dict; it is serialized on insert
+                parsed["lineup_change"] = sub_changes(parsed["raw_text"], lineup.squad_index)
+                changes.append(parsed["lineup_change"])
+
+    ids = await insert_events(session, events)
+    if len(ids) != len(events):
+        # Rolling back expires every loaded object; keep `match` readable
+        # (without a lazy load) for the caller's conflict/roster checks
+        session.expunge(match)
+        await session.rollback()
+        session.add(match)
+        return False
+    await session.commit()
+    for event, event_id in zip(events, ids):
+        event["id"] = event_id
+    for change in changes:
+        lineup.apply(change)
+    return True
+
+
+def _event_rows(
+    match: models.Match,
+    raw_text: str,
+    parsed_events: List[Dict],
+    default_minute: Optional[int],
+    client_event_id: Optional[str] = None,
+) -> List[Dict]:
+    rows = []
+    for parsed, key in zip(parsed_events, client_event_keys(client_event_id, len(parsed_events))):
+        if len(parsed_events) > 1:
+            parsed["transcript"] = raw_text
+        rows.append({
+            "match_id": match.id,
+            "minute": parsed["minute"] if parsed["minute"] is not None else default_minute,
+            "event_type": parsed["event_type"],
+            "team_context": "us",
+            "player_id": parsed.get("player_id"),
+            "raw_text": parsed["raw_text"],
+            "meta_json": parsed,  # keep full parser output for review/edit
+            "client_event_id": key,
+        })
+    return rows
+
+
+async def create_events_from_texts(
+    session: AsyncSession,
+    match: models.Match,
+    raw_texts: List[str],
+    default_minute: Optional[int] = None,
+    client_event_ids: Optional[List[Optional[str]]] = None,
+) -> List[Tuple[List[Dict], List[Dict], Optional[str]]]:
+    """
+    create_events_from_text for a batch: one roster lookup, one parse pass
+    and a single multi-row insert for every event of every transcript.
+
+    Returns (events, parsed, error) per transcript, in order. Items that
+    could not be parsed, or that name a player who has left the team since
+    the roster was read, get no events (and the latter an error); they
+    don't affect the others. Items with a command that has no minute, and
+    no `default_minute` to fall back on, get the NO_MINUTE error. Names
+    resolve against the on-pitch set as it was when the batch started. Items whose client_event_id is already
+    stored get the stored rows back and are not parsed again.
+    """
+    keys = client_event_ids or [None] * len(raw_texts)
+    for key in keys:
+        check_client_event_id(key)
+    given = [k for k in keys if k is not None]
+    if len(set(given)) != len(given):
+        raise EventRejected(400, "Duplicate client_event_id in batch")
+    stored = await find_client_events(session, match.id, given)
+
+    index = await team_roster_index(session, match.team_id, match_id=match.id)
+    opponents = [match.opponent_name] if match.opponent_name else []
+    new = [i for i, key in enumerate(keys) if key not in stored]
+    parsed_new = dict(zip(new, parse_transcripts([raw_texts[i] for i in new], index.names, opponents, index)))
+
+    results = []
+    for i, (raw_text, key) in enumerate(zip(raw_texts, keys)):
+        if i in parsed_new:
+            parsed_events = parsed_new[i]
+            events = _event_rows(match, raw_text, parsed_events, default_minute, key)
+            if any(e["minute"] is None for e in events):
+                results.append(([], [], NO_MINUTE))
+            else:
+                results.append((events, parsed_events, None))
+        else:
+            results.append((stored[key], [e["meta_json"] for e in stored[key]], None))
+    new = [i for i in new if results[i][2] is None]
+
+    async def commit(items: List[int]) -> bool:
+        return await _commit_events(
+            session,
+            match,
+            [event for i in items for event in results[i][0]],
+            [parsed for i in items for parsed in results[i][1]],
+        )
+
+    async def raise_if_raced() -> None:
+        if await find_client_events(session, match.id, [keys[i] for i in new if keys[i] is not None]):
+            raise EventRejected(409, "Some client_event_ids were stored by a concurrent upload; retry the batch")
+
+    if await commit(new):
+        return results
+    await raise_if_raced()
+
+    # A player left the team after the roster was read: fail the items that
+    # name one and store the rest
+    _forget_stale_roster(match)
+    player_ids = {e["player_id"] for i in new for e in results[i][0] if e["player_id"] is not None}
+    current = await _team_player_ids(session, match.team_id, list(player_ids))
+    stale = {i for i in new if any(e["player_id"] in player_ids - current for e in results[i][0])}
+    if not stale:
+        _reject_stale_roster(match)
+    for i in stale:
+        results[i] = ([], [], STALE_PLAYER)
+    if not await commit([i for i in new if i not in stale]):
+        await raise_if_raced()
+        _reject_stale_roster(match)
+    return results
+
+
+def raw_event_response(event: Dict, parsed: Dict) -> Dict:
+    """Response body for an event row created from raw text."""
+    return {
+        "id": event["id"],
+        "match_id": event["match_id"],
+        "event_type": event["event_type"],
+        "player_id": event["player_id"],
+        "minute": event["minute"],
+        "raw_text": event["raw_text"],
+        "parsed": parsed,
+    }
+
+
+def raw_events_response(events: List[Dict], parsed: List[Dict]) -> Dict:
+    """
+    Response body for a transcript that created one or more events: the
+    first event's fields (what single-event clients read) plus all of them
+    under "events".
+    """
+    bodies = [raw_event_response(e, p) for e, p in zip(events, parsed)]
+    return {**bodies[0], "events": bodies}
@@ -0,0 +1,361 @@
+# backend/services/jobs.py
+"""
+Asynchronous transcription jobs.
+
+POST /transcribe/jobs stores the upload and returns a job id straight away;
+a worker decodes and transcribes it later and the result is polled with
+GET /transcribe/jobs/{id} (and pushed to /ws/match/{match_id} when the job
+belongs to a match).
+
+Two queue backends share one interface:
+  - RedisJobQueue: list + per-job keys in Redis (Settings.REDIS_URL),
+    consumed by standalone `python -m backend.workers.transcription_worker`
+    processes; finished jobs are announced on a pub/sub channel. A worker
+    claims a job by moving its id to a processing list and acks it when
+    done, so a job whose worker dies mid-decode is requeued once its claim
+    is older than TRANSCRIBE_JOB_CLAIM_TIMEOUT (and failed after
+    TRANSCRIBE_JOB_MAX_ATTEMPTS claims).
+  - MemoryJobQueue: asyncio queue inside the API process, consumed by
+    worker tasks started in the app lifespan. Used for tests and
+    single-process development.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from backend.services.audio import AudioDecodeError, decode_stream
+from backend.services.pipeline import transcribe_samples
+from backend.services.transcription import TranscriptionQueueFull
+from backend.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_REDIS_QUEUE = "transcribe-jobs:queue"
+_REDIS_PROCESSING = "transcribe-jobs:processing"
+_REDIS_CLAIMS = "transcribe-jobs:claims"  # job id -> claimed at (epoch seconds)
+_REDIS_CHANNEL = "transcribe-jobs:finished"
+_REDIS_JOB = "transcribe-job:"
+_REDIS_AUDIO = "transcribe-job-audio:"
+
+# Move claims older than the cutoff back to the queue, atomically so two
+# sweepers can't requeue the same job twice. An id in the processing list
+# without a claim time belongs to a worker that died between BLMOVE and
+# HSET; it gets stamped now and requeued on a later sweep.
+_REQUEUE_STALE = """
+local requeued = 0
+for _, id in ipairs(redis.call('LRANGE', KEYS[1], 0, -1)) do
+  local claimed = redis.call('HGET', KEYS[2], id)
+  if not claimed then
+    redis.call('HSET', KEYS[2], id, ARGV[1])
+  elseif tonumber(claimed) <= tonumber(ARGV[2]) then
+    redis.call('LREM', KEYS[1], 1, id)
+    redis.call('HDEL', KEYS[2], id)
+    redis.call('RPUSH', KEYS[3], id)
+    requeued = requeued + 1
+  end
+end
+return requeued
+"""
+
+
+def new_job(content_type: str, match_id: Optional[int] = None, filename: Optional[str] = None) -> Dict[str, Any]:
+    """Job record as stored and returned by GET /transcribe/jobs/{id}."""
+    return {
+        "id": uuid.uuid4().hex,
+        "status": QUEUED,
+        "match_id": match_id,
+        "filename": filename,
+        "content_type": content_type,
+        "created_at": time.time(),
+        "started_at": None,
+        "finished_at": None,
+        "result": None,
+        "error": None,
+    }
+
+
+class MemoryJobQueue:
+    """In-process queue; jobs are lost when the process exits."""
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._jobs: Dict[str, Tuple[float, Dict[str, Any]]] = {}  # id -> (expires_at, job)
+        self._audio: Dict[str, bytes] = {}
+        self._listeners: List[asyncio.Queue] = []
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        for job_id in [k for k, (expires_at, _) in self._jobs.items() if expires_at <= now]:
+            del self._jobs[job_id]
+
+    async def enqueue(self, job: Dict[str, Any], audio: bytes) -> None:
+        self._audio[job["id"]] = audio
+        await self.save(job)
+        self._queue.put_nowait(job["id"])
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        self._expire()
+        entry = self._jobs.get(job_id)
+        return dict(entry[1]) if entry else None
+
+    async def save(self, job: Dict[str, Any]) -> None:
+        self._jobs[job["id"]] = (time.monotonic() + self.ttl_seconds, dict(job))
+
+    async def next_job(self, timeout: float = 5.0) -> Optional[Tuple[Dict[str, Any], bytes]]:
+        try:
+            job_id = await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        job = await self.get(job_id)
+        audio = self._audio.pop(job_id, None)
+        if job is None or audio is None:
+            return None
+        return job, audio
+
+    async def release(self, job: Dict[str, Any], audio: bytes) -> None:
+        self._audio[job["id"]] = audio
+        await self.save(job)
+        self._queue.put_nowait(job["id"])
+
+    async def ack(self, job_id: str) -> None:
+        pass
+
+    async def requeue_stale(self) -> int:
+        return 0
+
+    async def publish(self, job: Dict[str, Any]) -> None:
+        for listener in self._listeners:
+            listener.put_nowait(dict(job))
+
+    async def listen(self) -> AsyncIterator[Dict[str, Any]]:
+        listener: asyncio.Queue = asyncio.Queue()
+        self._listeners.append(listener)
+        try:
+            while True:
+                yield await listener.get()
+        finally:
+            self._listeners.remove(listener)
+
+    async def depth(self) -> int:
+        return self._queue.qsize()
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisJobQueue:
+    """Redis-backed queue shared by the API processes and standalone workers."""
+
+    def __init__(self, redis_url: str, ttl_seconds: int, claim_timeout: float = 300.0, max_attempts: int = 3):
+        import redis.asyncio as redis
+
+        self.ttl_seconds = ttl_seconds
+        self.claim_timeout = claim_timeout
+        self.max_attempts = max_attempts
+        self._redis = redis.from_url(redis_url)
+        self._requeue_stale = self._redis.register_script(_REQUEUE_STALE)
+
+    async def enqueue(self, job: Dict[str, Any], audio: bytes) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.set(_REDIS_AUDIO + job["id"], audio, ex=self.ttl_seconds)
+            pipe.set(_REDIS_JOB + job["id"], json.dumps(job), ex=self.ttl_seconds)
+            pipe.lpush(_REDIS_QUEUE, job["id"])
+            await pipe.execute()
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self._redis.get(_REDIS_JOB + job_id)
+        return json.loads(raw) if raw is not None else None
+
+    async def save(self, job: Dict[str, Any]) -> None:
+        await self._redis.set(_REDIS_JOB + job["id"], json.dumps(job), ex=self.ttl_seconds)
+
+    async def next_job(self, timeout: float = 5.0) -> Optional[Tuple[Dict[str, Any], bytes]]:
+        # The id stays in the processing list until ack(); the audio is only
+        # deleted then, so a requeued job can be decoded again
+        moved = await self._redis.blmove(_REDIS_QUEUE, _REDIS_PROCESSING, max(1, int(timeout)), "RIGHT", "LEFT")
+        if moved is None:
+            return None
+        job_id = moved.decode()
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(_REDIS_CLAIMS, job_id, time.time())
+            pipe.get(_REDIS_JOB + job_id)
+            pipe.get(_REDIS_AUDIO + job_id)
+            _, raw_job, audio = await pipe.execute()
+        if raw_job is None or audio is None:
+            logger.warning(f"Job {job_id} expired before a worker picked it up")
+            await self.ack(job_id)
+            return None
+
+        job = json.loads(raw_job)
+        job["attempts"] = job.get("attempts", 0) + 1
+        if job["attempts"] > self.max_attempts:
+            # Killed its worker every time; don't let it take down the next one
+            logger.error(f"Job {job_id} abandoned after {self.max_attempts} attempts")
+            job["status"] = FAILED
+            job["error"] = f"Gave up after {self.max_attempts} attempts"
+            job["finished_at"] = time.time()
+            await self.save(job)
+            await self.publish(job)
+            await self.ack(job_id)
+            return None
+        await self.save(job)
+        return job, audio
+
+    async def release(self, job: Dict[str, Any], audio: bytes) -> None:
+        """Give up a claimed job unfinished: back on the queue, next in line."""
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.set(_REDIS_JOB + job["id"], json.dumps(job), ex=self.ttl_seconds)
+            pipe.lrem(_REDIS_PROCESSING, 1, job["id"])
+            pipe.hdel(_REDIS_CLAIMS, job["id"])
+            pipe.rpush(_REDIS_QUEUE, job["id"])
+            await pipe.execute()
+
+    async def ack(self, job_id: str) -> None:
+        """Release a finished job's claim and its stored audio."""
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.lrem(_REDIS_PROCESSING, 1, job_id)
+            pipe.hdel(_REDIS_CLAIMS, job_id)
+            pipe.delete(_REDIS_AUDIO + job_id)
+            await pipe.execute()
+
+    async def requeue_stale(self) -> int:
+        """Requeue jobs claimed more than claim_timeout ago; how many were requeued."""
+        now = time.time()
+        return await self._requeue_stale(
+            keys=[_REDIS_PROCESSING, _REDIS_CLAIMS, _REDIS_QUEUE],
+            args=[now, now - self.claim_timeout],
+        )
+
+    async def publish(self, job: Dict[str, Any]) -> None:
+        await self._redis.publish(_REDIS_CHANNEL, json.dumps(job))
+
+    async def listen(self) -> AsyncIterator[Dict[str, Any]]:
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(_REDIS_CHANNEL)
+        try:
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    yield json.loads(message["data"])
+        finally:
+            await pubsub.unsubscribe(_REDIS_CHANNEL)
+            await pubsub.close()
+
+    async def depth(self) -> int:
+        return await self._redis.llen(_REDIS_QUEUE)
+
+    async def close(self) -> None:
+        await self._redis.close()
+
+
+async def _iter_bytes(data: bytes, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    for start in range(0, len(data), chunk_size):
+        yield data[start:start + chunk_size]
+
+
+async def transcribe_job_audio(job: Dict[str, Any], audio: bytes) -> Dict[str, Any]:
+    """Default job handler: decode the stored upload and transcribe it."""
+    samples = await decode_stream(_iter_bytes(audio), len(audio), job.get("content_type"))
+    return await transcribe_samples(samples, audio_digest=hashlib.sha256(audio).hexdigest())
+
+
+JobHandler = Callable[[Dict[str, Any], bytes], Awaitable[Dict[str, Any]]]
+
+
+async def process_next_job(queue, handler: JobHandler = transcribe_job_audio, timeout: float = 5.0) -> bool:
+    """Take one job off `queue`, run it and publish the outcome. False if the queue was empty."""
+    item = await queue.next_job(timeout)
+    if item is None:
+        return False
+    job, audio = item
+
+    job["status"] = RUNNING
+    job["started_at"] = time.time()
+    await queue.save(job)
+    try:
+        job["result"] = await handler(job, audio)
+        job["status"] = DONE
+    except TranscriptionQueueFull as e:
+        # This process's workers are all busy: put the job back for any
+        # consumer to take (not counted as an attempt) and back off
+        logger.info(f"Job {job['id']} requeued: {e}")
+        job["status"] = QUEUED
+        job["started_at"] = None
+        if "attempts" in job:
+            job["attempts"] -= 1
+        await queue.release(job, audio)
+        await asyncio.sleep(e.retry_after)
+        return True
+    except AudioDecodeError as e:
+        job["status"] = FAILED
+        job["error"] = f"Could not decode audio: {e}"
+    except Exception as e:
+        logger.exception(f"Transcription job {job['id']} failed")
+        job["status"] = FAILED
+        job["error"] = str(e) or type(e).__name__
+    job["finished_at"] = time.time()
+    await queue.save(job)
+    await queue.publish(job)
+    await queue.ack(job["id"])
+    logger.info(f"Job {job['id']} {job['status']} in {job['finished_at'] - job['started_at']:.2f}s")
+    return True
+
+
+async def run_job_worker(queue, handler: JobHandler = transcribe_job_audio) -> None:
+    """Consume jobs until cancelled."""
+    while True:
+        try:
+            await process_next_job(queue, handler)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Lost the queue connection etc.; back off instead of spinning
+            logger.error(f"Job worker error: {e}")
+            await asyncio.sleep(1.0)
+
+
+async def run_requeue_sweeper(queue, interval: float) -> None:
+    """Requeue jobs whose worker went away, every `interval` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            requeued = await queue.requeue_stale()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Requeue sweep failed: {e}")
+            continue
+        if requeued:
+            logger.warning(f"Requeued {requeued} job(s) with a stale claim")
+
+
+# Singleton instance
+_queue = None
+
+
+def get_job_queue():
+    """Get the process-wide job queue for Settings.TRANSCRIBE_JOB_QUEUE."""
+    global _queue
+    if _queue is None:
+        settings = get_settings()
+        if settings.TRANSCRIBE_JOB_QUEUE == "redis":
+            _queue = RedisJobQueue(
+                settings.REDIS_URL,
+                settings.TRANSCRIBE_JOB_TTL,
+                settings.TRANSCRIBE_JOB_CLAIM_TIMEOUT,
+                settings.TRANSCRIBE_JOB_MAX_ATTEMPTS,
+            )
+        elif settings.TRANSCRIBE_JOB_QUEUE == "memory":
+            _queue = MemoryJobQueue(settings.TRANSCRIBE_JOB_TTL)
+        else:
+            raise ValueError(f"Unknown TRANSCRIBE_JOB_QUEUE: {settings.TRANSCRIBE_JOB_QUEUE}")
+    return _queue
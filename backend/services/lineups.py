@@ -0,0 +1,112 @@
+# backend/services/lineups.py
+"""
+Match lineups for name resolution.
+
+A match's lineup (the Lineup rows: starters plus bench) narrows who a
+spoken name can be, and who is on the pitch narrows it further. The
+on-pitch set lives in memory and moves with every "sub" event: the change
+is worked out when the event is parsed, stored in its meta_json as
+"lineup_change" ({"on": [player ids], "off": [...]}) and applied once the
+event is committed. Entries expire after LINEUP_CACHE_TTL and are rebuilt
+from the starters plus the stored changes, so processes that did not see a
+substitution catch up.
+"""
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+
+from backend import models
+from backend.services.roster_index import RosterIndex, ScopedRosterIndex
+from backend.settings import get_settings
+
+
+class MatchLineup:
+    def __init__(self, match_id: int, squad: List[Dict], starters: Set[int]):
+        self.match_id = match_id
+        self.squad = squad  # [{"id","name","position"}, ...], starters and bench
+        self.squad_index = RosterIndex(squad)
+        self.on_pitch: Set[int] = set(starters)
+        self._pitch_index: Optional[RosterIndex] = None
+
+    def pitch_index(self) -> RosterIndex:
+        if self._pitch_index is None:
+            self._pitch_index = RosterIndex([p for p in self.squad if p["id"] in self.on_pitch])
+        return self._pitch_index
+
+    def scoped_index(self, team_index: RosterIndex) -> ScopedRosterIndex:
+        """Resolve on the pitch first, then the squad, then the whole team."""
+        return ScopedRosterIndex([self.pitch_index(), self.squad_index, team_index])
+
+    def apply(self, change: Dict[str, List[int]]) -> None:
+        """Apply a sub event's lineup_change."""
+        squad_ids = {p["id"] for p in self.squad}
+        self.on_pitch.difference_update(change.get("off", []))
+        self.on_pitch.update(i for i in change.get("on", []) if i in squad_ids)
+        self._pitch_index = None
+
+
+async def load_match_lineup(session, match_id: int) -> Optional[MatchLineup]:
+    """Lineup rows plus every sub recorded so far; None if no lineup was submitted."""
+    rows = (await session.execute(
+        select(models.Lineup.player_id, models.Lineup.position, models.Lineup.is_starter,
+               models.Player.name, models.Player.position.label("player_position"))
+        .join(models.Player, models.Player.id == models.Lineup.player_id)
+        .where(models.Lineup.match_id == match_id)
+    )).all()
+    if not rows:
+        return None
+
+    lineup = MatchLineup(
+        match_id,
+        [{"id": r.player_id, "name": r.name, "position": r.position or r.player_position} for r in rows],
+        {r.player_id for r in rows if r.is_starter},
+    )
+    subs = await session.execute(
+        select(models.Event.meta_json)
+        .where(models.Event.match_id == match_id, models.Event.event_type == "sub")
+        .order_by(models.Event.minute, models.Event.id)
+    )
+    for meta in subs.scalars():
+        if meta and meta.get("lineup_change"):
+            lineup.apply(meta["lineup_change"])
+    return lineup
+
+
+class LineupTracker:
+    """Per-process MatchLineup cache (including "no lineup", to skip the query)."""
+
+    def __init__(
+        self,
+        ttl_seconds: int,
+        load: Callable[[Any, int], Awaitable[Optional[MatchLineup]]] = load_match_lineup,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self._load = load
+        self._entries: Dict[int, Tuple[float, Optional[MatchLineup]]] = {}
+
+    async def get(self, session, match_id: int) -> Optional[MatchLineup]:
+        entry = self._entries.get(match_id)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        lineup = await self._load(session, match_id)
+        self._entries[match_id] = (time.monotonic() + self.ttl_seconds, lineup)
+        return lineup
+
+    def invalidate(self, match_id: int) -> None:
+        self._entries.pop(match_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+# Singleton instance
+_tracker: Optional[LineupTracker] = None
+
+
+def get_lineup_tracker() -> LineupTracker:
+    """Get the process-wide lineup tracker."""
+    global _tracker
+    if _tracker is None:
+        _tracker = LineupTracker(ttl_seconds=get_settings().LINEUP_CACHE_TTL)
+    return _tracker
@@ -0,0 +1,118 @@
+# backend/services/pipeline.py
+"""
+Decoded audio -> transcript.
+
+The steps every transcription path shares once audio is in memory:
+VAD pre-pass, transcript cache lookup, batched decode in the worker pool.
+Raises TranscriptionQueueFull / TranscriptionTimeout for the caller to map.
+"""
+import asyncio
+import logging
+import math
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from backend.services.audio import SAMPLE_RATE
+from backend.services.batching import get_transcription_batcher
+from backend.services.transcript_cache import cache_key, get_transcript_cache
+from backend.services.transcription import get_transcription_executor
+from backend.services.vad import detect_speech
+from backend.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+NO_SPEECH = "[No speech detected]"
+
+
+async def transcribe_samples(audio: np.ndarray, audio_digest: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Transcribe 16 kHz float32 samples.
+
+    `audio_digest` is the SHA-256 of the original upload; without it the
+    transcript cache is skipped.
+    """
+    settings = get_settings()
+    executor = get_transcription_executor()
+    duration = audio.size / SAMPLE_RATE
+
+    # Cheap VAD pre-pass: trim silence, skip clips with no speech,
+    # split long clips on pauses into <= 30 s decode windows
+    vad_start = time.perf_counter()
+    if settings.VAD_ENABLED:
+        vad = detect_speech(
+            audio,
+            threshold=settings.VAD_ENERGY_THRESHOLD,
+            max_segment_s=settings.VAD_MAX_SEGMENT_SECONDS,
+        )
+        segments = vad.segments
+        vad_report = vad.report()
+    else:
+        segments = [audio]
+        vad_report = None
+    # VAD can split a clip into more segments than the fixed 30 s windows it
+    # replaces; that is not a saving, so never report a negative one
+    windows_saved = max(0, max(1, math.ceil(duration / 30)) - len(segments))
+    if vad_report is not None:
+        vad_report["vad_ms"] = round(1000 * (time.perf_counter() - vad_start), 2)
+        vad_report["decode_windows"] = len(segments)
+        vad_report["decode_windows_saved"] = windows_saved
+        vad_report["estimated_seconds_saved"] = round(windows_saved * executor.avg_job_seconds, 3)
+        logger.info(f"VAD: {vad_report}")
+
+    if not segments:
+        logger.info("No voiced frames, skipping transcription")
+        return {
+            "transcript": NO_SPEECH,
+            "confidence": None,
+            "duration": round(duration, 3),
+            "language": None,
+            "cached": False,
+            "vad": vad_report,
+        }
+
+    cache = get_transcript_cache()
+    key = None
+    result = None
+    if audio_digest is not None:
+        key = cache_key(
+            audio_digest,
+            executor.model_name,
+            {
+                **executor.engine_config,
+                "vad": settings.VAD_ENABLED and settings.VAD_ENERGY_THRESHOLD,
+            },
+        )
+        result = await cache.get(key)
+    cached = result is not None
+    if cached:
+        logger.info("Transcript cache hit, skipping decode")
+    else:
+        logger.info(f"Starting transcription of {len(segments)} segment(s)...")
+        # Concurrent short clips (and the segments of a long one)
+        # share batched decode passes
+        batcher = get_transcription_batcher()
+        parts = await asyncio.gather(*(batcher.transcribe(seg) for seg in segments))
+        result = {
+            "text": " ".join(p["text"].strip() for p in parts),
+            "language": parts[0].get("language"),
+            "decode_seconds": sum(p.get("decode_seconds") or 0.0 for p in parts),
+        }
+        if key is not None:
+            await cache.set(key, result)
+
+    transcript = result["text"].strip()
+    if not transcript:
+        logger.warning("Transcription returned empty result")
+        transcript = NO_SPEECH
+
+    logger.info(f"Transcription completed: '{transcript[:100]}{'...' if len(transcript) > 100 else ''}'")
+    return {
+        "transcript": transcript,
+        "confidence": None,
+        "duration": round(duration, 3),
+        "language": result.get("language"),
+        "cached": cached,
+        "vad": vad_report,
+    }
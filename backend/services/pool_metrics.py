@@ -0,0 +1,172 @@
+# backend/services/pool_metrics.py
+"""
+Database connection pool instrumentation (GET /metrics/db-pool).
+
+  - checked out / checked in / overflow: the pool's own gauges, plus the
+    peak number of connections checked out at once
+  - acquire wait: time spent getting a connection from the pool (waiting
+    for a free one, or opening a new one), measured by InstrumentedPool,
+    and how many acquisitions timed out (DB_POOL_TIMEOUT)
+  - hold time per route: checkout to checkin, attributed to the route
+    template ("GET /match/{match_id}") of the request that held it;
+    connections taken outside a request count as "background"
+
+The request is known through a context variable set by the HTTP
+middleware (track_request); the route is read from the ASGI scope at
+checkout, once routing has filled it in.
+"""
+import contextvars
+import statistics
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+BACKGROUND = "background"
+# Recent samples kept for percentiles
+WINDOW = 1000
+
+_request_scope: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar(
+    "request_scope", default=None
+)
+
+
+def track_request(scope: Dict[str, Any]) -> None:
+    """Attribute connections checked out from here on to this request's route."""
+    _request_scope.set(scope)
+
+
+def current_route() -> str:
+    scope = _request_scope.get()
+    if scope is None:
+        return BACKGROUND
+    route = scope.get("route")
+    path = route.path if route is not None else scope.get("path", "?")
+    return f"{scope.get('method', '')} {path}".strip()
+
+
+def _ms_summary(samples: Deque[float]) -> Dict[str, float]:
+    if not samples:
+        return {"p50_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(1000 * statistics.median(ordered), 3),
+        "p99_ms": round(1000 * ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))], 3),
+        "max_ms": round(1000 * ordered[-1], 3),
+    }
+
+
+class _RouteHolds:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.recent: Deque[float] = deque(maxlen=WINDOW)
+
+
+class PoolMetrics:
+    def __init__(self):
+        self.acquisitions = 0
+        self.timeouts = 0
+        self.acquire_total = 0.0
+        self._acquire_recent: Deque[float] = deque(maxlen=WINDOW)
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self._routes: Dict[str, _RouteHolds] = {}
+
+    def record_acquire(self, seconds: float, timed_out: bool = False) -> None:
+        self.acquisitions += 1
+        self.timeouts += timed_out
+        self.acquire_total += seconds
+        self._acquire_recent.append(seconds)
+
+    def record_checkout(self) -> None:
+        self.checked_out += 1
+        self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def record_checkin(self, route: str, held: float) -> None:
+        self.checked_out -= 1
+        holds = self._routes.get(route)
+        if holds is None:
+            holds = self._routes[route] = _RouteHolds()
+        holds.count += 1
+        holds.total += held
+        holds.recent.append(held)
+
+    def stats(self, pool: Optional[Any] = None) -> Dict[str, Any]:
+        routes = {
+            route: {
+                "checkouts": h.count,
+                "mean_ms": round(1000 * h.total / h.count, 3),
+                "total_s": round(h.total, 3),
+                **_ms_summary(h.recent),
+            }
+            for route, h in sorted(self._routes.items(), key=lambda item: -item[1].total)
+        }
+        acquire = {
+            "count": self.acquisitions,
+            "timeouts": self.timeouts,
+            "mean_ms": round(1000 * self.acquire_total / self.acquisitions, 3) if self.acquisitions else 0.0,
+            **_ms_summary(self._acquire_recent),
+        }
+        result: Dict[str, Any] = {"peak_checked_out": self.peak_checked_out}
+        if pool is not None:
+            result.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+            })
+        return {**result, "acquire": acquire, "hold_by_route": routes}
+
+    def reset(self) -> None:
+        """Clear the counters (the checked-out gauge keeps counting)."""
+        self.acquisitions = self.timeouts = 0
+        self.acquire_total = 0.0
+        self._acquire_recent.clear()
+        self.peak_checked_out = self.checked_out
+        self._routes.clear()
+
+
+# Singleton instance
+_metrics: Optional[PoolMetrics] = None
+
+
+def get_pool_metrics() -> PoolMetrics:
+    """Get the process-wide pool metrics."""
+    global _metrics
+    if _metrics is None:
+        _metrics = PoolMetrics()
+    return _metrics
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that times every connection acquisition."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeout:
+            get_pool_metrics().record_acquire(time.perf_counter() - start, timed_out=True)
+            raise
+        get_pool_metrics().record_acquire(time.perf_counter() - start)
+        return connection
+
+
+def instrument_pool(pool: Any) -> None:
+    """Record checkout-to-checkin hold times per route on `pool`."""
+
+    @event.listens_for(pool, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        connection_record.info["pool_checkout"] = (time.perf_counter(), current_route())
+        get_pool_metrics().record_checkout()
+
+    @event.listens_for(pool, "checkin")
+    def _checkin(dbapi_connection, connection_record) -> None:
+        checkout = connection_record.info.pop("pool_checkout", None)
+        if checkout is not None:
+            started, route = checkout
+            get_pool_metrics().record_checkin(route, time.perf_counter() - started)
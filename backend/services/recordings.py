@@ -0,0 +1,322 @@
+# backend/services/recordings.py
+"""
+Whole-match recordings.
+
+A coach records the full match and uploads it afterwards in chunks
+(resumable: each chunk is appended at an explicit byte offset). Ingestion
+then streams the file through ffmpeg a window at a time, cuts speech out on
+pauses, transcribes the segments in parallel through the worker pool and
+turns each one into an Event, with the minute derived from the segment's
+position in the recording and Match.kickoff_at.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend import models
+from backend.crud.events import insert_events
+from backend.db import AsyncSessionLocal
+from backend.services.audio import SAMPLE_RATE, AudioTooLarge, iter_decoded_windows
+from backend.services.batching import get_transcription_batcher
+from backend.services.command_parser import parse_events_with_db
+from backend.services.event_ingest import match_minute
+from backend.services.transcription import TranscriptionQueueFull
+from backend.services.vad import voiced_mask, split_on_pauses
+from backend.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Audio decoded and scanned for speech per step; keeps memory flat for 90+ min files
+WINDOW_SECONDS = 120.0
+
+
+class UploadOffsetMismatch(Exception):
+    """A chunk was sent for an offset other than the current end of the upload."""
+
+    def __init__(self, expected: int):
+        super().__init__(f"Expected offset {expected}")
+        self.expected = expected
+
+
+class RecordingNotFound(Exception):
+    pass
+
+
+class RecordingMatchMissing(Exception):
+    """The recording's match was deleted before its events could be stored."""
+
+
+# --- Chunked upload storage ---------------------------------------------------
+def _paths(upload_id: str) -> Tuple[str, str]:
+    root = get_settings().RECORDINGS_DIR
+    return os.path.join(root, f"{upload_id}.part"), os.path.join(root, f"{upload_id}.json")
+
+
+def create_upload(match_id: int, content_type: str, started_at: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Start a new upload; `started_at` is when recording began (default:
+    kickoff) and must be timezone-aware. It is stored in UTC.
+    """
+    if started_at is not None and started_at.tzinfo is None:
+        raise ValueError("started_at needs a timezone")
+    os.makedirs(get_settings().RECORDINGS_DIR, exist_ok=True)
+    meta = {
+        "upload_id": uuid.uuid4().hex,
+        "match_id": match_id,
+        "content_type": content_type,
+        "started_at": started_at.astimezone(timezone.utc).isoformat() if started_at else None,
+        "created_at": time.time(),
+    }
+    data_path, meta_path = _paths(meta["upload_id"])
+    open(data_path, "wb").close()
+    with open(meta_path, "w") as f:
+        json.dump(meta, f)
+    return meta
+
+
+def load_upload(upload_id: str) -> Dict[str, Any]:
+    """Upload metadata plus the number of bytes received so far."""
+    data_path, meta_path = _paths(upload_id)
+    if not os.path.exists(meta_path):
+        raise RecordingNotFound(upload_id)
+    with open(meta_path) as f:
+        meta = json.load(f)
+    meta["received_bytes"] = os.path.getsize(data_path)
+    return meta
+
+
+async def append_chunk(upload_id: str, offset: int, chunks: AsyncIterator[bytes]) -> int:
+    """
+    Append a chunk at `offset` (must equal the bytes already received, so a
+    client that lost its connection can ask where to resume). Returns the
+    new size.
+    """
+    meta = load_upload(upload_id)
+    if offset != meta["received_bytes"]:
+        raise UploadOffsetMismatch(meta["received_bytes"])
+
+    max_bytes = get_settings().RECORDING_MAX_BYTES
+    data_path, _ = _paths(upload_id)
+    size = offset
+    with open(data_path, "r+b") as f:
+        f.seek(offset)
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise AudioTooLarge(f"Recording exceeds {max_bytes} bytes")
+                f.write(chunk)
+        except BaseException:
+            # Drop the partial chunk so the client can resend it from `offset`
+            f.truncate(offset)
+            raise
+    return size
+
+
+def delete_upload(upload_id: str) -> None:
+    for path in _paths(upload_id):
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+# --- Decoding and segmentation -------------------------------------------------
+async def iter_speech_segments(
+    windows: AsyncIterator[np.ndarray],
+    threshold: float,
+    max_segment_s: float,
+) -> AsyncIterator[Tuple[int, np.ndarray]]:
+    """
+    Yield (start_sample, samples) for each speech segment across all windows.
+
+    Each phrase is its own segment (so it gets its own timestamp), and a
+    segment still running at the end of a window is carried into the next
+    one, so utterances are never cut at a window boundary.
+    """
+    carry = np.zeros(0, dtype=np.float32)
+    base = 0  # sample offset of carry[0] in the recording
+    async for window in windows:
+        buffer = np.concatenate([carry, window]) if carry.size else window
+        spans = split_on_pauses(
+            voiced_mask(buffer, threshold=threshold), max_segment_s=max_segment_s, pack=False
+        )
+        hold_from = buffer.size
+        if spans and spans[-1][1] >= buffer.size - SAMPLE_RATE:
+            # Speech up to the edge of the window: finish it with the next one
+            hold_from = spans[-1][0]
+            spans = spans[:-1]
+        for start, end in spans:
+            yield base + start, buffer[start:end]
+        carry = buffer[hold_from:]
+        base += hold_from
+
+    if carry.size:
+        for start, end in split_on_pauses(
+            voiced_mask(carry, threshold=threshold), max_segment_s=max_segment_s, pack=False
+        ):
+            yield base + start, carry[start:end]
+
+
+# --- Ingestion -------------------------------------------------------------------
+class IngestProgress:
+    """Counters reported by GET /matches/{match_id}/recordings/{upload_id}."""
+
+    def __init__(self, match_id: int) -> None:
+        self.match_id = match_id
+        self.status = "processing"
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.audio_seconds = 0.0
+        self.segments_found = 0
+        self.segments_transcribed = 0
+        self.events_created = 0
+        self.error: Optional[str] = None
+
+    def report(self) -> Dict[str, Any]:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        return {
+            "match_id": self.match_id,
+            "status": self.status,
+            "audio_seconds_decoded": round(self.audio_seconds, 1),
+            "segments_found": self.segments_found,
+            "segments_transcribed": self.segments_transcribed,
+            "events_created": self.events_created,
+            "elapsed_seconds": round(elapsed, 1),
+            # Throughput: how many minutes of recording are processed per minute of wall time
+            "audio_minutes_per_wall_minute": round(self.audio_seconds / elapsed, 2) if elapsed else 0.0,
+            "error": self.error,
+        }
+
+
+_progress: Dict[str, IngestProgress] = {}
+_tasks: Dict[str, asyncio.Task] = {}
+
+
+def _prune_progress() -> None:
+    """Forget ingestions that finished more than RECORDING_PROGRESS_TTL seconds ago."""
+    cutoff = time.perf_counter() - get_settings().RECORDING_PROGRESS_TTL
+    for upload_id in [k for k, p in _progress.items() if p.finished is not None and p.finished < cutoff]:
+        del _progress[upload_id]
+
+
+def get_progress(upload_id: str) -> Optional[IngestProgress]:
+    _prune_progress()
+    return _progress.get(upload_id)
+
+
+async def _transcribe_segment(samples: np.ndarray) -> str:
+    batcher = get_transcription_batcher()
+    while True:
+        try:
+            result = await batcher.transcribe(samples)
+            return result["text"].strip()
+        except TranscriptionQueueFull as e:
+            # Live requests have priority; wait our turn instead of failing
+            await asyncio.sleep(e.retry_after)
+
+
+async def ingest_recording(upload_id: str, progress: IngestProgress) -> None:
+    """Transcribe a finished upload and bulk-create its events."""
+    settings = get_settings()
+    meta = load_upload(upload_id)
+    data_path, _ = _paths(upload_id)
+
+    async with AsyncSessionLocal() as session:
+        match = await session.get(models.Match, meta["match_id"])
+    if match is None:
+        raise RecordingMatchMissing("Match not found")
+    started_at = datetime.fromisoformat(meta["started_at"]) if meta["started_at"] else match.kickoff_at
+
+    # Bounded fan-out: enough segments in flight to keep every worker (and
+    # the micro-batcher) busy without decoding the whole match into memory
+    slots = asyncio.Semaphore(max(1, settings.RECORDING_CONCURRENCY))
+    transcripts: List[Tuple[int, str]] = []
+
+    async def transcribe(start: int, samples: np.ndarray) -> None:
+        try:
+            text = await _transcribe_segment(samples)
+            if text:
+                transcripts.append((start, text))
+            progress.segments_transcribed += 1
+        finally:
+            slots.release()
+
+    async def windows() -> AsyncIterator[np.ndarray]:
+        async for window in iter_decoded_windows(data_path, WINDOW_SECONDS):
+            progress.audio_seconds += window.size / SAMPLE_RATE
+            yield window
+
+    tasks = []
+    try:
+        async for start, samples in iter_speech_segments(
+            windows(), settings.VAD_ENERGY_THRESHOLD, settings.VAD_MAX_SEGMENT_SECONDS
+        ):
+            progress.segments_found += 1
+            await slots.acquire()
+            tasks.append(asyncio.create_task(transcribe(start, samples)))
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+    # Parse every segment, then insert all events in one statement
+    transcripts.sort()
+    opponents = [match.opponent_name] if match.opponent_name else []
+    async with AsyncSessionLocal() as session:
+        rows = []
+        for start, text in transcripts:
+            offset_seconds = start / SAMPLE_RATE
+            spoken_at = match_minute(match, at=started_at + timedelta(seconds=offset_seconds))
+            for parsed in await parse_events_with_db(text, session, match.team_id, opponents):
+                rows.append({
+                    "match_id": match.id,
+                    "minute": parsed["minute"] if parsed["minute"] is not None else spoken_at,
+                    "event_type": parsed["event_type"],
+                    "team_context": "us",
+                    "player_id": parsed.get("player_id"),
+                    "raw_text": parsed["raw_text"],
+                    "meta_json": {
+                        **parsed,
+                        "transcript": text,
+                        "recording": {"upload_id": upload_id, "offset_seconds": round(offset_seconds, 2)},
+                    },
+                })
+        ids = await insert_events(session, rows)
+        if rows and not ids and await session.get(models.Match, match.id) is None:
+            await session.rollback()
+            raise RecordingMatchMissing("Match was deleted during ingestion")
+        await session.commit()
+    progress.events_created = len(ids)
+
+
+async def _run_ingest(upload_id: str, progress: IngestProgress) -> None:
+    try:
+        await ingest_recording(upload_id, progress)
+        progress.status = "done"
+        delete_upload(upload_id)
+    except Exception as e:
+        logger.exception(f"Recording {upload_id} failed")
+        progress.status = "failed"
+        progress.error = str(e) or type(e).__name__
+    finally:
+        progress.finished = time.perf_counter()
+        _tasks.pop(upload_id, None)
+        logger.info(f"Recording {upload_id}: {progress.report()}")
+
+
+def start_ingest(upload_id: str, match_id: int) -> IngestProgress:
+    """Kick off ingestion in the background (idempotent while it is running)."""
+    if upload_id in _tasks:
+        return _progress[upload_id]
+    _prune_progress()
+    progress = IngestProgress(match_id)
+    _progress[upload_id] = progress
+    _tasks[upload_id] = asyncio.create_task(_run_ingest(upload_id, progress))
+    return progress
@@ -0,0 +1,130 @@
+# backend/services/roster_cache.py
+"""
+Per-team roster cache for the command parser.
+
+Rosters almost never change during a match, so parse_with_db should not
+query players for every voice command. Entries hold the roster in the
+shapes the parser needs and carry the team's version; any ORM insert,
+update or delete of a Player bumps that version (after the commit), and a
+TTL covers writes this process cannot see (raw SQL, other API processes).
+"""
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from backend import models
+from backend.crud.players import get_team_roster
+from backend.services.roster_index import RosterIndex
+from backend.settings import get_settings
+
+_DIRTY_TEAMS = "roster_cache_dirty_teams"
+
+
+class RosterEntry:
+    """One team's roster, preprocessed for name resolution."""
+
+    def __init__(self, team_id: int, version: tuple, players: List[Dict], expires_at: float):
+        self.team_id = team_id
+        self.version = version
+        self.players = players  # [{"id","name","position"}, ...]
+        self.index = RosterIndex(players)
+        self.expires_at = expires_at
+
+
+class RosterCache:
+    def __init__(
+        self,
+        ttl_seconds: int,
+        fetch: Callable[[Any, int], Awaitable[List[Dict]]] = get_team_roster,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self._fetch = fetch
+        self._entries: Dict[int, RosterEntry] = {}
+        self._versions: Dict[int, int] = {}
+        self._generation = 0  # bumped by invalidate_all
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def version(self, team_id: int) -> tuple:
+        return (self._generation, self._versions.get(team_id, 0))
+
+    async def get(self, session, team_id: int) -> RosterEntry:
+        version = self.version(team_id)
+        entry = self._entries.get(team_id)
+        if entry is not None and entry.version == version and entry.expires_at > time.monotonic():
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        players = await self._fetch(session, team_id)
+        entry = RosterEntry(team_id, version, players, time.monotonic() + self.ttl_seconds)
+        # Don't store a roster that was invalidated while we were reading it
+        if self.version(team_id) == version:
+            self._entries[team_id] = entry
+        return entry
+
+    def invalidate(self, team_id: int) -> None:
+        self._versions[team_id] = self._versions.get(team_id, 0) + 1
+        self._entries.pop(team_id, None)
+        self.invalidations += 1
+
+    def invalidate_all(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+        self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+# Singleton instance
+_cache: Optional[RosterCache] = None
+
+
+def get_roster_cache() -> RosterCache:
+    """Get the process-wide roster cache."""
+    global _cache
+    if _cache is None:
+        _cache = RosterCache(ttl_seconds=get_settings().ROSTER_CACHE_TTL)
+    return _cache
+
+
+# --- Invalidation on Player writes ---------------------------------------------
+def _player_teams(obj: models.Player) -> Set[int]:
+    teams = {obj.team_id}
+    # A player moved to another team leaves the old roster too
+    teams.update(inspect(obj).attrs.team_id.history.deleted or ())
+    return {t for t in teams if t is not None}
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_player_changes(session: Session, flush_context) -> None:
+    dirty: Set[int] = session.info.setdefault(_DIRTY_TEAMS, set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, models.Player):
+            dirty.update(_player_teams(obj))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    teams = session.info.pop(_DIRTY_TEAMS, None)
+    if teams:
+        cache = get_roster_cache()
+        for team_id in teams:
+            cache.invalidate(team_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop(_DIRTY_TEAMS, None)
@@ -0,0 +1,192 @@
+# backend/services/roster_index.py
+"""
+Precomputed name-resolution index for a roster.
+
+Resolution order for each capitalized token of a transcript:
+  1. exact (case-insensitive) name -> player hash lookup
+  2. phonetic key (Soundex) hash lookup, for ASR spellings like "Wynston"
+  3. fuzzy fallback: one rapidfuzz cdist call scoring every unresolved
+     token against every roster key at once (extractOne when only one
+     token is left, where cdist's setup cost dominates)
+
+Matches carry the player row, so callers get the id without another scan.
+"""
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+from rapidfuzz import fuzz, process
+
+# Same bar resolve_name has always used for token_sort_ratio
+FUZZY_MIN_SCORE = 75
+# A phonetic hit only needs to be roughly similar in spelling as well
+PHONETIC_MIN_SCORE = 50
+
+# Soundex digits; vowels become "." (they separate repeated codes), h/w and
+# anything else are dropped (they don't)
+_SOUNDEX = str.maketrans(
+    "bfpvcgjkqsxzdtlmnraeiouy",
+    "111122222222334556......",
+    "hw'-. ",
+)
+_REPEATS = re.compile(r"(\d)\1+")
+
+
+def fuzzy_key(name: str) -> str:
+    """Name as token_sort_ratio sees it, so matching can use plain ratio."""
+    return " ".join(sorted(name.split()))
+
+
+def _soundex(word: str) -> str:
+    word = word.lower()
+    if not word or not word[0].isalpha():
+        return ""
+    codes = _REPEATS.sub(r"\1", word.translate(_SOUNDEX))
+    # The first letter is kept as a letter; drop its code (h/w have none)
+    if word[0].translate(_SOUNDEX):
+        codes = codes[1:]
+    return (word[0].upper() + codes.replace(".", ""))[:4].ljust(4, "0")
+
+
+@lru_cache(maxsize=4096)
+def phonetic_key(name: str) -> str:
+    """Soundex of each word, in sorted word order (like fuzzy_key)."""
+    return " ".join(filter(None, (_soundex(w) for w in sorted(name.split()))))
+
+
+class RosterMatch:
+    """A token resolved to a roster entry."""
+
+    __slots__ = ("token", "name", "player", "score", "method")
+
+    def __init__(self, token: str, name: str, player: Dict, score: float, method: str):
+        self.token = token
+        self.name = name
+        self.player = player
+        self.score = score
+        self.method = method  # "exact" | "phonetic" | "fuzzy"
+
+
+class RosterIndex:
+    def __init__(self, players: Sequence[Dict]):
+        """`players` are roster rows ({"id", "name", "position"}); ids may be absent."""
+        self.players = list(players)
+        self.names = [p["name"] for p in self.players]
+        self.keys = [fuzzy_key(n) for n in self.names]
+        self._exact: Dict[str, int] = {}
+        self._phonetic: Dict[str, List[int]] = {}
+        for i, name in enumerate(self.names):
+            self._exact.setdefault(name.lower(), i)
+            self._phonetic.setdefault(phonetic_key(name), []).append(i)
+
+    @classmethod
+    def from_names(cls, names: Sequence[str]) -> "RosterIndex":
+        return cls([{"id": None, "name": n, "position": None} for n in names])
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _match(self, token: str, i: int, score: float, method: str) -> RosterMatch:
+        return RosterMatch(token, self.names[i], self.players[i], score, method)
+
+    def _lookup_exact(self, token: str) -> Optional[RosterMatch]:
+        i = self._exact.get(token.lower())
+        return self._match(token, i, 100.0, "exact") if i is not None else None
+
+    def _lookup(self, token: str) -> Optional[RosterMatch]:
+        exact = self._lookup_exact(token)
+        if exact is not None:
+            return exact
+        bucket = self._phonetic.get(phonetic_key(token))
+        if bucket:
+            key = fuzzy_key(token)
+            scores = {i: fuzz.ratio(key, self.keys[i]) for i in bucket}
+            i = max(bucket, key=scores.__getitem__)  # first on ties, like extractOne
+            if scores[i] >= PHONETIC_MIN_SCORE:
+                return self._match(token, i, scores[i], "phonetic")
+        return None
+
+    def resolve_all(self, tokens: Sequence[str]) -> List[Optional[RosterMatch]]:
+        """Resolve every token; fuzzy scoring for the leftovers is one cdist call."""
+        if not self.names:
+            return [None] * len(tokens)
+        matches = [self._lookup(t) for t in tokens]
+        pending = [j for j, m in enumerate(matches) if m is None]
+        if len(pending) == 1:
+            # cdist's fixed setup cost dominates for a single row
+            j = pending[0]
+            result = process.extractOne(
+                fuzzy_key(tokens[j]), self.keys, scorer=fuzz.ratio, score_cutoff=FUZZY_MIN_SCORE
+            )
+            if result:
+                _, score, i = result
+                matches[j] = self._match(tokens[j], i, score, "fuzzy")
+        elif pending:
+            scores = process.cdist(
+                [fuzzy_key(tokens[j]) for j in pending],
+                self.keys,
+                scorer=fuzz.ratio,
+                score_cutoff=FUZZY_MIN_SCORE,
+            )
+            best = scores.argmax(axis=1)
+            for row, j in enumerate(pending):
+                score = float(scores[row, best[row]])
+                if score >= FUZZY_MIN_SCORE:
+                    matches[j] = self._match(tokens[j], int(best[row]), score, "fuzzy")
+        return matches
+
+    def resolve_first(self, tokens: Sequence[str]) -> Optional[RosterMatch]:
+        """First token (in transcript order) that resolves to a player."""
+        if not tokens or not self.names:
+            return None
+        # Cheap path: most commands name a player spelled exactly right
+        first = self._lookup(tokens[0])
+        if first is not None:
+            return first
+        return next((m for m in self.resolve_all(tokens) if m is not None), None)
+
+
+class ScopedRosterIndex:
+    """
+    RosterIndex over nested candidate sets, narrowest first (e.g. players on
+    the pitch, then the matchday squad, then the whole team). A name spelled
+    exactly right resolves to that player wherever they are ("Tom" on the
+    bench beats "Tommy" on the pitch); any other token is resolved in the
+    narrowest set where it resolves at all, so a misheard name picks the
+    player who is actually playing over a closer spelling elsewhere in the
+    club.
+    """
+
+    def __init__(self, scopes: Sequence[RosterIndex]):
+        self.scopes = [s for s in scopes if len(s)]
+        self.names = scopes[-1].names  # the widest set
+        self.players = scopes[-1].players
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _lookup_exact(self, token: str) -> Optional[RosterMatch]:
+        for scope in self.scopes:
+            match = scope._lookup_exact(token)
+            if match is not None:
+                return match
+        return None
+
+    def resolve_all(self, tokens: Sequence[str]) -> List[Optional[RosterMatch]]:
+        matches = [self._lookup_exact(t) for t in tokens]
+        pending = [j for j, m in enumerate(matches) if m is None]
+        for scope in self.scopes:
+            if not pending:
+                break
+            for j, m in zip(pending, scope.resolve_all([tokens[j] for j in pending])):
+                matches[j] = m
+            pending = [j for j in pending if matches[j] is None]
+        return matches
+
+    def resolve_first(self, tokens: Sequence[str]) -> Optional[RosterMatch]:
+        if not tokens or not self.scopes:
+            return None
+        first = self._lookup_exact(tokens[0])
+        if first is not None:
+            return first
+        return next((m for m in self.resolve_all(tokens) if m is not None), None)
@@ -0,0 +1,114 @@
+# backend/services/streaming.py
+"""
+Rolling-window state for streamed transcription.
+
+The client sends raw PCM as it records. UtteranceSegmenter frames it,
+runs a cheap energy endpointer and hands back complete utterances as soon
+as the coach stops speaking, plus a growing window for partial decodes.
+"""
+from collections import deque
+from typing import List, Optional
+
+import numpy as np
+
+from backend.services.audio import SAMPLE_RATE, pcm16_to_float32  # noqa: F401 (re-exported)
+from backend.services.vad import DEFAULT_ENERGY_THRESHOLD, FRAME_MS, FRAME_SAMPLES
+
+# Decoding options tuned for short English voice commands
+STREAM_DECODE_OPTIONS = {
+    "temperature": 0.0,
+    "condition_on_previous_text": False,
+    "fp16": False,
+}
+
+
+class UtteranceSegmenter:
+    """
+    Split a live 16 kHz stream into utterances.
+
+    An utterance starts at the first voiced frame (with a little pre-roll)
+    and ends after `endpoint_silence_ms` of unvoiced frames, or when it
+    reaches `max_utterance_s`.
+    """
+
+    def __init__(
+        self,
+        energy_threshold: float = DEFAULT_ENERGY_THRESHOLD,
+        endpoint_silence_ms: int = 400,
+        preroll_ms: int = 200,
+        max_utterance_s: float = 15.0,
+        partial_interval_ms: int = 500,
+    ):
+        self.energy_threshold = energy_threshold
+        self.endpoint_frames = max(1, endpoint_silence_ms // FRAME_MS)
+        self.max_frames = int(max_utterance_s * 1000 // FRAME_MS)
+        self.partial_frames = max(1, partial_interval_ms // FRAME_MS)
+
+        self._remainder = np.zeros(0, dtype=np.float32)
+        self._preroll: deque = deque(maxlen=max(1, preroll_ms // FRAME_MS))
+        self._frames: List[np.ndarray] = []
+        self._silence_run = 0
+        self._frames_at_last_partial = 0
+        self.in_speech = False
+        # Incremented each time an utterance is completed
+        self.utterance_index = 0
+
+    def _is_voiced(self, frame: np.ndarray) -> bool:
+        return float(np.sqrt(np.mean(frame * frame))) >= self.energy_threshold
+
+    def _complete(self) -> np.ndarray:
+        # Keep a short tail of the trailing silence, drop the rest
+        keep = len(self._frames) - max(0, self._silence_run - 3)
+        audio = np.concatenate(self._frames[:keep])
+        self._frames = []
+        self._silence_run = 0
+        self._frames_at_last_partial = 0
+        self.in_speech = False
+        self.utterance_index += 1
+        return audio
+
+    def feed(self, samples: np.ndarray) -> List[np.ndarray]:
+        """Add samples; return any utterances completed by them."""
+        completed: List[np.ndarray] = []
+        buf = np.concatenate([self._remainder, samples]) if self._remainder.size else samples
+        n_frames = buf.size // FRAME_SAMPLES
+
+        for i in range(n_frames):
+            frame = buf[i * FRAME_SAMPLES:(i + 1) * FRAME_SAMPLES]
+            voiced = self._is_voiced(frame)
+
+            if not self.in_speech:
+                if voiced:
+                    self.in_speech = True
+                    self._frames = list(self._preroll) + [frame]
+                    self._preroll.clear()
+                    self._silence_run = 0
+                else:
+                    self._preroll.append(frame)
+                continue
+
+            self._frames.append(frame)
+            self._silence_run = 0 if voiced else self._silence_run + 1
+            if self._silence_run >= self.endpoint_frames or len(self._frames) >= self.max_frames:
+                completed.append(self._complete())
+
+        self._remainder = buf[n_frames * FRAME_SAMPLES:].copy()
+        return completed
+
+    def take_partial(self) -> Optional[np.ndarray]:
+        """Current utterance audio, if enough new speech arrived since the last partial."""
+        if not self.in_speech:
+            return None
+        if len(self._frames) - self._frames_at_last_partial < self.partial_frames:
+            return None
+        self._frames_at_last_partial = len(self._frames)
+        return np.concatenate(self._frames)
+
+    def flush(self) -> Optional[np.ndarray]:
+        """Force-complete the current utterance (client said it stopped)."""
+        if self._remainder.size and self.in_speech:
+            self._frames.append(self._remainder)
+        self._remainder = np.zeros(0, dtype=np.float32)
+        if not self.in_speech or not self._frames:
+            return None
+        return self._complete()
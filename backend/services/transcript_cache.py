@@ -0,0 +1,144 @@
+# backend/services/transcript_cache.py
+"""
+Content-addressed transcript cache.
+
+Keys are a SHA-256 of the uploaded bytes plus the model and decoding
+options, so a retried upload of the same clip skips the Whisper decode.
+Two tiers: an in-process LRU, and optionally Redis (shared by all API
+processes) using Settings.REDIS_URL.
+"""
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Optional
+
+from backend.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+_REDIS_PREFIX = "transcript-cache:"
+_REDIS_INDEX = "transcript-cache:index"
+
+
+async def hash_chunks(chunks: AsyncIterator[bytes], hasher) -> AsyncIterator[bytes]:
+    """Pass chunks through unchanged while feeding them to `hasher`."""
+    async for chunk in chunks:
+        hasher.update(chunk)
+        yield chunk
+
+
+def cache_key(audio_digest: str, model: str, options: Dict[str, Any]) -> str:
+    """Combine the audio hash with everything that changes the transcript."""
+    fingerprint = json.dumps({"model": model, **options}, sort_keys=True, default=str)
+    options_digest = hashlib.sha256(fingerprint.encode()).hexdigest()[:16]
+    return f"{audio_digest}:{options_digest}"
+
+
+class TranscriptCache:
+    def __init__(self, max_entries: int, ttl_seconds: int, redis_url: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.redis_url = redis_url
+        self._redis = None
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self.hits_memory = 0
+        self.hits_redis = 0
+        self.misses = 0
+        self.decode_seconds_saved = 0.0
+
+    def _get_redis(self):
+        if self._redis is None and self.redis_url:
+            import redis.asyncio as redis
+
+            self._redis = redis.from_url(self.redis_url)
+        return self._redis
+
+    def _remember(self, key: str, value: Dict[str, Any]) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _hit(self, value: Dict[str, Any]) -> Dict[str, Any]:
+        self.decode_seconds_saved += value.get("decode_seconds") or 0.0
+        return value
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits_memory += 1
+                return self._hit(value)
+            del self._entries[key]
+
+        redis = self._get_redis()
+        if redis is not None:
+            try:
+                raw = await redis.get(_REDIS_PREFIX + key)
+            except Exception as e:
+                logger.warning(f"Transcript cache Redis lookup failed: {e}")
+                raw = None
+            if raw is not None:
+                value = json.loads(raw)
+                self._remember(key, value)
+                self.hits_redis += 1
+                return self._hit(value)
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        self._remember(key, value)
+
+        redis = self._get_redis()
+        if redis is None:
+            return
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.set(_REDIS_PREFIX + key, json.dumps(value), ex=self.ttl_seconds)
+                pipe.zadd(_REDIS_INDEX, {key: time.time()})
+                await pipe.execute()
+            # Enforce the size cap by evicting the oldest keys
+            overflow = await redis.zcard(_REDIS_INDEX) - self.max_entries
+            if overflow > 0:
+                oldest = await redis.zpopmin(_REDIS_INDEX, overflow)
+                if oldest:
+                    await redis.delete(*(_REDIS_PREFIX + k.decode() for k, _ in oldest))
+        except Exception as e:
+            logger.warning(f"Transcript cache Redis write failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits_memory + self.hits_redis + self.misses
+        hits = self.hits_memory + self.hits_redis
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "redis_enabled": bool(self.redis_url),
+            "hits_memory": self.hits_memory,
+            "hits_redis": self.hits_redis,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "decode_seconds_saved": round(self.decode_seconds_saved, 3),
+        }
+
+
+# Singleton instance
+_cache: Optional[TranscriptCache] = None
+
+
+def get_transcript_cache() -> TranscriptCache:
+    """Get the process-wide transcript cache."""
+    global _cache
+    if _cache is None:
+        settings = get_settings()
+        _cache = TranscriptCache(
+            max_entries=settings.TRANSCRIPT_CACHE_SIZE,
+            ttl_seconds=settings.TRANSCRIPT_CACHE_TTL,
+            redis_url=settings.REDIS_URL if settings.TRANSCRIPT_CACHE_REDIS else None,
+        )
+    return _cache
@@ -0,0 +1,308 @@
+# backend/services/transcription.py
+"""
+Whisper inference off the event loop.
+
+Transcription runs in a pool of worker processes. Each worker loads the
+configured engine (see services/engines.py) once (in the pool initializer) and then serves jobs until shutdown,
+so the API process never blocks on a decode and never holds model weights.
+"""
+import asyncio
+import logging
+import math
+import multiprocessing
+import os
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.services.engines import TranscriptionEngine, load_engine
+from backend.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptionQueueFull(Exception):
+    """Raised when the executor already holds its maximum number of jobs."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Transcription queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class TranscriptionTimeout(Exception):
+    """Raised when a job does not finish within the per-job timeout."""
+
+
+# --- Worker process side -----------------------------------------------------
+# These run inside the pool processes, never in the API process.
+_worker_engine: Optional[TranscriptionEngine] = None
+_worker_stats: Dict[str, Any] = {}
+
+# Options for the dummy warm-up decode; valid for every engine
+_WARMUP_OPTIONS = {"language": "en", "temperature": 0.0}
+
+
+def _init_worker(
+    engine: str,
+    model_name: str,
+    engine_options: Dict[str, Any],
+    reports: Optional["multiprocessing.Queue"] = None,
+) -> None:
+    """
+    Pool initializer: load the transcription engine once per worker process,
+    then run a dummy clip through both decode paths so the first real
+    request doesn't pay for lazy allocations and kernel selection. The
+    timings (or the error) go to `reports`, which warmup() reads.
+    """
+    global _worker_engine
+    import numpy as np
+
+    try:
+        _worker_engine = load_engine(engine, model_name, **engine_options)
+
+        start = time.perf_counter()
+        clip = (0.001 * np.random.default_rng(0).standard_normal(16000)).astype(np.float32)
+        _worker_engine.transcribe(clip, **_WARMUP_OPTIONS)
+        _worker_engine.transcribe_batch([clip, clip], **_WARMUP_OPTIONS)
+        warmup_seconds = time.perf_counter() - start
+    except Exception as e:
+        if reports is not None:
+            reports.put({"pid": os.getpid(), "error": f"{type(e).__name__}: {e}"})
+        raise
+
+    _worker_stats.update(
+        pid=os.getpid(),
+        load_seconds=round(_worker_engine.load_seconds, 3),
+        warmup_seconds=round(warmup_seconds, 3),
+    )
+    if reports is not None:
+        reports.put(dict(_worker_stats))
+    logging.getLogger(__name__).info(
+        f"Worker {os.getpid()} loaded {engine} model '{model_name}' "
+        f"in {_worker_engine.load_seconds:.2f}s, warmed up in {warmup_seconds:.2f}s"
+    )
+
+
+def _noop() -> None:
+    """Submitted once per worker by warmup() so the pool starts them all."""
+
+
+def _run_transcription(audio: Any, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Transcribe a file path or 16 kHz float32 array with the worker's engine."""
+    start = time.perf_counter()
+    result = _worker_engine.transcribe(audio, **options)
+    result["decode_seconds"] = time.perf_counter() - start
+    return result
+
+
+def _run_batch(audios: List[Any], options: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Decode several short clips (<= 30 s each) as one batch."""
+    start = time.perf_counter()
+    results = _worker_engine.transcribe_batch(audios, **options)
+    elapsed = time.perf_counter() - start
+    for result in results:
+        # Share the batch wall time between its members
+        result["decode_seconds"] = elapsed / len(audios)
+    return results
+
+
+# --- API process side --------------------------------------------------------
+class TranscriptionExecutor:
+    """
+    Bounded front-end to a ProcessPoolExecutor.
+
+    At most ``workers + queue_size`` jobs are accepted at once; anything
+    beyond that is rejected immediately with TranscriptionQueueFull so the
+    caller can answer 503 instead of piling up connections.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        queue_size: int,
+        job_timeout: float,
+        model_name: str,
+        engine: str = "whisper",
+        engine_options: Optional[Dict[str, Any]] = None,
+    ):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.job_timeout = job_timeout
+        self.model_name = model_name
+        self.engine = engine
+        self.engine_options = engine_options or {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._reports: Optional["multiprocessing.Queue"] = None  # from _init_worker
+        self._pending = 0
+        # Readiness: flips once every worker has loaded and warmed up
+        self.ready = False
+        self.warmup_report: Optional[Dict[str, Any]] = None
+        self.warmup_error: Optional[str] = None
+        # Rolling average of job wall time, used for Retry-After hints
+        self._avg_job_seconds = 2.0
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.queue_size
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    @property
+    def engine_config(self) -> Dict[str, Any]:
+        """Everything about the engine that can change a transcript."""
+        return {"engine": self.engine, "model": self.model_name, **self.engine_options}
+
+    @property
+    def avg_job_seconds(self) -> float:
+        return self._avg_job_seconds
+
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            logger.info(f"Starting transcription pool with {self.workers} worker(s)")
+            # torch does not survive fork() reliably
+            context = multiprocessing.get_context("spawn")
+            self._reports = context.Queue()
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(self.engine, self.model_name, self.engine_options, self._reports),
+            )
+        return self._pool
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely to free up."""
+        backlog = max(self._pending - self.workers + 1, 1)
+        return max(1, math.ceil(self._avg_job_seconds * backlog / self.workers))
+
+    def _release(self, started: float, fut: "asyncio.Future") -> None:
+        self._pending -= 1
+        if not fut.cancelled():
+            # Retrieve the exception so abandoned (timed out) jobs don't log warnings
+            if fut.exception() is None:
+                elapsed = time.perf_counter() - started
+                self._avg_job_seconds = 0.8 * self._avg_job_seconds + 0.2 * elapsed
+
+    async def submit(self, audio: Any, **options: Any) -> Dict[str, Any]:
+        """Run one transcription job in the pool and await its result."""
+        return await self._run(_run_transcription, audio, options)
+
+    async def submit_batch(self, audios: List[Any], **options: Any) -> List[Dict[str, Any]]:
+        """Decode a batch of short clips as a single pool job."""
+        return await self._run(_run_batch, audios, options)
+
+    async def _run(self, fn: Callable, *args: Any) -> Any:
+        if self._pending >= self.capacity:
+            raise TranscriptionQueueFull(self.retry_after())
+
+        loop = asyncio.get_running_loop()
+        try:
+            fut = loop.run_in_executor(self._ensure_pool(), fn, *args)
+        except BrokenProcessPool:
+            logger.error("Transcription pool is broken, restarting it")
+            self.shutdown()
+            fut = loop.run_in_executor(self._ensure_pool(), fn, *args)
+
+        self._pending += 1
+        started = time.perf_counter()
+        # The slot is released when the worker is actually done, not when the
+        # caller stops waiting: a timed-out job still occupies a process.
+        fut.add_done_callback(lambda f: self._release(started, f))
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(fut), timeout=self.job_timeout)
+        except asyncio.TimeoutError:
+            raise TranscriptionTimeout(
+                f"Transcription did not finish within {self.job_timeout:g}s"
+            )
+        except BrokenProcessPool:
+            logger.error("Transcription worker died, pool will be restarted on next job")
+            self.shutdown()
+            raise
+
+    async def warmup(self, timeout: float = 600.0) -> None:
+        """
+        Start every worker process and wait until each has loaded its model
+        and run its warm-up decode. Sets `ready` (or `warmup_error`).
+        """
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        seen: Dict[int, Dict[str, Any]] = {}
+        try:
+            pool = self._ensure_pool()
+            # Each submit finds no idle worker and starts a new one, so this
+            # starts all of them; every initializer reports once it is warm
+            started = [loop.run_in_executor(pool, _noop) for _ in range(self.workers)]
+            while len(seen) < self.workers:
+                remaining = timeout - (time.perf_counter() - start)
+                if remaining <= 0:
+                    raise TimeoutError(f"Only {len(seen)}/{self.workers} workers warmed up")
+                try:
+                    info = await loop.run_in_executor(None, self._reports.get, True, min(remaining, 1.0))
+                except queue.Empty:
+                    for fut in started:
+                        if fut.done() and fut.exception() is not None:
+                            raise fut.exception()  # the pool broke before a report arrived
+                    continue
+                if "error" in info:
+                    raise RuntimeError(f"Worker {info['pid']} failed to load: {info['error']}")
+                seen[info["pid"]] = info
+            await asyncio.gather(*started)
+        except Exception as e:
+            self.warmup_error = str(e) or type(e).__name__
+            logger.error(f"Transcription warm-up failed: {self.warmup_error}")
+            return
+
+        total = time.perf_counter() - start
+        self.warmup_report = {"total_seconds": round(total, 3), "workers": list(seen.values())}
+        self.ready = True
+        for info in seen.values():
+            logger.info(
+                f"metric transcription.model_load_seconds={info['load_seconds']} "
+                f"transcription.warmup_seconds={info['warmup_seconds']} worker={info['pid']}"
+            )
+        logger.info(f"metric transcription.ready_seconds={total:.3f} workers={len(seen)}")
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+def engine_options_from_settings(settings) -> Dict[str, Any]:
+    options: Dict[str, Any] = {"beam_size": settings.TRANSCRIBE_BEAM_SIZE}
+    if settings.TRANSCRIBE_ENGINE == "faster-whisper":
+        options["compute_type"] = settings.TRANSCRIBE_COMPUTE_TYPE
+        options["cpu_threads"] = settings.TRANSCRIBE_CPU_THREADS
+    return options
+
+
+# Singleton instance
+_executor: Optional[TranscriptionExecutor] = None
+
+
+def get_transcription_executor() -> TranscriptionExecutor:
+    """Get the process-wide transcription executor."""
+    global _executor
+    if _executor is None:
+        settings = get_settings()
+        _executor = TranscriptionExecutor(
+            workers=settings.TRANSCRIBE_WORKERS,
+            queue_size=settings.TRANSCRIBE_QUEUE_SIZE,
+            job_timeout=settings.TRANSCRIBE_JOB_TIMEOUT,
+            model_name=settings.WHISPER_MODEL,
+            engine=settings.TRANSCRIBE_ENGINE,
+            engine_options=engine_options_from_settings(settings),
+        )
+    return _executor
+
+
+def shutdown_transcription_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
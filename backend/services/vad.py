@@ -0,0 +1,155 @@
+# backend/services/vad.py
+"""
+Cheap energy-based voice activity detection.
+
+Runs before decoding: trims leading/trailing silence, lets the caller skip
+Whisper entirely when nothing was said, and splits long recordings on
+pauses so every piece fits in Whisper's 30 s window.
+"""
+from typing import List, Tuple
+
+import numpy as np
+
+from backend.services.audio import SAMPLE_RATE
+
+FRAME_MS = 30
+FRAME_SAMPLES = SAMPLE_RATE * FRAME_MS // 1000
+
+# ~-40 dBFS; quiet rooms sit well below, a coach on the touchline well above
+DEFAULT_ENERGY_THRESHOLD = 0.01
+
+
+def frame_rms(audio: np.ndarray) -> np.ndarray:
+    """RMS energy of each full 30 ms frame."""
+    n_frames = audio.size // FRAME_SAMPLES
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[: n_frames * FRAME_SAMPLES].reshape(n_frames, FRAME_SAMPLES)
+    return np.sqrt(np.mean(frames * frames, axis=1))
+
+
+def voiced_mask(
+    audio: np.ndarray,
+    threshold: float = DEFAULT_ENERGY_THRESHOLD,
+    noise_ratio: float = 3.0,
+    min_speech_ms: int = 90,
+) -> np.ndarray:
+    """
+    Per-frame speech mask.
+
+    A frame is voiced when it is above both the absolute threshold and
+    `noise_ratio` times the clip's noise floor. Runs shorter than
+    `min_speech_ms` (clicks, taps) are discarded.
+
+    The noise-relative part is capped at half the clip's loud (90th
+    percentile) level: a clip that is speech from end to end has no quiet
+    frames, and its "noise floor" must not be allowed to reject it.
+    """
+    rms = frame_rms(audio)
+    if rms.size == 0:
+        return np.zeros(0, dtype=bool)
+    noise_floor, loud = np.percentile(rms, [10, 90])
+    relative = min(float(noise_floor) * noise_ratio, 0.5 * float(loud))
+    mask = rms >= max(threshold, relative)
+
+    min_frames = max(1, min_speech_ms // FRAME_MS)
+    if min_frames > 1:
+        for start, end in _runs(mask):
+            if end - start < min_frames:
+                mask[start:end] = False
+    return mask
+
+
+def _runs(mask: np.ndarray) -> List[Tuple[int, int]]:
+    """[start, end) frame indices of each run of True values."""
+    padded = np.concatenate([[False], mask, [False]])
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return list(zip(edges[::2].tolist(), edges[1::2].tolist()))
+
+
+def split_on_pauses(
+    mask: np.ndarray,
+    max_segment_s: float = 25.0,
+    pad_ms: int = 150,
+    min_pause_ms: int = 300,
+    pack: bool = True,
+) -> List[Tuple[int, int]]:
+    """
+    Group voiced runs into segments of at most `max_segment_s`, cutting
+    only at pauses of `min_pause_ms` or longer (or mid-speech when a single
+    run is longer than the limit). Returns [start, end) sample offsets.
+
+    With `pack=False` every phrase stays its own segment instead of being
+    packed together with its neighbours to fill the window.
+    """
+    runs = _runs(mask)
+    if not runs:
+        return []
+
+    pad = pad_ms // FRAME_MS
+    min_pause = max(1, min_pause_ms // FRAME_MS)
+    max_frames = int(max_segment_s * 1000 // FRAME_MS)
+
+    # Merge runs separated by short gaps into phrases
+    phrases = [list(runs[0])]
+    for start, end in runs[1:]:
+        if start - phrases[-1][1] < min_pause:
+            phrases[-1][1] = end
+        else:
+            phrases.append([start, end])
+
+    # Pack phrases into segments that fit the window
+    segments: List[List[int]] = []
+    for start, end in phrases:
+        while end - start > max_frames:
+            segments.append([start, start + max_frames])
+            start += max_frames
+        if pack and segments and end - segments[-1][0] <= max_frames:
+            segments[-1][1] = end
+        else:
+            segments.append([start, end])
+
+    n_frames = mask.size
+    return [
+        (max(0, s - pad) * FRAME_SAMPLES, min(n_frames, e + pad) * FRAME_SAMPLES)
+        for s, e in segments
+    ]
+
+
+class VadResult:
+    """Speech segments found in a clip plus the numbers we report per request."""
+
+    def __init__(self, audio: np.ndarray, spans: List[Tuple[int, int]]):
+        self.spans = spans
+        self.segments = [audio[s:e] for s, e in spans]
+        self.original_samples = int(audio.size)
+        self.speech_samples = int(sum(e - s for s, e in spans))
+
+    @property
+    def has_speech(self) -> bool:
+        return bool(self.spans)
+
+    @property
+    def trim_ratio(self) -> float:
+        """Fraction of the clip removed before decoding."""
+        if not self.original_samples:
+            return 0.0
+        return 1.0 - self.speech_samples / self.original_samples
+
+    def report(self) -> dict:
+        return {
+            "original_seconds": round(self.original_samples / SAMPLE_RATE, 3),
+            "speech_seconds": round(self.speech_samples / SAMPLE_RATE, 3),
+            "trim_ratio": round(self.trim_ratio, 3),
+            "segments": len(self.spans),
+        }
+
+
+def detect_speech(
+    audio: np.ndarray,
+    threshold: float = DEFAULT_ENERGY_THRESHOLD,
+    max_segment_s: float = 25.0,
+) -> VadResult:
+    """Trim silence and split `audio` into decodable speech segments."""
+    mask = voiced_mask(audio, threshold=threshold)
+    return VadResult(audio, split_on_pauses(mask, max_segment_s=max_segment_s))
@@ -0,0 +1,67 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import delete, text
+
+from backend import models
+from backend.db import AsyncSessionLocal, async_engine
+
+SQUAD = ["Tommy", "Leo", "Winston", "Alex", "Kip", "Tom", "Logan"]
+
+
+@pytest.fixture
+def anyio_backend():
+    # The app and its services are asyncio-only
+    return "asyncio"
+
+
+@pytest.fixture
+async def db_match():
+    """
+    A club, team, squad (SQUAD) and match in the configured database
+    (Settings.ASYNC_DB_URL, migrated to head), removed afterwards. Skips the
+    test when there is no such database.
+    """
+    try:
+        async with AsyncSessionLocal() as session:
+            migrated = (await session.execute(text("SELECT to_regclass('event_seq')"))).scalar()
+    except Exception as e:  # not running, no such database...
+        await async_engine.dispose()
+        pytest.skip(f"No database: {e}")
+    if migrated is None:
+        await async_engine.dispose()
+        pytest.skip("Database is not migrated to head")
+
+    async with AsyncSessionLocal() as session:
+        club = models.Club(name="Test FC")
+        session.add(club)
+        await session.flush()
+        team = models.Team(club_id=club.id, name="Test Team", age_group="U9")
+        other = models.Team(club_id=club.id, name="Other Team", age_group="U10")
+        session.add_all([team, other])
+        await session.flush()
+        players = [models.Player(team_id=team.id, name=name) for name in SQUAD]
+        match = models.Match(team_id=team.id, opponent_name="Test Rovers", kickoff_at=datetime.now(timezone.utc))
+        session.add_all([*players, match])
+        await session.commit()
+        fixture = {
+            "club_id": club.id,
+            "team_id": team.id,
+            "other_team_id": other.id,
+            "match_id": match.id,
+            "players": {p.name: p.id for p in players},
+        }
+
+    yield fixture
+
+    teams = [fixture["team_id"], fixture["other_team_id"]]
+    async with AsyncSessionLocal() as session:
+        for model in (models.Lineup, models.Event, models.RawEvent):
+            await session.execute(delete(model).where(model.match_id == fixture["match_id"]))
+        await session.execute(delete(models.Match).where(models.Match.id == fixture["match_id"]))
+        await session.execute(delete(models.Player).where(models.Player.team_id.in_(teams)))
+        await session.execute(delete(models.Team).where(models.Team.id.in_(teams)))
+        await session.execute(delete(models.Club).where(models.Club.id == fixture["club_id"]))
+        await session.commit()
+    # Each test runs in its own event loop; don't hand pooled connections across
+    await async_engine.dispose()
@@ -0,0 +1,48 @@
+# backend/tests/test_batching.py
+import asyncio
+import numpy as np
+import pytest
+from backend.services.batching import MAX_BATCH_CLIP_SAMPLES, MicroBatcher
+
+
+class FakeExecutor:
+    def __init__(self):
+        self.calls = []
+
+    async def submit(self, audio, **options):
+        self.calls.append(1)
+        return {"text": f"clip {audio.size}"}
+
+    async def submit_batch(self, audios, **options):
+        self.calls.append(len(audios))
+        return [{"text": f"clip {a.size}"} for a in audios]
+
+
+@pytest.mark.anyio
+async def test_concurrent_requests_share_a_batch():
+    executor = FakeExecutor()
+    batcher = MicroBatcher(executor, max_batch_size=4, max_wait_ms=20)
+    clips = [np.zeros(16000 + i, dtype=np.float32) for i in range(6)]
+
+    results = await asyncio.gather(*(batcher.transcribe(c) for c in clips))
+
+    # Each caller gets its own result back, in order
+    assert [r["text"] for r in results] == [f"clip {c.size}" for c in clips]
+    # One full batch of 4 flushed immediately, the remaining 2 after the wait
+    assert executor.calls == [4, 2]
+    assert batcher.stats()["avg_batch_size"] == 3.0
+
+
+@pytest.mark.anyio
+async def test_long_clips_and_different_options_are_not_mixed():
+    executor = FakeExecutor()
+    batcher = MicroBatcher(executor, max_batch_size=8, max_wait_ms=5)
+    long_clip = np.zeros(MAX_BATCH_CLIP_SAMPLES + 1, dtype=np.float32)
+    short = np.zeros(16000, dtype=np.float32)
+
+    await asyncio.gather(
+        batcher.transcribe(long_clip),
+        batcher.transcribe(short, language="en"),
+        batcher.transcribe(short, language="de"),
+    )
+    assert sorted(executor.calls) == [1, 1, 1]
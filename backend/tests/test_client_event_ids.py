@@ -0,0 +1,19 @@
+# backend/tests/test_client_event_ids.py
+import pytest
+
+from backend.crud.events import EventRejected, check_client_event_id, client_event_keys
+
+
+def test_compound_transcripts_get_one_key_per_event():
+    assert client_event_keys("9f2c", 1) == ["9f2c"]
+    assert client_event_keys("9f2c", 3) == ["9f2c", "9f2c#2", "9f2c#3"]
+    assert client_event_keys(None, 2) == [None, None]
+
+
+def test_client_event_id_validation():
+    check_client_event_id(None)
+    check_client_event_id("3b1e0c52-6b0f-4d8e-9a57-1f6c1f0e2a11")
+    for bad in ["", "a#2", "x" * 61]:
+        with pytest.raises(EventRejected) as e:
+            check_client_event_id(bad)
+        assert e.value.status_code == 400
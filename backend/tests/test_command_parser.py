@@ -1,6 +1,12 @@
 # backend/tests/test_command_parser.py
 import pytest
-from backend.services.command_parser import parse_transcript
+from backend.services.command_parser import (
+    detect_intent,
+    match_intents,
+    parse_events,
+    parse_transcript,
+    parse_transcripts,
+)
 
 ROSTER = [
     "Tommy",   # Keeper
@@ -42,3 +48,72 @@ def test_sub_logan():
     result = parse_transcript("Sub Logan out", ROSTER)
     assert result["event_type"] == "sub"
     assert result["player"] == "Logan"
+
+def test_keywords_match_whole_words_only():
+    # "in" inside "Winston" used to make this a substitution
+    assert detect_intent("Winston") == "unknown"
+    assert detect_intent("Great run from Winston") == "unknown"
+    assert detect_intent("Winston in for Leo") == "sub"
+
+def test_inflected_keywords_are_recognised():
+    for text, intent in [
+        ("Tommy saves it", "save"),
+        ("Kip tackles Leo", "tackle"),
+        ("Leo passes to Alex", "pass"),
+        ("Leo fouled", "foul"),
+        ("Alex fouls Kip", "foul"),
+        ("Alex assisted", "assist"),
+        ("Logan assists", "assist"),
+        ("Leo missed", "shot"),
+        ("Leo misses", "shot"),
+        ("Two corners", "corner"),
+        ("Shots from Leo", "shot"),
+        ("Two goals for Winston", "goal"),
+    ]:
+        assert detect_intent(text) == intent, text
+    result = parse_transcript("Tommy saves it", ROSTER)
+    assert (result["event_type"], result["player"]) == ("save", "Tommy")
+
+def test_intent_priority_is_kept():
+    # goal is listed before shot in INTENT_KEYWORDS
+    assert detect_intent("Leo shoots and scores") == "goal"
+
+def test_match_intents_spans():
+    text = "Leo shoots, ON  target. Sub Logan out"
+    matches = match_intents(text)
+    assert [intent for intent, _ in matches] == ["shot", "shot", "sub", "sub"]
+    start, end = matches[1][1]
+    assert text[start:end] == "ON  target"
+
+def test_compound_command_yields_one_event_each():
+    events = parse_events("Goal Winston assist Logan, then save Tommy 34th minute", ROSTER)
+    assert [(e["event_type"], e["player"]) for e in events] == [
+        ("goal", "Winston"), ("assist", "Logan"), ("save", "Tommy"),
+    ]
+    # The one minute mentioned applies to the whole incident
+    assert [e["minute"] for e in events] == [34, 34, 34]
+    assert events[1]["raw_text"] == "assist Logan"
+
+def test_events_keep_their_own_minutes():
+    events = parse_events("Tackle Kip minute 12. Foul on Alex 14 mins", ROSTER)
+    assert [(e["event_type"], e["minute"]) for e in events] == [("tackle", 12), ("foul", 14)]
+
+def test_single_commands_stay_single():
+    for text, expected in [
+        ("Leo shoots and scores", ("goal", "Leo")),
+        ("Sub Logan out", ("sub", "Logan")),
+        ("Leo shoots, on target", ("shot", "Leo")),
+        ("Goal Winston, well done Logan", ("goal", "Winston")),
+    ]:
+        events = parse_events(text, ROSTER)
+        assert [(e["event_type"], e["player"]) for e in events] == [expected]
+
+def test_no_intent_no_events():
+    assert parse_events("Well done Tommy", ROSTER) == []
+
+def test_parse_transcripts_keeps_failures_in_place():
+    results = parse_transcripts(["Goal Wynston", "Well done Tommy", "Save Tommy 80 mins"], ROSTER)
+    assert [[(e["event_type"], e["player"]) for e in r] for r in results] == [
+        [("goal", "Winston")], [], [("save", "Tommy")],
+    ]
+    assert results == [parse_events(t, ROSTER) for t in ["Goal Wynston", "Well done Tommy", "Save Tommy 80 mins"]]
@@ -0,0 +1,39 @@
+# backend/tests/test_engines.py
+from types import SimpleNamespace
+
+import pytest
+
+from backend.services.engines import WHISPER_DECODE_DEFAULTS, TranscriptionEngine, is_silence, needs_fallback
+
+
+def result(compression_ratio=1.5, avg_logprob=-0.3, no_speech_prob=0.1):
+    return SimpleNamespace(compression_ratio=compression_ratio, avg_logprob=avg_logprob, no_speech_prob=no_speech_prob)
+
+
+def test_engine_interface_is_abstract():
+    with pytest.raises(TypeError):
+        TranscriptionEngine("base")
+
+
+def test_fallback_rules_match_whisper_transcribe():
+    options = WHISPER_DECODE_DEFAULTS
+    assert not needs_fallback(result(), options)
+    assert needs_fallback(result(compression_ratio=3.0), options)  # repetitive
+    assert needs_fallback(result(avg_logprob=-1.5), options)  # unlikely
+    # Unlikely but probably silence: dropped, not retried
+    silent = result(avg_logprob=-1.5, no_speech_prob=0.9)
+    assert not needs_fallback(silent, options) and is_silence(silent, options)
+    assert not is_silence(result(no_speech_prob=0.9), options)  # confident text is kept
+
+
+@pytest.mark.anyio
+async def test_warmup_reports_a_worker_that_cannot_load():
+    from backend.services.transcription import TranscriptionExecutor
+
+    executor = TranscriptionExecutor(workers=1, queue_size=0, job_timeout=10, model_name="base", engine="nope")
+    try:
+        await executor.warmup(timeout=60)
+    finally:
+        executor.shutdown()
+    assert not executor.ready
+    assert "Unknown transcription engine 'nope'" in executor.warmup_error
@@ -0,0 +1,48 @@
+# backend/tests/test_event_timeline.py
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from backend.api.events import decode_cursor, encode_cursor
+from backend.main import app
+
+
+def test_cursor_round_trip():
+    for minute, event_id in [(0, 1), (45, 1234), (120, 987654321)]:
+        assert decode_cursor(encode_cursor(minute, event_id)) == (minute, event_id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "NDU", "NDU6eA"])
+def test_bad_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor)
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_pages_walk_the_timeline_in_order(db_match):
+    match_id = db_match["match_id"]
+    # Many events share a minute, so page boundaries fall inside ties
+    minutes = [(i * 7) % 5 for i in range(23)]
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as ac:
+        r = await ac.post("/events/bulk", json=[
+            {"match_id": match_id, "minute": m, "event_type": "pass"} for m in minutes
+        ])
+        assert r.status_code == 201, r.text
+
+        # No limit or cursor: the whole timeline, unpaginated
+        r = await ac.get(f"/match/{match_id}")
+        assert "X-Next-Cursor" not in r.headers
+        timeline = [(e["minute"], e["id"]) for e in r.json()]
+        assert timeline == sorted(timeline) and len(timeline) == 23
+
+        pages, params = [], {"limit": 4}
+        while True:
+            r = await ac.get(f"/match/{match_id}", params=params)
+            assert r.status_code == 200, r.text
+            pages.append([(e["minute"], e["id"]) for e in r.json()])
+            if "X-Next-Cursor" not in r.headers:
+                break
+            params = {"limit": 4, "cursor": r.headers["X-Next-Cursor"]}
+    assert [len(page) for page in pages] == [4, 4, 4, 4, 4, 3]
+    assert [row for page in pages for row in page] == timeline
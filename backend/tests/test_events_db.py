@@ -0,0 +1,401 @@
+# backend/tests/test_events_db.py
+"""Event endpoints against a real database (see the db_match fixture)."""
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import delete, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.api import events
+from backend.db import AsyncSessionLocal
+from backend.main import app
+from backend.models import Event, Match
+
+
+def client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def move_player(player_id: int, team_id: int) -> None:
+    # Behind the roster cache's back, like another API process would
+    async with AsyncSessionLocal() as session:
+        await session.execute(text("UPDATE players SET team_id = :t WHERE id = :p"), {"t": team_id, "p": player_id})
+        await session.commit()
+
+
+@pytest.mark.anyio
+async def test_batch_reports_a_player_who_left_and_stores_the_rest(db_match):
+    match_id = db_match["match_id"]
+    async with client() as ac:
+        # Warm the roster cache, then Leo moves to another team
+        r = await ac.post(f"/matches/{match_id}/events/raw/batch", json={"items": [{"raw_text": "Corner minute 3"}]})
+        assert r.status_code == 200, r.text
+        await move_player(db_match["players"]["Leo"], db_match["other_team_id"])
+
+        r = await ac.post(f"/matches/{match_id}/events/raw/batch", json={"items": [
+            {"raw_text": "Goal Winston minute 10"},
+            {"raw_text": "Tackle Leo minute 11"},
+            {"raw_text": "Save Tommy minute 12"},
+        ]})
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert (body["created"], body["failed"]) == (2, 1)
+    assert [item["status"] for item in body["results"]] == ["created", "error", "created"]
+    assert body["results"][1]["detail"] == "Player must belong to the match team"
+    assert body["results"][2]["events"][0]["player_id"] == db_match["players"]["Tommy"]
+
+
+@pytest.mark.anyio
+async def test_batch_items_without_a_minute(db_match):
+    match_id = db_match["match_id"]
+    items = [{"raw_text": "Goal Winston minute 10"}, {"raw_text": "Save Tommy"}]
+    async with client() as ac:
+        r = await ac.post(f"/matches/{match_id}/events/raw/batch", json={"items": items})
+        assert r.status_code == 200, r.text
+        body = r.json()
+        assert [item["status"] for item in body["results"]] == ["created", "error"]
+        assert body["results"][1]["detail"] == "No minute in transcript"
+
+        r = await ac.post(f"/matches/{match_id}/events/raw/batch", json={"items": items[1:], "default_minute": 40})
+    assert r.status_code == 200, r.text
+    assert r.json()["results"][0]["events"][0]["minute"] == 40
+
+
+@pytest.mark.anyio
+async def test_single_transcript_naming_a_player_who_left_is_rejected(db_match):
+    match_id = db_match["match_id"]
+    async with client() as ac:
+        r = await ac.post(f"/matches/{match_id}/events/raw", params={"raw_text": "Corner minute 3"})
+        assert r.status_code == 200, r.text
+        await move_player(db_match["players"]["Leo"], db_match["other_team_id"])
+
+        r = await ac.post(f"/matches/{match_id}/events/raw", params={"raw_text": "Tackle Leo minute 11"})
+        assert r.status_code == 400
+        assert r.json()["detail"] == "Player must belong to the match team"
+
+
+async def stored_minutes(ids):
+    async with AsyncSessionLocal() as session:
+        rows = dict((await session.execute(select(Event.id, Event.minute).where(Event.id.in_(ids)))).all())
+    return [rows[i] for i in ids]
+
+
+@pytest.mark.anyio
+async def test_bulk_ids_come_back_in_request_order(db_match):
+    match_id, players = db_match["match_id"], db_match["players"]
+    minutes = [70, 3, 45, 12]
+    async with client() as ac:
+        r = await ac.post("/events/bulk", json=[
+            {"match_id": match_id, "minute": m, "event_type": "pass", "player_id": players["Alex"]} for m in minutes
+        ])
+    assert r.status_code == 201, r.text
+    body = r.json()
+    assert body["created"] == 4
+    assert await stored_minutes(body["ids"]) == minutes
+
+
+@pytest.mark.anyio
+async def test_bulk_across_matches_maps_ids_back_to_request_order(db_match):
+    async with AsyncSessionLocal() as session:
+        second = Match(team_id=db_match["team_id"], opponent_name="Rovers II", kickoff_at=datetime.now(timezone.utc))
+        session.add(second)
+        await session.commit()
+        second_id = second.id
+    match_ids = [second_id, db_match["match_id"], second_id, db_match["match_id"]]
+    try:
+        async with client() as ac:
+            r = await ac.post("/events/bulk", json=[
+                {"match_id": m, "minute": minute, "event_type": "pass"} for minute, m in enumerate(match_ids)
+            ])
+        assert r.status_code == 201, r.text
+        ids = r.json()["ids"]
+        assert await stored_minutes(ids) == [0, 1, 2, 3]
+        async with AsyncSessionLocal() as session:
+            stored = dict((await session.execute(select(Event.id, Event.match_id).where(Event.id.in_(ids)))).all())
+        assert [stored[i] for i in ids] == match_ids
+    finally:
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(Event).where(Event.match_id == second_id))
+            await session.execute(delete(Match).where(Match.id == second_id))
+            await session.commit()
+
+
+class FakeDBError(Exception):
+    def __init__(self, sqlstate):
+        self.sqlstate = sqlstate
+
+
+@pytest.mark.anyio
+async def test_bulk_retries_an_insert_that_lost_a_deadlock(db_match, monkeypatch):
+    scalars, calls = AsyncSession.scalars, []
+
+    async def deadlock_once(self, *args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            raise DBAPIError("INSERT", None, FakeDBError("40P01"))
+        return await scalars(self, *args, **kwargs)
+
+    monkeypatch.setattr(AsyncSession, "scalars", deadlock_once)
+    async with client() as ac:
+        r = await ac.post("/events/bulk", json=[{"match_id": db_match["match_id"], "minute": 5, "event_type": "goal"}])
+    assert r.status_code == 201, r.text
+    assert len(calls) == 2
+    assert await stored_minutes(r.json()["ids"]) == [5]
+
+
+@pytest.mark.parametrize("sqlstate, status", [("23505", 409), ("23503", 404), ("40P01", 503)])
+def test_bulk_insert_errors_map_by_sqlstate(sqlstate, status):
+    with pytest.raises(HTTPException) as info:
+        events._raise_bulk_insert_error(DBAPIError("INSERT", None, FakeDBError(sqlstate)), sqlstate)
+    assert info.value.status_code == status
+
+
+def test_unknown_bulk_insert_errors_are_not_swallowed():
+    error = DBAPIError("INSERT", None, FakeDBError("22001"))
+    with pytest.raises(DBAPIError):
+        events._raise_bulk_insert_error(error, "22001")
+
+
+@pytest.mark.anyio
+async def test_bulk_reports_every_bad_event_by_index(db_match):
+    match_id, players = db_match["match_id"], db_match["players"]
+    await move_player(players["Leo"], db_match["other_team_id"])
+    ok = {"match_id": match_id, "minute": 1, "event_type": "goal", "player_id": players["Winston"]}
+    wrong_team = {**ok, "player_id": players["Leo"]}
+    async with client() as ac:
+        # Only wrong-team players: 400
+        r = await ac.post("/events/bulk", json=[ok, wrong_team])
+        assert r.status_code == 400
+        assert r.json()["detail"]["errors"] == [{"index": 1, "detail": "Player must belong to the match team"}]
+
+        # Anything missing makes it a 404, still listing every bad event
+        r = await ac.post("/events/bulk", json=[
+            wrong_team, ok, {**ok, "match_id": 0}, {**ok, "player_id": 0},
+        ])
+        assert r.status_code == 404
+        assert r.json()["detail"]["errors"] == [
+            {"index": 0, "detail": "Player must belong to the match team"},
+            {"index": 2, "detail": "Match not found"},
+            {"index": 3, "detail": "Player not found"},
+        ]
+
+        # All or nothing: the good event was not stored either time
+        r = await ac.get(f"/match/{match_id}")
+    assert r.status_code == 200
+    assert r.json() == []
+
+
+@pytest.mark.anyio
+async def test_bulk_rejects_oversized_requests(monkeypatch):
+    monkeypatch.setattr(events, "MAX_BULK_EVENTS", 2)
+    async with client() as ac:
+        r = await ac.post("/events/bulk", json=[{"match_id": 1, "minute": 1, "event_type": "goal"}] * 3)
+    assert r.status_code == 413
+    assert r.json()["detail"] == "At most 2 events per request"
+
+
+@pytest.mark.anyio
+async def test_event_fields_longer_than_their_columns_are_422():
+    ok = {"match_id": 1, "minute": 1, "event_type": "goal"}
+    async with client() as ac:
+        for bad in ({"event_type": "x" * 101}, {"team_context": "x" * 21}, {"client_event_id": "x" * 65}):
+            r = await ac.post("/", json={**ok, **bad})
+            assert r.status_code == 422, bad
+
+
+@pytest.mark.anyio
+async def test_rejected_single_insert_maps_to_404_or_400(db_match):
+    # The INSERT ... SELECT inserts nothing; the follow-up query says why
+    match_id, players = db_match["match_id"], db_match["players"]
+    await move_player(players["Leo"], db_match["other_team_id"])
+    event = {"match_id": match_id, "minute": 5, "event_type": "goal"}
+    async with client() as ac:
+        for body, status, detail in [
+            ({**event, "match_id": 0}, 404, "Match not found"),
+            ({**event, "player_id": 0}, 404, "Player not found"),
+            ({**event, "player_id": players["Leo"]}, 400, "Player must belong to the match team"),
+        ]:
+            r = await ac.post("/", json=body)
+            assert (r.status_code, r.json()["detail"]) == (status, detail), body
+
+        r = await ac.post("/", json={**event, "player_id": players["Winston"]})
+        assert r.status_code == 200, r.text
+        assert r.json()["player_id"] == players["Winston"]
+        r = await ac.get(f"/match/{match_id}")
+    assert [e["player_id"] for e in r.json()] == [players["Winston"]]
+
+
+@pytest.mark.anyio
+async def test_retried_event_returns_the_original_row(db_match):
+    match_id, players = db_match["match_id"], db_match["players"]
+    event = {"match_id": match_id, "minute": 5, "event_type": "goal", "player_id": players["Winston"],
+             "client_event_id": "phone-1:17"}
+    async with client() as ac:
+        first = await ac.post("/", json=event)
+        # A retry carries the same key; whatever else it says, the first write wins
+        retry = await ac.post("/", json={**event, "minute": 6})
+        r = await ac.get(f"/match/{match_id}")
+    assert first.status_code == retry.status_code == 200
+    assert retry.json()["id"] == first.json()["id"]
+    assert retry.json()["minute"] == 5
+    assert len(r.json()) == 1
+
+
+@pytest.mark.anyio
+async def test_retried_transcript_returns_the_stored_events_without_parsing(db_match):
+    match_id, players = db_match["match_id"], db_match["players"]
+    url = f"/matches/{match_id}/events/raw"
+    async with client() as ac:
+        first = await ac.post(url, params={"raw_text": "Goal Winston assist Logan minute 12", "client_event_id": "k1"})
+        assert first.status_code == 200, first.text
+        # Different text under the same key (and as a JSON body): not parsed again
+        retry = await ac.post(url, json={"raw_text": "Save Tommy minute 80", "client_event_id": "k1"})
+        r = await ac.get(f"/match/{match_id}")
+    assert retry.status_code == 200, retry.text
+    assert [e["id"] for e in retry.json()["events"]] == [e["id"] for e in first.json()["events"]]
+    assert [(e["event_type"], e["player_id"]) for e in retry.json()["events"]] == [
+        ("goal", players["Winston"]), ("assist", players["Logan"]),
+    ]
+    assert retry.json()["events"][1]["parsed"]["raw_text"] == "assist Logan minute 12"
+    assert len(r.json()) == 2
+
+    async with AsyncSessionLocal() as session:
+        keys = (await session.scalars(
+            select(Event.client_event_id).where(Event.match_id == match_id).order_by(Event.id)
+        )).all()
+    assert keys == ["k1", "k1#2"]
+
+
+@pytest.mark.anyio
+async def test_raw_text_is_accepted_as_a_json_body(db_match):
+    async with client() as ac:
+        r = await ac.post(f"/matches/{db_match['match_id']}/events/raw", json={"raw_text": "Tackle Kip minute 9"})
+        missing = await ac.post(f"/matches/{db_match['match_id']}/events/raw")
+    assert r.status_code == 200, r.text
+    assert (r.json()["event_type"], r.json()["player_id"]) == ("tackle", db_match["players"]["Kip"])
+    assert missing.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_bulk_returns_existing_ids_for_stored_keys(db_match):
+    match_id, players = db_match["match_id"], db_match["players"]
+
+    def event(key, minute):
+        return {"match_id": match_id, "minute": minute, "event_type": "shot",
+                "player_id": players["Leo"], "client_event_id": key}
+
+    async with client() as ac:
+        first = await ac.post("/events/bulk", json=[event("a", 1), event("b", 2)])
+        assert first.status_code == 201, first.text
+        a, b = first.json()["ids"]
+
+        # Whole batch retried: nothing new
+        r = await ac.post("/events/bulk", json=[event("a", 1), event("b", 2)])
+        assert r.json() == {"created": 0, "ids": [a, b]}
+
+        # Stored and new keys mixed, in any order
+        r = await ac.post("/events/bulk", json=[event("c", 3), event("b", 2), event(None, 4), event("a", 1)])
+        assert r.status_code == 201, r.text
+        body = r.json()
+    assert body["created"] == 2
+    c, b2, unkeyed, a2 = body["ids"]
+    assert (b2, a2) == (b, a)
+    assert len({a, b, c, unkeyed}) == 4
+    assert await stored_minutes([a, b, c, unkeyed]) == [1, 2, 3, 4]
+
+
+@pytest.mark.anyio
+async def test_changes_since_a_version(db_match):
+    match_id = db_match["match_id"]
+    url = f"/match/{match_id}"
+    async with client() as ac:
+        r = await ac.post("/events/bulk", json=[
+            {"match_id": match_id, "minute": m, "event_type": "pass"} for m in (1, 2, 3)
+        ])
+        kept, changed, deleted = r.json()["ids"]
+
+        r = await ac.get(url)
+        version, etag = int(r.headers["X-Events-Version"]), r.headers["ETag"]
+        assert etag == f'"{version}"'
+        r = await ac.get(url, headers={"If-None-Match": etag})
+        assert r.status_code == 304
+
+        async with AsyncSessionLocal() as session:
+            await session.execute(text("UPDATE events SET minute = 20 WHERE id = :id"), {"id": changed})
+            await session.commit()
+        r = await ac.delete(f"/events/{deleted}")
+        assert r.status_code == 204
+        assert (await ac.delete(f"/events/{deleted}")).status_code == 404
+
+        # The old ETag no longer matches
+        r = await ac.get(url, headers={"If-None-Match": etag})
+        assert r.status_code == 200
+        assert [e["id"] for e in r.json()] == [kept, changed]
+
+        r = await ac.get(url, params={"since": version})
+        assert r.status_code == 200, r.text
+        changes = r.json()
+        assert [(e["id"], e["minute"]) for e in changes["events"]] == [(changed, 20)]
+        assert changes["deleted"] == [deleted]
+        assert changes["more"] is False
+        assert changes["version"] > version
+        assert int(r.headers["X-Events-Version"]) == changes["version"]
+
+        # Caught up: nothing more, same version
+        r = await ac.get(url, params={"since": changes["version"]})
+        assert r.json() == {"events": [], "deleted": [], "version": changes["version"], "more": False}
+
+
+@pytest.mark.anyio
+async def test_changes_come_in_pages(db_match):
+    match_id = db_match["match_id"]
+    url = f"/match/{match_id}"
+    async with client() as ac:
+        r = await ac.get(url)
+        version = int(r.headers["X-Events-Version"])
+        r = await ac.post("/events/bulk", json=[
+            {"match_id": match_id, "minute": m, "event_type": "shot"} for m in range(5)
+        ])
+        ids = r.json()["ids"]
+        await ac.delete(f"/events/{ids[0]}")
+
+        seen, deleted, pages = [], [], 0
+        while True:
+            r = await ac.get(url, params={"since": version, "limit": 2})
+            changes = r.json()
+            pages += 1
+            seen += [e["id"] for e in changes["events"]]
+            deleted += changes["deleted"]
+            assert changes["version"] > version
+            version = changes["version"]
+            if not changes["more"]:
+                break
+    # Five inserts and a delete, two changes a page
+    assert pages == 3
+    assert seen == ids[1:]  # the deleted one has no row left to send
+    assert deleted == [ids[0]]
+
+
+@pytest.mark.anyio
+async def test_deleting_a_sub_rebuilds_the_lineup(db_match):
+    match_id, players = db_match["match_id"], db_match["players"]
+    starters = ["Tommy", "Winston", "Logan", "Alex"]
+    async with client() as ac:
+        r = await ac.post(f"/matches/{match_id}/lineup", json=[
+            {"player_id": players[name], "is_starter": name in starters} for name in starters + ["Tom"]
+        ])
+        assert r.status_code == 201, r.text
+
+        r = await ac.post(f"/matches/{match_id}/events/raw", params={"raw_text": "Tom in for Winston minute 30"})
+        assert r.status_code == 200, r.text
+        sub_id = r.json()["id"]
+        r = await ac.get(f"/matches/{match_id}/lineup")
+        assert players["Tom"] in r.json()["on_pitch"]
+        assert players["Winston"] not in r.json()["on_pitch"]
+
+        assert (await ac.delete(f"/events/{sub_id}")).status_code == 204
+        r = await ac.get(f"/matches/{match_id}/lineup")
+    assert sorted(r.json()["on_pitch"]) == sorted(players[name] for name in starters)
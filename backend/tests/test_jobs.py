@@ -0,0 +1,202 @@
+# backend/tests/test_jobs.py
+import asyncio
+
+import pytest
+from backend.services import jobs
+from backend.services.jobs import DONE, FAILED, QUEUED, MemoryJobQueue, new_job, process_next_job
+from backend.services.transcription import TranscriptionQueueFull
+
+
+async def fake_transcribe(job, audio):
+    if audio == b"broken":
+        raise RuntimeError("decoder crashed")
+    return {"transcript": audio.decode(), "cached": False}
+
+
+@pytest.mark.anyio
+async def test_job_runs_and_is_published():
+    queue = MemoryJobQueue(ttl_seconds=60)
+    finished = []
+
+    async def listen():
+        async for job in queue.listen():
+            finished.append(job)
+            return
+
+    listener = asyncio.create_task(listen())
+    await asyncio.sleep(0)
+
+    job = new_job("audio/wav", match_id=7)
+    await queue.enqueue(job, b"Goal Winston")
+    assert (await queue.get(job["id"]))["status"] == QUEUED
+
+    assert await process_next_job(queue, fake_transcribe, timeout=0.1)
+    stored = await queue.get(job["id"])
+    assert stored["status"] == DONE
+    assert stored["result"]["transcript"] == "Goal Winston"
+
+    await asyncio.wait_for(listener, 1)
+    assert finished[0]["id"] == job["id"]
+    assert finished[0]["match_id"] == 7
+
+
+@pytest.mark.anyio
+async def test_failed_job_records_error():
+    queue = MemoryJobQueue(ttl_seconds=60)
+    job = new_job("audio/wav")
+    await queue.enqueue(job, b"broken")
+
+    assert await process_next_job(queue, fake_transcribe, timeout=0.1)
+    stored = await queue.get(job["id"])
+    assert stored["status"] == FAILED
+    assert stored["error"] == "decoder crashed"
+    assert await queue.depth() == 0
+
+
+@pytest.mark.anyio
+async def test_empty_queue_times_out():
+    queue = MemoryJobQueue(ttl_seconds=60)
+    assert not await process_next_job(queue, fake_transcribe, timeout=0.05)
+
+
+@pytest.fixture
+def redis_queue():
+    fakeredis = pytest.importorskip("fakeredis")
+    from backend.services.jobs import RedisJobQueue
+
+    queue = RedisJobQueue("redis://localhost:6379/0", ttl_seconds=60, claim_timeout=30, max_attempts=2)
+    queue._redis = fakeredis.FakeAsyncRedis()
+    queue._requeue_stale = queue._redis.register_script(jobs._REQUEUE_STALE)
+    return queue
+
+
+@pytest.mark.anyio
+async def test_redis_job_is_acked_once_finished(redis_queue):
+    job = new_job("audio/wav")
+    await redis_queue.enqueue(job, b"Goal Winston")
+
+    assert await process_next_job(redis_queue, fake_transcribe, timeout=1)
+    assert (await redis_queue.get(job["id"]))["status"] == DONE
+    assert await redis_queue._redis.llen(jobs._REDIS_PROCESSING) == 0
+    assert await redis_queue._redis.hlen(jobs._REDIS_CLAIMS) == 0
+    assert await redis_queue.requeue_stale() == 0
+
+
+@pytest.mark.anyio
+async def test_redis_job_of_a_dead_worker_is_requeued(redis_queue):
+    job = new_job("audio/wav")
+    await redis_queue.enqueue(job, b"Goal Winston")
+
+    # Claimed, then the worker dies without acking
+    claimed, audio = await redis_queue.next_job(timeout=1)
+    assert claimed["id"] == job["id"]
+    assert await redis_queue.depth() == 0
+    assert await redis_queue.requeue_stale() == 0  # claim still fresh
+
+    redis_queue.claim_timeout = 0
+    assert await redis_queue.requeue_stale() == 1
+    assert await redis_queue.depth() == 1
+
+    assert await process_next_job(redis_queue, fake_transcribe, timeout=1)
+    stored = await redis_queue.get(job["id"])
+    assert stored["status"] == DONE
+    assert stored["attempts"] == 2
+    assert stored["result"]["transcript"] == "Goal Winston"
+
+
+@pytest.mark.anyio
+async def test_redis_job_fails_after_max_attempts(redis_queue):
+    job = new_job("audio/wav")
+    await redis_queue.enqueue(job, b"Goal Winston")
+    redis_queue.claim_timeout = 0
+
+    for _ in range(2):
+        assert await redis_queue.next_job(timeout=1) is not None
+        assert await redis_queue.requeue_stale() == 1
+
+    assert await redis_queue.next_job(timeout=1) is None
+    stored = await redis_queue.get(job["id"])
+    assert stored["status"] == FAILED
+    assert stored["error"] == "Gave up after 2 attempts"
+    assert await redis_queue._redis.llen(jobs._REDIS_PROCESSING) == 0
+    assert await redis_queue._redis.exists(jobs._REDIS_AUDIO + job["id"]) == 0
+
+
+@pytest.mark.anyio
+async def test_finished_job_listener_resubscribes_after_an_error(monkeypatch):
+    from backend import main
+
+    class FlakyQueue:
+        def __init__(self):
+            self.subscriptions = 0
+
+        async def listen(self):
+            self.subscriptions += 1
+            if self.subscriptions == 1:
+                raise ConnectionError("Redis went away")
+            yield {"id": "j1", "match_id": 7}
+            await asyncio.Event().wait()
+
+    queue = FlakyQueue()
+    sent = []
+
+    async def broadcast_event(match_id, message):
+        sent.append((match_id, message["job"]["id"]))
+
+    monkeypatch.setattr(main, "get_job_queue", lambda: queue)
+    monkeypatch.setattr(main.ws_manager, "broadcast_event", broadcast_event)
+    sleep = asyncio.sleep
+    monkeypatch.setattr(main.asyncio, "sleep", lambda _: sleep(0))
+
+    task = asyncio.create_task(main.push_finished_jobs())
+    for _ in range(20):
+        if sent:
+            break
+        await asyncio.sleep(0)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    assert queue.subscriptions == 2
+    assert sent == [(7, "j1")]
+
+
+@pytest.mark.anyio
+async def test_job_is_requeued_while_the_workers_are_busy():
+    queue = MemoryJobQueue(ttl_seconds=60)
+    calls = []
+
+    async def busy_once(job, audio):
+        calls.append(job["id"])
+        if len(calls) == 1:
+            raise TranscriptionQueueFull(retry_after=0)
+        return await fake_transcribe(job, audio)
+
+    job = new_job("audio/wav")
+    await queue.enqueue(job, b"Goal Winston")
+    assert await process_next_job(queue, busy_once, timeout=0.1)
+    stored = await queue.get(job["id"])
+    assert stored["status"] == QUEUED and stored["error"] is None
+    assert await queue.depth() == 1
+
+    assert await process_next_job(queue, busy_once, timeout=0.1)
+    assert (await queue.get(job["id"]))["status"] == DONE
+    assert calls == [job["id"], job["id"]]
+
+
+@pytest.mark.anyio
+async def test_redis_job_requeued_when_busy_keeps_its_attempts(redis_queue):
+    job = new_job("audio/wav")
+    await redis_queue.enqueue(job, b"Goal Winston")
+
+    async def busy(job, audio):
+        raise TranscriptionQueueFull(retry_after=0)
+
+    for _ in range(3):  # more than max_attempts
+        assert await process_next_job(redis_queue, busy, timeout=1)
+    stored = await redis_queue.get(job["id"])
+    assert (stored["status"], stored["attempts"]) == (QUEUED, 0)
+    assert await redis_queue.depth() == 1
+    assert await redis_queue._redis.llen(jobs._REDIS_PROCESSING) == 0
+
+    assert await process_next_job(redis_queue, fake_transcribe, timeout=1)
+    assert (await redis_queue.get(job["id"]))["status"] == DONE
@@ -0,0 +1,59 @@
+# backend/tests/test_lineups.py
+from backend.services.command_parser import parse_transcript, sub_changes
+from backend.services.lineups import MatchLineup
+from backend.services.roster_index import RosterIndex
+
+TEAM = [
+    {"id": 1, "name": "Tommy", "position": "GK"},
+    {"id": 2, "name": "Leo", "position": "W"},
+    {"id": 3, "name": "Winston", "position": "ST"},
+    {"id": 4, "name": "Logan", "position": "D"},
+    {"id": 5, "name": "Tom", "position": "M"},
+    {"id": 6, "name": "Lenny", "position": "W"},  # not in today's squad
+    {"id": 7, "name": "Wilson", "position": "ST"},
+]
+
+
+def make_lineup():
+    squad = [p for p in TEAM if p["id"] in {1, 2, 3, 4, 5}]
+    return MatchLineup(match_id=10, squad=squad, starters={1, 3, 4, 5})
+
+
+def test_sub_changes_directions():
+    squad = make_lineup().squad_index
+    assert sub_changes("Leo in for Tom", squad) == {"on": [2], "off": [5]}
+    assert sub_changes("Sub Logan out", squad) == {"on": [], "off": [4]}
+    assert sub_changes("Logan off, Leo on", squad) == {"on": [2], "off": [4]}
+    assert sub_changes("Sub Leo", squad) == {"on": [], "off": []}
+
+
+def test_resolution_prefers_players_on_the_pitch():
+    lineup = make_lineup()
+    team = RosterIndex(TEAM)
+    text = "Goal Wilston"  # between Winston (playing) and Wilson (not in the squad)
+    assert parse_transcript(text, team.names, roster_index=lineup.scoped_index(team))["player_id"] == 3
+
+    # Bench players and the rest of the team are still reachable
+    assert parse_transcript("Leo in for Tom", team.names, roster_index=lineup.scoped_index(team))["player_id"] == 2
+    assert parse_transcript("Great pass Lenny", team.names, roster_index=lineup.scoped_index(team))["player_id"] == 6
+
+
+def test_exact_name_on_the_bench_beats_a_similar_one_on_the_pitch():
+    lineup = make_lineup()
+    lineup.apply({"on": [], "off": [5]})  # Tom to the bench, Tommy still playing
+    team = RosterIndex(TEAM)
+    index = lineup.scoped_index(team)
+    assert parse_transcript("Tom in for Leo", team.names, roster_index=index)["player_id"] == 5
+    assert [m.player["id"] for m in index.resolve_all(["Tom", "Tommy"])] == [5, 1]
+
+
+def test_subs_move_players_on_and_off():
+    lineup = make_lineup()
+    team = RosterIndex(TEAM)
+    lineup.apply(sub_changes("Leo in for Winston", lineup.squad_index))
+    assert lineup.on_pitch == {1, 2, 4, 5}
+    assert lineup.pitch_index().names == ["Tommy", "Leo", "Logan", "Tom"]
+    # Players outside the squad can't come on
+    lineup.apply({"on": [7], "off": []})
+    assert 7 not in lineup.on_pitch
+    assert parse_transcript("Shot Leo", team.names, roster_index=lineup.scoped_index(team))["player_id"] == 2
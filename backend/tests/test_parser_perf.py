@@ -0,0 +1,32 @@
+# backend/tests/test_parser_perf.py
+import os
+
+from backend.benchmarks.bench_parser import DEFAULT_TOLERANCE, compare, load_baseline, run_suite
+from backend.benchmarks.parser_corpus import build_roster, generate_corpus
+from backend.services.command_parser import detect_intent, extract_minute
+
+
+def test_corpus_is_reproducible_and_labelled():
+    roster = build_roster(100)
+    assert len(set(roster)) == 100
+    corpus = generate_corpus(500, roster, seed=3)
+    assert corpus == generate_corpus(500, roster, seed=3)
+    # Noise never changes what the command means
+    assert all(detect_intent(s["text"]) == s["intent"] for s in corpus)
+    assert all(extract_minute(s["text"]) == s["minute"] for s in corpus)
+
+
+def test_parser_throughput_has_not_regressed():
+    """
+    Compare against backend/benchmarks/parser_baseline.json; re-save it with
+    `python -m backend.benchmarks.bench_parser --save-baseline` after an
+    intended change. PARSER_PERF_TOLERANCE loosens the check on noisy hosts.
+    """
+    baseline = load_baseline()
+    suite = run_suite(baseline["roster_sizes"], baseline["transcripts"], seed=baseline["seed"])
+    tolerance = float(os.getenv("PARSER_PERF_TOLERANCE", DEFAULT_TOLERANCE))
+    regressions = compare(suite, baseline, tolerance)
+    assert not regressions, "\n".join(regressions)
+    # Faster is fine; less accurate is not
+    for name, value in baseline["accuracy"].items():
+        assert suite["accuracy"][name] >= value, name
@@ -0,0 +1,59 @@
+# backend/tests/test_pool_metrics.py
+import contextvars
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+
+from backend.services import pool_metrics
+from backend.services.pool_metrics import BACKGROUND, PoolMetrics, current_route, instrument_pool, track_request
+
+
+class FakeRoute:
+    path = "/match/{match_id}"
+
+
+def test_route_comes_from_the_request_scope():
+    def in_request():
+        scope = {"method": "GET", "path": "/match/7"}
+        track_request(scope)
+        before_routing = current_route()
+        scope["route"] = FakeRoute()
+        return before_routing, current_route()
+
+    assert contextvars.copy_context().run(in_request) == ("GET /match/7", "GET /match/{match_id}")
+    assert current_route() == BACKGROUND
+
+
+def test_hold_times_are_recorded_per_route(monkeypatch):
+    metrics = PoolMetrics()
+    monkeypatch.setattr(pool_metrics, "_metrics", metrics)
+    engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=2)
+    instrument_pool(engine.pool)
+
+    def request():
+        track_request({"method": "POST", "path": "/", "route": FakeRoute()})
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            assert metrics.checked_out == 1
+
+    contextvars.copy_context().run(request)
+    with engine.connect() as a, engine.connect() as b:
+        assert metrics.peak_checked_out == 2
+
+    stats = metrics.stats(engine.pool)
+    assert stats["checked_out"] == 0 and metrics.checked_out == 0
+    assert stats["hold_by_route"]["POST /match/{match_id}"]["checkouts"] == 1
+    assert stats["hold_by_route"][BACKGROUND]["checkouts"] == 2
+
+    metrics.reset()
+    assert metrics.stats()["hold_by_route"] == {}
+
+
+def test_acquire_summary():
+    metrics = PoolMetrics()
+    for ms in range(1, 101):
+        metrics.record_acquire(ms / 1000)
+    metrics.record_acquire(0.5, timed_out=True)
+    acquire = metrics.stats()["acquire"]
+    assert acquire["count"] == 101 and acquire["timeouts"] == 1
+    assert acquire["p50_ms"] == 51.0 and acquire["max_ms"] == 500.0
@@ -0,0 +1,106 @@
+# backend/tests/test_recordings.py
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import httpx
+import numpy as np
+import pytest
+from backend import models
+from backend.main import app
+from backend.services import recordings
+from backend.services.audio import SAMPLE_RATE
+from backend.services.event_ingest import match_minute
+from backend.services.recordings import iter_speech_segments
+from backend.settings import get_settings
+
+
+def tone(seconds, amplitude=0.3):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def silence(seconds):
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+async def windows_of(audio, seconds):
+    size = int(seconds * SAMPLE_RATE)
+    for start in range(0, audio.size, size):
+        yield audio[start:start + size]
+
+
+async def collect(audio, window_seconds):
+    return [
+        (start / SAMPLE_RATE, seg.size / SAMPLE_RATE)
+        async for start, seg in iter_speech_segments(windows_of(audio, window_seconds), 0.01, 25.0)
+    ]
+
+
+@pytest.mark.anyio
+async def test_segments_keep_recording_offsets():
+    audio = np.concatenate([silence(3), tone(2), silence(10), tone(1.5), silence(3)])
+    segments = await collect(audio, 60)
+    assert len(segments) == 2
+    assert segments[0][0] == pytest.approx(3, abs=0.2)
+    assert segments[1][0] == pytest.approx(15, abs=0.2)
+
+
+@pytest.mark.anyio
+async def test_speech_across_window_boundary_is_not_cut():
+    # Utterance from 9 s to 12 s straddles the 10 s window edge
+    audio = np.concatenate([silence(2), tone(1), silence(6), tone(3), silence(4)])
+    whole = await collect(audio, 60)
+    windowed = await collect(audio, 10)
+    assert len(windowed) == len(whole) == 2
+    assert windowed[1][0] == pytest.approx(whole[1][0], abs=0.05)
+    assert windowed[1][1] == pytest.approx(whole[1][1], abs=0.05)
+
+
+def test_match_minute_takes_naive_times_as_utc():
+    match = models.Match(kickoff_at=datetime(2024, 5, 4, 10, 0, tzinfo=timezone.utc))
+    assert match_minute(match, at=datetime(2024, 5, 4, 10, 31, 30)) == 31
+    assert match_minute(match, at=datetime(2024, 5, 4, 12, 31, 30, tzinfo=timezone.utc)) == 151
+
+
+@pytest.mark.anyio
+async def test_naive_started_at_is_rejected():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        r = await client.post("/matches/1/recordings", params={"started_at": "2024-05-04T10:00:00"})
+    assert r.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_recording_of_a_deleted_match_fails_the_upload(tmp_path, monkeypatch):
+    class NoMatchSession:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def get(self, model, ident):
+            return None
+
+    monkeypatch.setattr(get_settings(), "RECORDINGS_DIR", str(tmp_path))
+    monkeypatch.setattr(recordings, "AsyncSessionLocal", NoMatchSession)
+    meta = recordings.create_upload(1, "audio/wav", datetime(2024, 5, 4, 10, 0, tzinfo=timezone.utc))
+
+    progress = recordings.start_ingest(meta["upload_id"], 1)
+    await asyncio.wait_for(recordings._tasks.get(meta["upload_id"]) or asyncio.sleep(0), 1)
+    assert progress.status == "failed"
+    assert progress.error == "Match not found"
+    # Kept so it can be looked at, not half-ingested
+    assert recordings.load_upload(meta["upload_id"])["started_at"] == "2024-05-04T10:00:00+00:00"
+
+
+def test_finished_progress_is_pruned(monkeypatch):
+    monkeypatch.setattr(get_settings(), "RECORDING_PROGRESS_TTL", 60)
+    old, recent, running = (recordings.IngestProgress(1) for _ in range(3))
+    old.finished = time.perf_counter() - 120
+    recent.finished = time.perf_counter()
+    monkeypatch.setattr(recordings, "_progress", {"old": old, "recent": recent, "running": running})
+
+    assert recordings.get_progress("old") is None
+    assert recordings.get_progress("recent") is recent
+    assert recordings.get_progress("running") is running
@@ -0,0 +1,95 @@
+# backend/tests/test_roster_cache.py
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.orm import Session
+
+from backend import models
+from backend.services import roster_cache
+from backend.services.roster_cache import RosterCache
+
+
+class FakeRosters:
+    def __init__(self):
+        self.queries = 0
+        self.rosters = {1: [{"id": 10, "name": "Winston", "position": "Striker"}]}
+
+    async def __call__(self, session, team_id):
+        self.queries += 1
+        return list(self.rosters.get(team_id, []))
+
+
+@pytest.mark.anyio
+async def test_steady_state_needs_no_queries():
+    fetch = FakeRosters()
+    cache = RosterCache(ttl_seconds=60, fetch=fetch)
+    for _ in range(5):
+        entry = await cache.get(None, 1)
+    assert fetch.queries == 1
+    assert entry.index.resolve_first(["Winston"]).player["id"] == 10
+    assert cache.stats()["hits"] == 4
+
+
+@pytest.mark.anyio
+async def test_invalidate_and_ttl_refetch():
+    fetch = FakeRosters()
+    cache = RosterCache(ttl_seconds=60, fetch=fetch)
+    await cache.get(None, 1)
+    fetch.rosters[1].append({"id": 11, "name": "Tommy", "position": "Keeper"})
+    cache.invalidate(1)
+    assert (await cache.get(None, 1)).index.names == ["Winston", "Tommy"]
+    assert fetch.queries == 2
+
+    expiring = RosterCache(ttl_seconds=0, fetch=fetch)
+    await expiring.get(None, 1)
+    await expiring.get(None, 1)
+    assert fetch.queries == 4
+
+
+@pytest.mark.anyio
+async def test_roster_invalidated_mid_fetch_is_not_stored():
+    cache = RosterCache(ttl_seconds=60)
+
+    async def racing_fetch(session, team_id):
+        cache.invalidate(team_id)  # a player was added while we were reading
+        return []
+
+    cache._fetch = racing_fetch
+    await cache.get(None, 1)
+    assert cache.stats()["entries"] == 0
+
+
+def test_player_writes_bump_team_version(monkeypatch):
+    cache = RosterCache(ttl_seconds=60)
+    monkeypatch.setattr(roster_cache, "_cache", cache)
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        for model in (models.Club, models.Team, models.Player):
+            conn.execute(CreateTable(model.__table__))
+
+    with Session(engine) as session:
+        # Explicit ids: SQLite only autoincrements INTEGER primary keys
+        session.add(models.Club(id=1, name="Winchester FC"))
+        session.add_all([
+            models.Team(id=1, club_id=1, name="U9 Reds"),
+            models.Team(id=2, club_id=1, name="U10 Blues"),
+        ])
+        session.commit()
+        red, blue = 1, 2
+        assert cache.version(red) == cache.version(blue) == (0, 0)
+
+        player = models.Player(id=1, team_id=red, name="Winston")
+        session.add(player)
+        session.flush()
+        assert cache.version(red) == (0, 0)  # only once committed
+        session.commit()
+        assert cache.version(red) == (0, 1)
+
+        player.team_id = blue  # transfer: both rosters change
+        session.commit()
+        assert cache.version(red) == (0, 2)
+        assert cache.version(blue) == (0, 1)
+
+        session.delete(player)
+        session.rollback()
+        assert cache.version(blue) == (0, 1)
@@ -0,0 +1,41 @@
+# backend/tests/test_roster_index.py
+from backend.services.command_parser import parse_transcript, resolve_name
+from backend.services.roster_index import RosterIndex, phonetic_key
+
+PLAYERS = [
+    {"id": 1, "name": "Tommy", "position": "Keeper"},
+    {"id": 2, "name": "Winston", "position": "Striker"},
+    {"id": 3, "name": "Tom", "position": "Midfield"},
+    {"id": 4, "name": "Logan", "position": "Defence"},
+]
+
+
+def test_exact_phonetic_and_fuzzy_matches_carry_player():
+    index = RosterIndex(PLAYERS)
+    exact, phonetic, fuzzy, missing = index.resolve_all(["winston", "Wynston", "Lohgan", "Martin"])
+    assert (exact.method, exact.player["id"]) == ("exact", 2)
+    assert (phonetic.method, phonetic.player["id"]) == ("phonetic", 2)
+    assert fuzzy.player["id"] == 4
+    assert missing is None
+
+
+def test_phonetic_bucket_prefers_closest_spelling():
+    assert phonetic_key("Tom") == phonetic_key("Tommy")
+    assert RosterIndex(PLAYERS).resolve_first(["Tomy"]).name == "Tommy"
+
+
+def test_fuzzy_fallback_agrees_with_resolve_name():
+    names = [p["name"] for p in PLAYERS] + ["Alexander", "Finley"]
+    index = RosterIndex.from_names(names)
+    for token in ["Alexandr", "Finlay", "Wilson", "Logn", "Kip"]:
+        match = index.resolve_first([token])
+        assert (match.name if match else None) == resolve_name(token, names)
+
+
+def test_parse_transcript_uses_first_resolvable_token():
+    index = RosterIndex(PLAYERS)
+    result = parse_transcript("Martin passes to Winstn", [], roster_index=index)
+    assert result["player"] == "Winston"
+    assert result["player_raw"] == "Winstn"
+    assert result["player_id"] == 2
+    assert result["position"] == "Striker"
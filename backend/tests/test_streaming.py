@@ -0,0 +1,99 @@
+# backend/tests/test_streaming.py
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from backend import models
+from backend.api import ws
+from backend.api.ws import parse_sample_rate
+from backend.main import app
+from backend.services.streaming import SAMPLE_RATE, UtteranceSegmenter, pcm16_to_float32
+
+
+def _tone(seconds: float, amplitude: float = 0.3) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def _silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+def test_pcm16_to_float32_range():
+    pcm = np.array([0, 16384, -32768], dtype="<i2").tobytes()
+    out = pcm16_to_float32(pcm)
+    assert out.dtype == np.float32
+    assert np.allclose(out, [0.0, 0.5, -1.0])
+
+
+def test_utterance_completes_after_trailing_silence():
+    seg = UtteranceSegmenter(endpoint_silence_ms=300)
+    assert seg.feed(_silence(0.5)) == []
+    assert seg.feed(_tone(1.0)) == []
+    assert seg.in_speech
+    done = seg.feed(_silence(0.5))
+    assert len(done) == 1
+    # ~1s of speech plus pre-roll and a short tail, not the whole silence
+    assert 0.9 * SAMPLE_RATE < done[0].size < 1.5 * SAMPLE_RATE
+    assert seg.utterance_index == 1
+
+
+def test_small_frames_and_flush():
+    seg = UtteranceSegmenter()
+    audio = _tone(0.6)
+    for i in range(0, audio.size, 100):
+        assert seg.feed(audio[i:i + 100]) == []
+    assert seg.take_partial() is not None
+    assert seg.take_partial() is None
+    flushed = seg.flush()
+    assert flushed is not None and flushed.size >= audio.size - 100
+    assert seg.flush() is None
+
+
+def test_sample_rate_must_be_a_usable_whole_number():
+    assert parse_sample_rate(44100) == 44100
+    assert parse_sample_rate(48000.0) == 48000
+    for bad in [0, -16000, 44100.5, "44100", None, True, 10_000_000]:
+        assert parse_sample_rate(bad) is None, bad
+
+
+@pytest.fixture
+def stream_client(monkeypatch):
+    class MatchSession:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def get(self, model, ident):
+            return models.Match(id=ident, team_id=1, opponent_name="Rovers", kickoff_at=datetime.now(timezone.utc))
+
+    monkeypatch.setattr(ws, "AsyncSessionLocal", MatchSession)
+    return TestClient(app)  # no lifespan: nothing here loads a model
+
+
+def test_bad_sample_rate_closes_the_stream(stream_client):
+    with stream_client.websocket_connect("/ws/transcribe/1") as socket:
+        socket.send_json({"type": "config", "sample_rate": 0})
+        message = socket.receive_json()
+        assert message["type"] == "error"
+        assert "sample_rate" in message["detail"]
+        with pytest.raises(WebSocketDisconnect) as exc:
+            socket.receive_json()
+    assert exc.value.code == 1003
+
+
+def test_odd_length_frames_are_carried_over(stream_client):
+    silence = np.zeros(800, dtype="<i2").tobytes()
+    with stream_client.websocket_connect("/ws/transcribe/1") as socket:
+        # 1601 bytes, then the missing byte: no sample is split or lost
+        socket.send_bytes(silence + b"\x00")
+        socket.send_bytes(b"\x00" + silence[:-1])
+        socket.send_json({"type": "stop"})
+        # Still open: a bad config is answered, not a crashed handler
+        socket.send_json({"type": "config", "sample_rate": "fast"})
+        assert socket.receive_json()["type"] == "error"
@@ -0,0 +1,34 @@
+# backend/tests/test_transcript_cache.py
+import pytest
+from backend.services.transcript_cache import TranscriptCache, cache_key
+
+
+def test_cache_key_depends_on_options():
+    assert cache_key("abc", "base", {}) == cache_key("abc", "base", {})
+    assert cache_key("abc", "base", {}) != cache_key("abc", "small", {})
+    assert cache_key("abc", "base", {}) != cache_key("abc", "base", {"beam_size": 5})
+
+
+@pytest.mark.anyio
+async def test_lru_eviction_and_stats():
+    cache = TranscriptCache(max_entries=2, ttl_seconds=60)
+    await cache.set("a", {"text": "Goal Winston", "decode_seconds": 1.5})
+    await cache.set("b", {"text": "Save Tommy", "decode_seconds": 1.0})
+    assert (await cache.get("a"))["text"] == "Goal Winston"  # "a" is now most recent
+    await cache.set("c", {"text": "Tackle Kip", "decode_seconds": 1.0})
+
+    assert await cache.get("b") is None
+    assert await cache.get("a") is not None
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["hits_memory"] == 2
+    assert stats["misses"] == 1
+    assert stats["decode_seconds_saved"] == 3.0
+
+
+@pytest.mark.anyio
+async def test_expired_entries_miss():
+    cache = TranscriptCache(max_entries=2, ttl_seconds=0)
+    await cache.set("a", {"text": "Goal Winston"})
+    assert await cache.get("a") is None
+    assert cache.stats()["entries"] == 0
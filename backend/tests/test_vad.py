@@ -0,0 +1,52 @@
+# backend/tests/test_vad.py
+import numpy as np
+from backend.services.audio import SAMPLE_RATE
+from backend.services.vad import detect_speech
+
+
+def _tone(seconds: float, amplitude: float = 0.3) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def _silence(seconds: float) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return (0.001 * rng.standard_normal(int(seconds * SAMPLE_RATE))).astype(np.float32)
+
+
+def test_silence_has_no_speech():
+    result = detect_speech(_silence(5.0))
+    assert not result.has_speech
+    assert result.segments == []
+    assert result.trim_ratio == 1.0
+
+
+def test_trims_leading_and_trailing_silence():
+    audio = np.concatenate([_silence(2.0), _tone(1.0), _silence(3.0)])
+    result = detect_speech(audio)
+    assert len(result.segments) == 1
+    # 1 s of speech plus a little padding on each side
+    assert 1.0 <= result.report()["speech_seconds"] <= 1.4
+    assert result.trim_ratio > 0.7
+
+
+def test_clip_without_pauses_is_kept():
+    result = detect_speech(_tone(1.5))
+    assert result.has_speech
+    assert result.trim_ratio < 0.1
+
+
+def test_clicks_are_ignored():
+    audio = _silence(2.0)
+    audio[16000:16000 + 480] = 0.5  # a single 30 ms tap
+    assert not detect_speech(audio).has_speech
+
+
+def test_long_clip_is_split_on_pauses():
+    phrase = np.concatenate([_tone(8.0), _silence(1.0)])
+    audio = np.concatenate([phrase] * 5)  # 45 s
+    result = detect_speech(audio, max_segment_s=25.0)
+    assert len(result.segments) >= 2
+    assert all(seg.size <= 26 * SAMPLE_RATE for seg in result.segments)
+    # Cuts land in pauses, so nothing voiced is lost
+    assert result.report()["speech_seconds"] >= 40.0
@@ -0,0 +1,51 @@
+# backend/tests/test_voice_events.py
+import asyncio
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from backend.api import matches
+from backend.db import get_session
+from backend.main import app
+
+
+class SlowSession:
+    """Stands in for the request session; get() blocks until cancelled."""
+
+    def __init__(self):
+        self.started = asyncio.Event()
+        self.cancelled = False
+        self.closed = False
+
+    async def get(self, model, ident):
+        self.started.set()
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            self.cancelled = not self.closed
+            raise
+
+
+@pytest.mark.anyio
+async def test_failed_transcription_cancels_the_roster_lookup(monkeypatch):
+    session = SlowSession()
+
+    async def override_session():
+        yield session
+        session.closed = True
+
+    async def failing_transcription(file):
+        await session.started.wait()
+        raise HTTPException(status_code=503, detail="Transcription queue is full")
+
+    monkeypatch.setattr(matches, "transcribe_upload", failing_transcription)
+    app.dependency_overrides[get_session] = override_session
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            r = await client.post("/matches/1/events/voice", files={"file": ("clip.wav", b"RIFF", "audio/wav")})
+    finally:
+        app.dependency_overrides.pop(get_session, None)
+    assert r.status_code == 503
+    # Cancelled while the request (and its session) were still open
+    assert session.cancelled
@@ -0,0 +1,65 @@
+# backend/workers/transcription_worker.py
+"""
+Standalone consumer for the Redis transcription job queue.
+
+    TRANSCRIBE_JOB_QUEUE=redis python -m backend.workers.transcription_worker
+
+Each process owns its own Whisper worker pool (TRANSCRIBE_WORKERS) and keeps
+TRANSCRIBE_JOB_CONCURRENCY jobs in flight so the micro-batcher has
+something to batch. Run as many processes as the hardware allows.
+"""
+import asyncio
+import logging
+import signal
+import sys
+
+from backend.services.jobs import RedisJobQueue, run_job_worker, run_requeue_sweeper
+from backend.services.transcription import get_transcription_executor, shutdown_transcription_executor
+from backend.settings import get_settings
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    settings = get_settings()
+    queue = RedisJobQueue(
+        settings.REDIS_URL,
+        settings.TRANSCRIBE_JOB_TTL,
+        settings.TRANSCRIBE_JOB_CLAIM_TIMEOUT,
+        settings.TRANSCRIBE_JOB_MAX_ATTEMPTS,
+    )
+
+    # Don't take jobs until the model is loaded, and not at all if it can't be
+    executor = get_transcription_executor()
+    await executor.warmup()
+    if executor.warmup_error:
+        logger.error(f"Transcription worker not starting: {executor.warmup_error}")
+        await queue.close()
+        shutdown_transcription_executor()
+        sys.exit(1)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    consumers = [
+        asyncio.create_task(run_job_worker(queue))
+        for _ in range(max(1, settings.TRANSCRIBE_JOB_CONCURRENCY))
+    ]
+    # Pick up jobs left claimed by a worker that died mid-decode
+    sweeper = asyncio.create_task(run_requeue_sweeper(queue, settings.TRANSCRIBE_JOB_CLAIM_TIMEOUT / 4))
+    logger.info(f"Transcription worker consuming {settings.REDIS_URL} with {len(consumers)} consumer(s)")
+    await stop.wait()
+
+    logger.info("Shutting down transcription worker")
+    for task in [*consumers, sweeper]:
+        task.cancel()
+    await asyncio.gather(*consumers, sweeper, return_exceptions=True)
+    await queue.close()
+    shutdown_transcription_executor()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())